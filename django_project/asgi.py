@@ -1,3 +1,12 @@
+"""
+ASGI config for django_project project.
+
+It exposes the ASGI callable as a module-level variable named ``application``.
+Serve this (rather than wsgi.py) with an ASGI server to keep the live
+dashboard stream (/api/dashboard/stream/) open: connections then park on the
+event loop instead of holding a worker each. Under WSGI the stream degrades
+to one snapshot per reconnect.
+"""
 import os
 
 from django.core.asgi import get_asgi_application
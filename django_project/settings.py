@@ -50,10 +50,13 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "pages.loader.QueryCountMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "pages.audit.AuditActorMiddleware",
+    "pages.tenancy.TenantMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "django_htmx.middleware.HtmxMiddleware",
@@ -82,13 +85,27 @@ WSGI_APPLICATION = "django_project.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 if 'RENDER' in os.environ:
-    # Production - use SQLite (for demo purposes)
+    # Production - file-backed SQLite shared by all gunicorn workers.
+    # Pragmas in SQLITE_PRAGMAS are applied per connection by pages/db.py.
+    SQLITE_PATH = os.environ.get('SQLITE_PATH', str(BASE_DIR / 'db.sqlite3'))
     DATABASES = {
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
-            'NAME': ':memory:',  # In-memory database
+            'NAME': SQLITE_PATH,
+            'OPTIONS': {
+                # Take the write lock up front instead of failing on upgrade under WAL.
+                'transaction_mode': 'IMMEDIATE',
+            },
         }
     }
+    if os.environ.get('SQLITE_READONLY_ALIAS'):
+        # Optional second alias opened read-only; pages.db.ReadOnlyRouter sends reads here.
+        DATABASES['readonly'] = {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': f'file:{SQLITE_PATH}?mode=ro',
+            'TEST': {'MIRROR': 'default'},
+        }
+        DATABASE_ROUTERS = ['pages.db.ReadOnlyRouter']
 else:
     DATABASES = {
     "default": {
@@ -101,6 +118,15 @@ else:
     }
 }
 
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,  # bytes
+    'cache_size': -64 * 1024,  # negative = KiB, i.e. 64 MB page cache
+    'busy_timeout': 5000,  # ms
+    'temp_store': 'MEMORY',
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -143,6 +169,49 @@ STATIC_URL = "static/"
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Audit log buffering (see pages/audit.py)
+AUDIT_FLUSH_INTERVAL = 5.0  # seconds
+AUDIT_MAX_BUFFERED = 500
+
+# Multi-school tenancy (see pages/tenancy.py); unscoped records belong to this school
+DEFAULT_SCHOOL_CODE = 'main'
+
+# Single-flight report cache (see pages/singleflight.py); coalescing across
+# workers needs a shared CACHES backend
+SINGLEFLIGHT_TTL = 30  # seconds a report is fresh
+SINGLEFLIGHT_STALE_TTL = 300  # seconds it is then served stale while recomputed
+
+# Delta sync for offline clients (see pages/sync.py)
+SYNC_SETTLE_SECONDS = 5  # rows newer than this wait for the next sync
+SYNC_TOMBSTONE_DAYS = 90  # sync tokens (and tombstones) older than this expire
+
+# Transactional outbox (see pages/outbox.py); relayed by `manage.py relay_outbox`
+OUTBOX_SETTLE_SECONDS = 2  # events newer than this wait for the next batch
+OUTBOX_GAP_SECONDS = 3600  # ids skipped by the relay are looked for again this long (late commits)
+OUTBOX_KEEP_DAYS = 7  # delivered events older than this are compacted
+
+# In-memory roster for analytics (see pages/roster.py)
+ROSTER_REFRESH_SECONDS = 30  # catch up with other workers' changes this often
+
+# Notification delivery (see pages/delivery.py); sent by `manage.py send_notifications`
+EMAIL_HOST = os.environ.get('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.environ.get('EMAIL_PORT', 25))
+DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'HumbleKids School <noreply@humblekids.school>')
+SMS_BACKEND = 'pages.delivery.FileSmsBackend'  # replace with the provider's backend in production
+SMS_FILE_PATH = BASE_DIR / 'sms-outbox.jsonl'
+DELIVERY_BATCH_SIZE = 200
+DELIVERY_RATE_LIMITS = {'email': 1000, 'sms': 500}  # messages per second, per provider limits
+DELIVERY_MAX_ATTEMPTS = 3
+
+# Student and staff documents (see pages/documents.py)
+DOCUMENT_ROOT = Path(os.environ.get('DOCUMENT_ROOT', BASE_DIR / 'documents'))
+DOCUMENT_MAX_BYTES = 20 * 1024 * 1024
+DOCUMENT_THUMBNAIL_SIZES = (128, 512)
+# Hand downloads to the web server after the access check: 'x-accel-redirect' (nginx, with an
+# internal location at DOCUMENT_SENDFILE_PREFIX aliased to DOCUMENT_ROOT) or 'x-sendfile' (Apache).
+DOCUMENT_SENDFILE = os.environ.get('DOCUMENT_SENDFILE', '')
+DOCUMENT_SENDFILE_PREFIX = '/protected-documents/'
+
 # settings.py
 if DEBUG:
     CACHES = {
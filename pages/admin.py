@@ -1,5 +1,353 @@
-from django.contrib import admin
-from .models import Student,Staff
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from django.db import transaction
 
-admin.site.register(Student)
-admin.site.register(Staff)
\ No newline at end of file
+from . import bulk
+from .models import (
+    Activity, ActivityParticipant, ArchivedActivityParticipant, ArchivedAttendance, ArchivedFeePayment,
+    ArchivedInvoice, ArchivedResult, ArchivedStudent, AuditLog, Delivery, Document, Event, Exam, FeePayment,
+    FeeSchedule, FeeScheduleItem, Grade, Guardian, Invoice, InvoiceLine, Notification, OutboxCheckpoint,
+    OutboxEvent, Result, RollCall, Room, School, Staff, Student, StudentAttendance, Subject, TeachingAssignment,
+    Term, TimetableSlot, Tombstone, STATUS_CHOICES,
+)
+from .paginators import EstimatedCountPaginator
+
+
+class LeanModelAdmin(admin.ModelAdmin):
+    """Changelist defaults that stay fast on large tables."""
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+    list_per_page = 50
+
+
+class StudentActionForm(ActionForm):
+    amount = forms.DecimalField(required=False, min_value=0, decimal_places=2,
+                                help_text="Used by 'Add term fees'")
+
+
+def _status_action(status, label):
+    def action(modeladmin, request, queryset):
+        with transaction.atomic():
+            result = bulk.set_status(queryset, status)
+        modeladmin.message_user(request, f"{result['affected']} students marked {label.lower()}.")
+    action.__name__ = f'mark_{status}'
+    action.short_description = f'Mark selected as {label.lower()}'
+    return action
+
+
+@admin.register(School)
+class SchoolAdmin(LeanModelAdmin):
+    list_display = ['name', 'code', 'is_active', 'created_at']
+    list_filter = ['is_active']
+    search_fields = ['name', 'code']
+
+
+@admin.register(Grade)
+class GradeAdmin(LeanModelAdmin):
+    list_display = ['name', 'level', 'capacity', 'enrolled_count', 'available_spots']
+    list_editable = ['level', 'capacity']
+    search_fields = ['name']
+    ordering = ['level', 'name']
+
+
+@admin.register(Student)
+class StudentAdmin(LeanModelAdmin):
+    list_display = ['name', 'student_id', 'grade', 'status', 'fees_due', 'fees_paid', 'balance_display']
+    list_filter = ['status', 'grade', 'gender']
+    list_select_related = ['grade']
+    search_fields = ['name', 'student_id', 'parent_name', 'parent_phone', 'email']
+    autocomplete_fields = ['grade', 'guardian']
+    action_form = StudentActionForm
+    actions = ['promote', 'add_term_fees'] + [_status_action(s, label) for s, label in STATUS_CHOICES]
+
+    @admin.display(description='Balance')
+    def balance_display(self, obj):
+        return obj.balance()
+
+    @admin.action(description='Promote selected one grade up')
+    def promote(self, request, queryset):
+        try:
+            with transaction.atomic():
+                result = bulk.promote(queryset)
+        except bulk.BulkActionError as e:
+            self.message_user(request, str(e), messages.ERROR)
+            return
+        self.message_user(
+            request, f"{result['promoted']} promoted, {result['graduated']} graduated, {result['skipped']} skipped."
+        )
+
+    @admin.action(description='Add term fees to selected')
+    def add_term_fees(self, request, queryset):
+        try:
+            with transaction.atomic():
+                result = bulk.add_fees(queryset, request.POST.get('amount'))
+        except bulk.BulkActionError as e:
+            self.message_user(request, str(e), messages.ERROR)
+            return
+        self.message_user(request, f"Added ${result['amount']} to {result['affected']} students.")
+
+
+@admin.register(Staff)
+class StaffAdmin(LeanModelAdmin):
+    list_display = ['name', 'staff_id', 'role', 'department', 'status', 'date_joined']
+    list_filter = ['role', 'status', 'department']
+    search_fields = ['name', 'staff_id', 'email', 'department']
+    filter_horizontal = ['teaching_subjects']
+
+
+@admin.register(Notification)
+class NotificationAdmin(LeanModelAdmin):
+    list_display = ['title', 'priority', 'target_audience', 'target_grade', 'is_active', 'date', 'created_by']
+    list_filter = ['priority', 'target_audience', 'is_active']
+    list_select_related = ['target_grade', 'created_by']
+    search_fields = ['title', 'message']
+    autocomplete_fields = ['target_grade', 'created_by']
+
+
+@admin.register(Event)
+class EventAdmin(LeanModelAdmin):
+    list_display = ['title', 'event_type', 'start_date', 'end_date', 'location', 'is_active']
+    list_filter = ['event_type', 'is_active']
+    search_fields = ['title', 'location']
+    autocomplete_fields = ['created_by', 'target_grades']
+
+
+@admin.register(Activity)
+class ActivityAdmin(LeanModelAdmin):
+    list_display = ['title', 'activity_type', 'instructor', 'max_participants', 'schedule', 'is_active']
+    list_filter = ['activity_type', 'is_active']
+    list_select_related = ['instructor']
+    search_fields = ['title']
+    autocomplete_fields = ['instructor']
+
+
+@admin.register(ActivityParticipant)
+class ActivityParticipantAdmin(LeanModelAdmin):
+    list_display = ['student', 'activity', 'date_joined', 'is_active']
+    list_filter = ['is_active', 'activity']
+    list_select_related = ['student', 'activity']
+    search_fields = ['student__name', 'student__student_id', 'activity__title']
+    autocomplete_fields = ['student', 'activity']
+
+
+@admin.register(FeePayment)
+class FeePaymentAdmin(LeanModelAdmin):
+    list_display = ['student', 'amount', 'payment_method', 'reference_number', 'payment_date', 'recorded_by']
+    list_filter = ['payment_method']
+    list_select_related = ['student', 'recorded_by']
+    search_fields = ['student__name', 'student__student_id', 'reference_number']
+    autocomplete_fields = ['student', 'recorded_by']
+
+
+@admin.register(Term)
+class TermAdmin(LeanModelAdmin):
+    list_display = ['name', 'start_date', 'end_date']
+    search_fields = ['name']
+
+
+class FeeScheduleItemInline(admin.TabularInline):
+    model = FeeScheduleItem
+    extra = 1
+
+
+@admin.register(FeeSchedule)
+class FeeScheduleAdmin(LeanModelAdmin):
+    list_display = ['grade', 'term', 'due_date', 'is_active']
+    list_filter = ['term', 'is_active']
+    list_select_related = ['grade', 'term']
+    search_fields = ['grade__name', 'term__name']
+    autocomplete_fields = ['grade', 'term']
+    inlines = [FeeScheduleItemInline]
+
+
+class InvoiceLineInline(admin.TabularInline):
+    model = InvoiceLine
+    extra = 0
+
+
+@admin.register(Invoice)
+class InvoiceAdmin(LeanModelAdmin):
+    list_display = ['number', 'student', 'term', 'total', 'status', 'issued_on', 'due_date']
+    list_filter = ['status', 'term']
+    list_select_related = ['student', 'term']
+    search_fields = ['=number', 'student__name', 'student__student_id']
+    autocomplete_fields = ['student', 'term', 'schedule']
+    readonly_fields = ['applied']
+    inlines = [InvoiceLineInline]
+
+
+@admin.register(Subject)
+class SubjectAdmin(LeanModelAdmin):
+    list_display = ['name', 'code']
+    search_fields = ['name', 'code']
+
+
+@admin.register(Exam)
+class ExamAdmin(LeanModelAdmin):
+    list_display = ['name', 'grade', 'subject', 'term', 'date', 'max_marks']
+    list_filter = ['term', 'subject', 'grade']
+    list_select_related = ['grade', 'subject', 'term']
+    search_fields = ['name', 'subject__name', 'grade__name']
+    autocomplete_fields = ['grade', 'subject', 'term', 'event']
+
+
+@admin.register(Result)
+class ResultAdmin(LeanModelAdmin):
+    list_display = ['student', 'exam', 'marks', 'updated_at']
+    list_filter = ['exam__term', 'exam__subject']
+    list_select_related = ['student', 'exam__grade', 'exam__subject']
+    search_fields = ['student__name', 'student__student_id']
+    autocomplete_fields = ['exam', 'student']
+
+
+@admin.register(TeachingAssignment)
+class TeachingAssignmentAdmin(LeanModelAdmin):
+    list_display = ['grade', 'subject', 'teacher', 'periods_per_week']
+    list_filter = ['grade', 'subject']
+    list_select_related = ['grade', 'subject', 'teacher']
+    search_fields = ['teacher__name', 'subject__name', 'grade__name']
+    autocomplete_fields = ['teacher', 'grade', 'subject']
+
+
+@admin.register(Room)
+class RoomAdmin(LeanModelAdmin):
+    list_display = ['name', 'capacity']
+    search_fields = ['name']
+
+
+@admin.register(TimetableSlot)
+class TimetableSlotAdmin(LeanModelAdmin):
+    list_display = ['day', 'period', 'grade', 'subject', 'teacher', 'room']
+    list_filter = ['day', 'grade']
+    list_select_related = ['grade', 'subject', 'teacher', 'room']
+    search_fields = ['teacher__name', 'subject__name', 'grade__name']
+    autocomplete_fields = ['assignment', 'grade', 'teacher', 'subject', 'room']
+
+
+@admin.register(Guardian)
+class GuardianAdmin(LeanModelAdmin):
+    list_display = ['name', 'phone', 'email', 'school', 'updated_at']
+    list_select_related = ['school']
+    search_fields = ['name', 'phone', 'email', 'phone_key', 'email_key']
+    readonly_fields = ['phone_key', 'email_key']
+
+
+@admin.register(RollCall)
+class RollCallAdmin(LeanModelAdmin):
+    list_display = ['date', 'grade', 'present', 'absent', 'taken_by']
+    list_filter = ['term', 'grade']
+    list_select_related = ['grade', 'taken_by']
+    date_hierarchy = 'date'
+    autocomplete_fields = ['grade', 'term', 'taken_by']
+
+
+class ReadOnlyAdmin(LeanModelAdmin):
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(AuditLog)
+class AuditLogAdmin(ReadOnlyAdmin):
+    list_display = ['timestamp', 'action', 'model_name', 'object_id', 'object_repr', 'actor_repr']
+    list_filter = ['action', 'model_name']
+    search_fields = ['=object_id', 'actor_repr']
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ArchivedStudent)
+class ArchivedStudentAdmin(ReadOnlyAdmin):
+    list_display = ['name', 'student_id', 'grade_name', 'status', 'archived_at']
+    list_filter = ['status']
+    search_fields = ['name', 'student_id']
+
+
+@admin.register(ArchivedFeePayment)
+class ArchivedFeePaymentAdmin(ReadOnlyAdmin):
+    list_display = ['student', 'amount', 'payment_method', 'payment_date']
+    list_select_related = ['student']
+    search_fields = ['student__name', 'student__student_id']
+
+
+@admin.register(ArchivedInvoice)
+class ArchivedInvoiceAdmin(ReadOnlyAdmin):
+    list_display = ['number', 'student', 'term_name', 'total', 'status', 'due_date']
+    list_filter = ['status']
+    list_select_related = ['student']
+    search_fields = ['number', 'student__name', 'student__student_id']
+
+
+@admin.register(ArchivedResult)
+class ArchivedResultAdmin(ReadOnlyAdmin):
+    list_display = ['student', 'subject_name', 'exam_name', 'term_name', 'marks', 'max_marks']
+    list_select_related = ['student']
+    search_fields = ['student__name', 'student__student_id', 'subject_name']
+
+
+@admin.register(ArchivedAttendance)
+class ArchivedAttendanceAdmin(ReadOnlyAdmin):
+    list_display = ['student', 'term_name', 'days_present', 'days_recorded']
+    list_select_related = ['student']
+    search_fields = ['student__name', 'student__student_id']
+    exclude = ['present', 'recorded']
+
+
+@admin.register(ArchivedActivityParticipant)
+class ArchivedActivityParticipantAdmin(ReadOnlyAdmin):
+    list_display = ['student', 'activity_title', 'date_joined']
+    list_select_related = ['student']
+    search_fields = ['student__name', 'activity_title']
+
+
+@admin.register(StudentAttendance)
+class StudentAttendanceAdmin(ReadOnlyAdmin):
+    list_display = ['student', 'term', 'days_present', 'days_recorded', 'updated_at']
+    list_filter = ['term']
+    list_select_related = ['student', 'term']
+    search_fields = ['student__name', 'student__student_id']
+    exclude = ['present', 'recorded']
+
+
+@admin.register(Tombstone)
+class TombstoneAdmin(ReadOnlyAdmin):
+    list_display = ['model_name', 'object_id', 'school', 'deleted_at']
+    list_filter = ['model_name']
+    list_select_related = ['school']
+    search_fields = ['object_id']
+
+
+@admin.register(OutboxEvent)
+class OutboxEventAdmin(ReadOnlyAdmin):
+    list_display = ['id', 'topic', 'model_name', 'object_id', 'school_id', 'created_at']
+    list_filter = ['topic']
+    search_fields = ['object_id']
+
+
+@admin.register(OutboxCheckpoint)
+class OutboxCheckpointAdmin(LeanModelAdmin):
+    list_display = ['consumer', 'position', 'gap_count', 'delivered', 'updated_at']
+
+    @admin.display(description='Gaps')
+    def gap_count(self, obj):
+        return len(obj.gaps)
+
+
+@admin.register(Delivery)
+class DeliveryAdmin(ReadOnlyAdmin):
+    list_display = ['notification', 'channel', 'address', 'status', 'attempts', 'sent_at']
+    list_filter = ['channel', 'status']
+    list_select_related = ['notification']
+    search_fields = ['address']
+
+
+@admin.register(Document)
+class DocumentAdmin(ReadOnlyAdmin):
+    list_display = ['name', 'kind', 'student', 'staff', 'archived_student', 'content_type', 'size', 'uploaded_at']
+    list_filter = ['kind', 'content_type']
+    list_select_related = ['student', 'staff', 'archived_student']
+    search_fields = ['name', 'sha256', 'student__name', 'staff__name']
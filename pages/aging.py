@@ -0,0 +1,137 @@
+# aging.py
+"""
+Accounts-receivable aging report.
+
+A student's outstanding balance (fees_due - fees_paid) is aged by the due
+dates of what was billed: payments settle the oldest charges first, so what
+is still owed is the most recent invoices (applied, not void; due_date, else
+the issue date). Any part of fees_due no invoice accounts for (opening
+balances, fees added by hand) counts as due on the enrolment date. Each
+balance is split across the 30/60/90-day buckets (``owed_*``) and
+``bucket`` is where its oldest unpaid part falls. Bucketing, per-grade
+cumulative balances and the grouped totals all happen in SQL; Python never
+loops over students.
+"""
+from datetime import timedelta
+
+from django.db.models import (
+    Case, CharField, Count, DecimalField, F, OuterRef, Subquery, Sum, Value, When, Window,
+)
+from django.db.models.functions import Coalesce, Greatest, Least, RowNumber
+from django.utils import timezone
+
+from .models import FeePayment, Invoice, Student
+
+BUCKETS = [
+    ('current', '0-30 days'),
+    ('days_31_60', '31-60 days'),
+    ('days_61_90', '61-90 days'),
+    ('over_90', '90+ days'),
+]
+
+OWED = [f'owed_{key}' for key, _ in BUCKETS]  # per-student amount in each bucket
+
+MONEY = DecimalField(max_digits=12, decimal_places=2)
+ZERO = Value(0, output_field=MONEY)
+
+
+def _billed(since=None):
+    """A student's applied invoice total, only counting invoices due on or after ``since`` if given."""
+    invoices = (
+        Invoice.objects.filter(student_id=OuterRef('pk'), applied=True)
+        .exclude(status='void')
+        .annotate(due=Coalesce('due_date', 'issued_on'))
+    )
+    if since is not None:
+        invoices = invoices.filter(due__gte=since)
+    total = invoices.order_by().values('student_id').annotate(total=Sum('total')).values('total')
+    return Coalesce(Subquery(total, output_field=MONEY), ZERO)
+
+
+def _owed_since(since):
+    """How much of the outstanding balance fell due on or after ``since``."""
+    unbilled = Case(When(enrolled_on__gte=since, then=F('unbilled')), default=ZERO, output_field=MONEY)
+    return Least(F('outstanding'), _billed(since) + unbilled, output_field=MONEY)
+
+
+def _aged_students(as_of=None):
+    """Students with a positive balance, annotated with ``outstanding``, OWED amounts and ``bucket``."""
+    as_of = as_of or timezone.now().date()
+    last_payment = (
+        FeePayment.objects.filter(student_id=OuterRef('pk'))
+        .order_by('-payment_date')
+        .values('payment_date')[:1]
+    )
+    within = {days: _owed_since(as_of - timedelta(days=days)) for days in (30, 60, 90)}
+    return (
+        Student.objects
+        .annotate(outstanding=F('fees_due') - F('fees_paid'))
+        .filter(outstanding__gt=0)
+        .annotate(
+            last_payment=Subquery(last_payment),
+            unbilled=Greatest(F('fees_due') - _billed(), ZERO, output_field=MONEY),
+            owed_current=within[30],
+            owed_days_31_60=within[60] - within[30],
+            owed_days_61_90=within[90] - within[60],
+            owed_over_90=F('outstanding') - within[90],
+        )
+        .annotate(
+            bucket=Case(
+                When(owed_over_90__gt=0, then=Value('over_90')),
+                When(owed_days_61_90__gt=0, then=Value('days_61_90')),
+                When(owed_days_31_60__gt=0, then=Value('days_31_60')),
+                default=Value('current'),
+                output_field=CharField(),
+            ),
+        )
+        .order_by()
+    )
+
+
+def student_aging(as_of=None):
+    """Per-student aging rows.
+
+    Besides the bucket, each row carries ``cumulative_outstanding`` (running
+    total of balances within the grade, largest first) and ``grade_rank``.
+    """
+    by_grade_largest_first = {
+        'partition_by': [F('grade_id')],
+        'order_by': [F('outstanding').desc(), F('id').asc()],
+    }
+    return (
+        _aged_students(as_of)
+        .annotate(
+            cumulative_outstanding=Window(Sum('outstanding'), **by_grade_largest_first),
+            grade_rank=Window(RowNumber(), **by_grade_largest_first),
+        )
+        .values(
+            'id', 'student_id', 'name', 'grade__name', 'status', 'fees_due', 'fees_paid', 'outstanding',
+            'last_payment', *OWED, 'bucket', 'cumulative_outstanding', 'grade_rank',
+        )
+        .order_by('grade__name', 'grade_rank')
+    )
+
+
+def _bucket_sums():
+    sums = {
+        key: Coalesce(Sum(f'owed_{key}'), Value(0), output_field=MONEY)
+        for key, _ in BUCKETS
+    }
+    sums['total'] = Coalesce(Sum('outstanding'), Value(0), output_field=MONEY)
+    sums['students'] = Count('id')
+    return sums
+
+
+def grade_summary(as_of=None):
+    """One row per grade with the outstanding amount in each bucket."""
+    return (
+        _aged_students(as_of)
+        .values('grade_id', 'grade__name')
+        .annotate(**_bucket_sums())
+        .order_by('grade__name')
+    )
+
+
+def totals(as_of=None):
+    """School-wide outstanding amount per bucket."""
+    return _aged_students(as_of).aggregate(**_bucket_sums())
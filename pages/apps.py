@@ -4,3 +4,16 @@ from django.apps import AppConfig
 class PagesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "pages"
+
+    def ready(self):
+        from . import audit, capacity, db, guardians, live, outbox, roster, singleflight, sync, tenancy, workload  # noqa: F401  (db registers the SQLite pragma hook)
+        audit.connect_signals()
+        tenancy.connect_signals()
+        guardians.connect_signals()
+        capacity.connect_signals()
+        workload.connect_signals()
+        live.connect_signals()
+        singleflight.connect_signals()
+        sync.connect_signals()
+        outbox.connect_signals()
+        roster.connect_signals()
@@ -0,0 +1,222 @@
+# archive.py
+"""
+Hot/cold split for students who have left the school.
+
+Graduated and transferred students whose record has not changed for N years
+are copied, together with their FeePayment, Invoice, Result, StudentAttendance
+and ActivityParticipant history, into the Archived* tables and removed from
+the hot tables in batches. Their documents are re-pointed at the archived
+student rather than copied (the files are shared, see pages/documents.py). The
+lookup helpers below read from whichever side currently holds a student.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from . import audit, capacity
+from .models import (
+    ActivityParticipant, ArchivedActivityParticipant, ArchivedAttendance, ArchivedFeePayment, ArchivedInvoice,
+    ArchivedInvoiceLine, ArchivedResult, ArchivedStudent, Document, FeePayment, Invoice, InvoiceLine, Result,
+    Student, StudentAttendance,
+)
+
+ARCHIVABLE_STATUSES = ['graduated', 'transferred']
+DEFAULT_BATCH_SIZE = 500
+
+STUDENT_FIELDS = [
+    'id', 'school_id', 'name', 'student_id', 'grade_id', 'date_of_birth', 'gender', 'email', 'phone',
+    'address', 'parent_name', 'parent_phone', 'parent_email', 'fees_due', 'fees_paid',
+    'status', 'enrolled_on', 'created_at', 'updated_at',
+]
+PAYMENT_FIELDS = [
+    'id', 'student_id', 'amount', 'payment_method', 'reference_number', 'notes',
+    'payment_date', 'recorded_at', 'recorded_by_id',
+]
+RESULT_FIELDS = {
+    'exam_name': 'exam__name', 'subject_name': 'exam__subject__name', 'term_id': 'exam__term_id',
+    'term_name': 'exam__term__name', 'exam_date': 'exam__date', 'max_marks': 'exam__max_marks',
+}
+ATTENDANCE_FIELDS = ['id', 'student_id', 'present', 'recorded', 'days_present', 'days_recorded', 'term_id']
+INVOICE_FIELDS = ['id', 'student_id', 'number', 'term_id', 'total', 'status', 'issued_on', 'due_date', 'applied']
+
+
+def archivable_students(years):
+    """Students that left more than ``years`` years ago."""
+    cutoff = timezone.now() - timedelta(days=365 * years)
+    return Student.objects.filter(status__in=ARCHIVABLE_STATUSES).filter(
+        Q(updated_at__lt=cutoff) |
+        Q(updated_at__isnull=True, enrolled_on__lt=cutoff.date())
+    )
+
+
+def _archive_batch(ids):
+    students = list(Student.objects.filter(id__in=ids).values(*STUDENT_FIELDS, 'grade__name'))
+    payments = list(FeePayment.objects.filter(student_id__in=ids).values(*PAYMENT_FIELDS))
+    participants = list(
+        ActivityParticipant.objects.filter(student_id__in=ids)
+        .values('id', 'student_id', 'activity_id', 'activity__title', 'date_joined', 'is_active')
+    )
+    invoices = list(Invoice.all_objects.filter(student_id__in=ids).values(*INVOICE_FIELDS, 'term__name'))
+    lines = list(
+        InvoiceLine.objects.filter(invoice__student_id__in=ids).values('id', 'invoice_id', 'description', 'amount')
+    )
+    results = list(
+        Result.objects.filter(student_id__in=ids)
+        .values('id', 'student_id', 'exam_id', 'marks', **{name: F(path) for name, path in RESULT_FIELDS.items()})
+    )
+    attendance = list(
+        StudentAttendance.objects.filter(student_id__in=ids).values(*ATTENDANCE_FIELDS, term_name=F('term__name'))
+    )
+
+    ArchivedStudent.objects.bulk_create([
+        ArchivedStudent(grade_name=row.pop('grade__name') or '', **row) for row in students
+    ], ignore_conflicts=True)
+    ArchivedFeePayment.objects.bulk_create(
+        [ArchivedFeePayment(**row) for row in payments], ignore_conflicts=True
+    )
+    ArchivedActivityParticipant.objects.bulk_create([
+        ArchivedActivityParticipant(
+            id=row['id'],
+            student_id=row['student_id'],
+            activity_id=row['activity_id'],
+            activity_title=row['activity__title'],
+            date_joined=row['date_joined'],
+            is_active=row['is_active'],
+        ) for row in participants
+    ], ignore_conflicts=True)
+    ArchivedInvoice.objects.bulk_create([
+        ArchivedInvoice(term_name=row.pop('term__name'), **row) for row in invoices
+    ], ignore_conflicts=True)
+    ArchivedInvoiceLine.objects.bulk_create(
+        [ArchivedInvoiceLine(**row) for row in lines], ignore_conflicts=True
+    )
+    ArchivedResult.objects.bulk_create([ArchivedResult(**row) for row in results], ignore_conflicts=True)
+    ArchivedAttendance.objects.bulk_create(
+        [ArchivedAttendance(**row) for row in attendance], ignore_conflicts=True
+    )
+
+    # Before the delete below, which would otherwise cascade to them. archived_student_id
+    # is assigned first: MySQL evaluates SET left to right.
+    documents = Document.all_objects.filter(student_id__in=ids).update(
+        archived_student_id=F('student_id'), student=None,
+    )
+
+    # The archive copy is the audit record; don't log every cascaded row as deleted.
+    with audit.suppressed(), capacity.suppressed():
+        FeePayment.objects.filter(student_id__in=ids).delete()
+        ActivityParticipant.objects.filter(student_id__in=ids).delete()
+        InvoiceLine.objects.filter(invoice__student_id__in=ids).delete()
+        Invoice.all_objects.filter(student_id__in=ids).delete()
+        Result.objects.filter(student_id__in=ids).delete()
+        StudentAttendance.objects.filter(student_id__in=ids).delete()
+        Student.objects.filter(id__in=ids).delete()
+    audit.record_bulk(Student, ids, {'archived': True}, summary='Moved to archive')
+    capacity.recount({row['grade_id'] for row in students})
+
+    return {
+        'students': len(students),
+        'payments': len(payments),
+        'activities': len(participants),
+        'invoices': len(invoices),
+        'results': len(results),
+        'attendance': len(attendance),
+        'documents': documents,
+    }
+
+
+def archive_students(years, batch_size=DEFAULT_BATCH_SIZE, dry_run=False):
+    """Move archivable students and their history into the archive tables.
+
+    Each batch is its own transaction so a long run never holds locks on the
+    hot tables for more than one batch. Returns counts of moved rows.
+    """
+    queryset = archivable_students(years)
+    totals = dict.fromkeys(['students', 'payments', 'activities', 'invoices', 'results', 'attendance', 'documents'], 0)
+
+    if dry_run:
+        ids = queryset.values('id')
+        totals['students'] = queryset.count()
+        totals['payments'] = FeePayment.objects.filter(student_id__in=ids).count()
+        totals['activities'] = ActivityParticipant.objects.filter(student_id__in=ids).count()
+        totals['invoices'] = Invoice.objects.filter(student_id__in=ids).count()
+        totals['results'] = Result.objects.filter(student_id__in=ids).count()
+        totals['attendance'] = StudentAttendance.objects.filter(student_id__in=ids).count()
+        totals['documents'] = Document.objects.filter(student_id__in=ids).count()
+        return totals
+
+    while True:
+        with transaction.atomic():
+            ids = list(queryset.order_by('id').values_list('id', flat=True)[:batch_size])
+            if not ids:
+                break
+            moved = _archive_batch(ids)
+        for key, count in moved.items():
+            totals[key] += count
+    return totals
+
+
+# ============= UNIFIED READ PATH =============
+def find_student(pk):
+    """Return (student, archived) from the hot table or the archive, or (None, False)."""
+    student = Student.objects.select_related('grade').filter(pk=pk).first()
+    if student is not None:
+        return student, False
+    archived = ArchivedStudent.objects.filter(pk=pk).first()
+    return archived, archived is not None
+
+
+def payment_history(pk, archived=None):
+    """Payments for a hot or archived student, newest first."""
+    if archived is None:
+        archived = not Student.objects.filter(pk=pk).exists()
+    model = ArchivedFeePayment if archived else FeePayment
+    return model.objects.filter(student_id=pk).order_by('-payment_date', '-id')
+
+
+def activity_history(pk, archived=None):
+    """(activity title, date joined, is active) rows for a hot or archived student."""
+    if archived is None:
+        archived = not Student.objects.filter(pk=pk).exists()
+    if archived:
+        return ArchivedActivityParticipant.objects.filter(student_id=pk).values_list(
+            'activity_title', 'date_joined', 'is_active')
+    return ActivityParticipant.objects.filter(student_id=pk).values_list(
+        'activity__title', 'date_joined', 'is_active')
+
+
+def invoice_history(pk, archived=None):
+    """Invoices (with their lines) for a hot or archived student, newest first."""
+    if archived is None:
+        archived = not Student.objects.filter(pk=pk).exists()
+    if archived:
+        return ArchivedInvoice.objects.filter(student_id=pk).prefetch_related('lines')
+    return Invoice.objects.filter(student_id=pk).select_related('term').prefetch_related('lines')
+
+
+def result_history(pk, archived=None):
+    """(subject, exam, term, date, marks, max marks) rows for a hot or archived student, newest first."""
+    if archived is None:
+        archived = not Student.objects.filter(pk=pk).exists()
+    if archived:
+        return ArchivedResult.objects.filter(student_id=pk).values_list(
+            'subject_name', 'exam_name', 'term_name', 'exam_date', 'marks', 'max_marks')
+    return Result.objects.filter(student_id=pk).order_by('-exam__date', 'exam__subject__name').values_list(
+        'exam__subject__name', 'exam__name', 'exam__term__name', 'exam__date', 'marks', 'exam__max_marks')
+
+
+def attendance_history(pk, archived=None):
+    """(term, days present, days recorded) rows for a hot or archived student."""
+    if archived is None:
+        archived = not Student.objects.filter(pk=pk).exists()
+    if archived:
+        return ArchivedAttendance.objects.filter(student_id=pk).values_list(
+            'term_name', 'days_present', 'days_recorded')
+    return StudentAttendance.objects.filter(student_id=pk).order_by('term__start_date').values_list(
+        'term__name', 'days_present', 'days_recorded')
+
+
+def documents(pk):
+    """Documents of a hot or archived student, newest first."""
+    return Document.objects.filter(Q(student_id=pk) | Q(archived_student_id=pk))
@@ -0,0 +1,174 @@
+# attendance.py
+"""
+Attendance stored as one bitmap per student per term.
+
+Instead of a row per student per day, StudentAttendance keeps two little-endian
+bitmaps for the term: ``recorded`` has bit n set once day n (counted from
+term.start_date) was taken, ``present`` if the student was there. A term of
+~200 days is 25 bytes per bitmap. Their popcounts are cached in
+days_present/days_recorded so term rates aggregate in SQL; rates over a date
+window AND the bitmaps with a mask and use int.bit_count(). RollCall keeps
+one row per grade per day with the present/absent counts for daily figures.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from .models import Grade, RollCall, Student, StudentAttendance, Term
+
+CHRONIC_ABSENCE_RATE = 0.9
+
+
+class AttendanceError(Exception):
+    pass
+
+
+def term_for(day):
+    """The term containing ``day``, or None."""
+    return Term.objects.filter(start_date__lte=day, end_date__gte=day).order_by('-start_date').first()
+
+
+def day_index(term, day):
+    if not term.start_date <= day <= term.end_date:
+        raise AttendanceError(f'{day} is outside {term}')
+    return (day - term.start_date).days
+
+
+def to_int(bitmap):
+    return int.from_bytes(bytes(bitmap or b''), 'little')
+
+
+def to_bytes(value):
+    return value.to_bytes((value.bit_length() + 7) // 8, 'little')
+
+
+def window_mask(term, start, end):
+    """Bitmask selecting the days from ``start`` to ``end`` (inclusive) of ``term``."""
+    start, end = max(start, term.start_date), min(end, term.end_date)
+    if start > end:
+        return 0
+    first, last = day_index(term, start), day_index(term, end)
+    return ((1 << (last - first + 1)) - 1) << first
+
+
+def _rate(present, recorded):
+    return round(present / recorded, 4) if recorded else None
+
+
+def mark_grade(grade, day=None, absent_ids=(), taken_by=None):
+    """Take the roll for every active student in ``grade`` on ``day``.
+
+    Students in ``absent_ids`` are marked absent, everyone else present.
+    Marking the same day again overwrites the earlier roll call.
+    """
+    day = day or timezone.now().date()
+    term = term_for(day)
+    if term is None:
+        raise AttendanceError(f'No term covers {day}')
+    bit = 1 << day_index(term, day)
+    absent_ids = {int(i) for i in absent_ids}
+
+    with transaction.atomic():
+        student_ids = list(
+            Student.objects.filter(grade=grade, status='active').order_by().values_list('id', flat=True)
+        )
+        if not student_ids:
+            raise AttendanceError(f'{grade} has no active students')
+        existing = {
+            row.student_id: row
+            for row in StudentAttendance.objects.filter(term=term, student_id__in=student_ids)
+            .only('student_id', 'present', 'recorded')
+        }
+
+        rows = []
+        for student_id in student_ids:
+            row = existing.get(student_id)
+            present = to_int(row.present) if row else 0
+            recorded = (to_int(row.recorded) if row else 0) | bit
+            present = present & ~bit if student_id in absent_ids else present | bit
+            rows.append(StudentAttendance(
+                student_id=student_id,
+                term=term,
+                present=to_bytes(present),
+                recorded=to_bytes(recorded),
+                days_present=present.bit_count(),
+                days_recorded=recorded.bit_count(),
+            ))
+        # One INSERT ... ON CONFLICT DO UPDATE (ON DUPLICATE KEY UPDATE on MySQL) per batch.
+        StudentAttendance.objects.bulk_create(
+            rows,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['student', 'term'],
+            update_fields=['present', 'recorded', 'days_present', 'days_recorded', 'updated_at'],
+        )
+        absent = len(absent_ids.intersection(student_ids))
+        roll_call, _ = RollCall.objects.update_or_create(
+            grade=grade, date=day,
+            defaults={'term': term, 'present': len(student_ids) - absent, 'absent': absent, 'taken_by': taken_by},
+        )
+    return roll_call
+
+
+def grade_summary(grade, term=None, recent_days=7):
+    """Term-to-date attendance for a grade: overall, last ``recent_days``, per day and per student."""
+    today = timezone.now().date()
+    term = term or term_for(today)
+    if term is None:
+        return None
+
+    rows = list(
+        StudentAttendance.objects.filter(term=term, student__grade=grade)
+        .select_related('student').order_by('student__name')
+    )
+    mask = window_mask(term, today - timedelta(days=recent_days - 1), today)
+    recent_present = recent_recorded = 0
+    students = []
+    for row in rows:
+        present, recorded = to_int(row.present), to_int(row.recorded)
+        recent_present += (present & mask).bit_count()
+        recent_recorded += (recorded & mask).bit_count()
+        students.append({
+            'id': row.student_id,
+            'name': row.student.name,
+            'days_present': row.days_present,
+            'days_recorded': row.days_recorded,
+            'rate': _rate(row.days_present, row.days_recorded),
+        })
+
+    days_present = sum(s['days_present'] for s in students)
+    days_recorded = sum(s['days_recorded'] for s in students)
+    return {
+        'term': term.name,
+        'rate': _rate(days_present, days_recorded),
+        'recent_rate': _rate(recent_present, recent_recorded),
+        'days': list(
+            RollCall.objects.filter(grade=grade, term=term).order_by('date').values('date', 'present', 'absent')
+        ),
+        'students': students,
+        'chronic_absentees': [
+            s for s in students if s['rate'] is not None and s['rate'] < CHRONIC_ABSENCE_RATE
+        ],
+    }
+
+
+def school_rates(day=None):
+    """Attendance rate for ``day`` (from roll calls) and term to date (from the bitmap popcounts)."""
+    day = day or timezone.now().date()
+    grades = Grade.objects.all()
+    today = RollCall.objects.filter(date=day, grade__in=grades).aggregate(
+        present=Sum('present'), absent=Sum('absent'),
+    )
+    term = term_for(day)
+    term_totals = {}
+    if term is not None:
+        term_totals = StudentAttendance.objects.filter(term=term, student__grade__in=grades).aggregate(
+            present=Sum('days_present'), recorded=Sum('days_recorded'),
+        )
+    present_today = today['present'] or 0
+    return {
+        'attendance_today': _rate(present_today, present_today + (today['absent'] or 0)),
+        'attendance_term': _rate(term_totals.get('present') or 0, term_totals.get('recorded') or 0),
+    }
@@ -0,0 +1,263 @@
+# audit.py
+"""
+Field-level audit trail for the core school records.
+
+Changes are picked up from model signals, buffered in memory per worker and
+written to AuditLog with one bulk insert when the request finishes or when the
+flush timer fires, so a save never pays for a second synchronous INSERT.
+"""
+import atexit
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.apps import apps
+from django.conf import settings
+from django.core.signals import request_finished
+from django.db import connection, transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+TRACKED_MODELS = ['Student', 'Staff', 'Grade', 'FeePayment', 'Notification']
+
+FLUSH_INTERVAL = getattr(settings, 'AUDIT_FLUSH_INTERVAL', 5.0)  # seconds
+MAX_BUFFERED = getattr(settings, 'AUDIT_MAX_BUFFERED', 500)
+
+_actor = ContextVar('audit_actor', default=None)
+_suppressed = ContextVar('audit_suppressed', default=False)
+
+
+class AuditBuffer:
+    """Per-worker queue of pending AuditLog rows."""
+
+    def __init__(self):
+        self._entries = []
+        self._lock = threading.Lock()
+        self._timer = None
+
+    def add(self, entry):
+        with self._lock:
+            self._entries.append(entry)
+            size = len(self._entries)
+            if self._timer is None:
+                self._timer = threading.Timer(FLUSH_INTERVAL, self._flush_from_timer)
+                self._timer.daemon = True
+                self._timer.start()
+        if size >= MAX_BUFFERED:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            entries, self._entries = self._entries, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not entries:
+            return 0
+
+        from .models import AuditLog
+        try:
+            AuditLog.objects.bulk_create(entries, batch_size=MAX_BUFFERED)
+        except Exception:
+            logger.exception('Dropped %d audit entries', len(entries))
+            return 0
+        return len(entries)
+
+    def _flush_from_timer(self):
+        try:
+            self.flush()
+        finally:
+            # The timer thread owns its own connection; don't leak it.
+            connection.close()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+buffer = AuditBuffer()
+
+
+# ============= CONTEXT =============
+def set_actor(user):
+    """Attribute subsequent changes in this context to ``user``."""
+    return _actor.set(user)
+
+
+def reset_actor(token):
+    _actor.reset(token)
+
+
+@contextmanager
+def suppressed():
+    """Skip per-row auditing, e.g. inside bulk jobs that call record_bulk()."""
+    token = _suppressed.set(True)
+    try:
+        yield
+    finally:
+        _suppressed.reset(token)
+
+
+class AuditActorMiddleware:
+    """Expose request.user to the audit signal handlers."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        # request.user stays lazy until something is actually audited.
+        token = set_actor(getattr(request, 'user', None))
+        try:
+            return self.get_response(request)
+        finally:
+            reset_actor(token)
+
+
+# ============= CAPTURE =============
+def _jsonable(value):
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+def _attnames(model):
+    # updated_at/created_at churn on every save and carry no information.
+    return [
+        f.attname for f in model._meta.concrete_fields
+        if not f.primary_key and f.name not in ('created_at', 'updated_at')
+    ]
+
+
+def _snapshot(instance):
+    # Deferred fields are left out rather than recorded as None.
+    values = instance.__dict__
+    return {name: values[name] for name in _attnames(type(instance)) if name in values}
+
+
+def _current_actor():
+    actor = _actor.get()
+    if actor is None or not actor.is_authenticated:
+        return None
+    return actor
+
+
+def _entry(instance, action, changes):
+    from .models import AuditLog
+    actor = _current_actor()
+    return AuditLog(
+        model_name=instance._meta.object_name,
+        object_id=str(instance.pk),
+        object_repr=str(instance)[:200],
+        action=action,
+        changes=changes,
+        actor=actor,
+        actor_repr=actor.get_username() if actor is not None else '',
+        timestamp=timezone.now(),
+    )
+
+
+def _enqueue(entry):
+    # Only keep the entry if the surrounding transaction actually commits.
+    transaction.on_commit(lambda: buffer.add(entry))
+
+
+def record_bulk(model, object_ids, changes, summary=''):
+    """Record one entry per object for a set-based UPDATE that bypassed save()."""
+    from .models import AuditLog
+    actor = _current_actor()
+    now = timezone.now()
+    changes = {name: [None, _jsonable(value)] for name, value in changes.items()}
+    for object_id in object_ids:
+        _enqueue(AuditLog(
+            model_name=model._meta.object_name,
+            object_id=str(object_id),
+            object_repr=summary[:200],
+            action='bulk',
+            changes=changes,
+            actor=actor,
+            actor_repr=actor.get_username() if actor is not None else '',
+            timestamp=now,
+        ))
+
+
+def _on_init(sender, instance, **kwargs):
+    instance._audit_snapshot = _snapshot(instance)
+
+
+def _on_save(sender, instance, created, raw=False, **kwargs):
+    current = _snapshot(instance)
+    previous = getattr(instance, '_audit_snapshot', {})
+    instance._audit_snapshot = current
+    if raw or _suppressed.get():
+        return
+
+    if created:
+        changes = {k: [None, _jsonable(v)] for k, v in current.items() if v not in (None, '')}
+    else:
+        changes = {
+            k: [_jsonable(previous.get(k)), _jsonable(v)]
+            for k, v in current.items() if k in previous and previous[k] != v
+        }
+        if not changes:
+            return
+    _enqueue(_entry(instance, 'create' if created else 'update', changes))
+
+
+def _on_delete(sender, instance, **kwargs):
+    if _suppressed.get():
+        return
+    previous = getattr(instance, '_audit_snapshot', None) or _snapshot(instance)
+    changes = {k: [_jsonable(v), None] for k, v in previous.items() if v not in (None, '')}
+    _enqueue(_entry(instance, 'delete', changes))
+
+
+def _on_request_finished(sender, **kwargs):
+    buffer.flush()
+
+
+def connect_signals():
+    for name in TRACKED_MODELS:
+        model = apps.get_model('pages', name)
+        uid = f'audit:{name}'
+        post_init.connect(_on_init, sender=model, dispatch_uid=uid)
+        post_save.connect(_on_save, sender=model, dispatch_uid=uid)
+        post_delete.connect(_on_delete, sender=model, dispatch_uid=uid)
+    request_finished.connect(_on_request_finished, dispatch_uid='audit:flush')
+    atexit.register(buffer.flush)
+
+
+# ============= QUERIES =============
+def history_for(model_name, object_id, limit=50):
+    """Newest-first history of one object (uses the model_name/object_id index)."""
+    from .models import AuditLog
+    return (AuditLog.objects
+            .filter(model_name=model_name, object_id=str(object_id))
+            .select_related('actor')[:limit])
+
+
+def history_by_actor(actor_id, limit=50):
+    """Newest-first changes made by one user (uses the actor index)."""
+    from .models import AuditLog
+    return AuditLog.objects.filter(actor_id=actor_id).select_related('actor')[:limit]
+
+
+def serialize(entry):
+    return {
+        'id': entry.id,
+        'model': entry.model_name,
+        'object_id': entry.object_id,
+        'object': entry.object_repr,
+        'action': entry.action,
+        'changes': entry.changes,
+        'actor': entry.actor_repr or None,
+        'actor_id': entry.actor_id,
+        'timestamp': entry.timestamp.isoformat(),
+    }
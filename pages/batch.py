@@ -0,0 +1,177 @@
+# batch.py
+"""
+Several API calls in one round trip.
+
+A batch is a list of sub-requests ``{"id", "method", "path", "params"}`` for
+the JSON endpoints under /api/. They are dispatched straight to their view
+functions inside the batch request, which has already been through the
+middleware (session, auth, CSRF, tenancy), so each sub-request skips that
+overhead and runs for the batch's user and school.
+
+Runs of consecutive GETs are read-only and execute concurrently on a small
+thread pool, each thread with its own database connection (closed when its
+call finishes); a POST is a barrier and runs alone, in order. Every
+sub-request gets its own DataLoader, so nothing loaded before a POST is
+reused after it. Identical GETs (same path and parameters) with no POST
+between them are executed once and the response is shared. Sub-responses are
+spliced into the combined JSON body without being decoded again.
+"""
+import contextvars
+import copy
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode, urlsplit
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import connection
+from django.http import Http404, QueryDict
+from django.urls import Resolver404, resolve
+from django.utils.datastructures import MultiValueDict
+
+from .loader import DataLoader
+
+logger = logging.getLogger(__name__)
+
+MAX_REQUESTS = getattr(settings, 'BATCH_MAX_REQUESTS', 20)
+MAX_WORKERS = getattr(settings, 'BATCH_MAX_WORKERS', 4)
+PREFIX = '/api/'
+METHODS = ('GET', 'POST')
+
+
+class BatchError(Exception):
+    pass
+
+
+class SubRequest:
+    def __init__(self, index, spec):
+        if not isinstance(spec, dict):
+            raise BatchError(f'Request {index} must be an object')
+        self.id = spec.get('id', index)
+        self.method = str(spec.get('method', 'GET')).upper()
+        if self.method not in METHODS:
+            raise BatchError(f'Request {self.id}: method must be GET or POST')
+        url = urlsplit(str(spec.get('path', '')))
+        self.path = url.path
+        if not self.path.startswith(PREFIX) or self.path.rstrip('/') == f'{PREFIX}batch':
+            raise BatchError(f'Request {self.id}: path must be an API endpoint other than {PREFIX}batch/')
+        params = spec.get('params') or {}
+        if not isinstance(params, dict):
+            raise BatchError(f'Request {self.id}: params must be an object')
+        self.params = QueryDict(url.query, mutable=True)
+        for key, value in params.items():
+            self.params.setlist(key, [str(v) for v in value] if isinstance(value, list) else [str(value)])
+        try:
+            self.match = resolve(self.path)
+        except Resolver404:
+            raise BatchError(f'Request {self.id}: no endpoint at {self.path}')
+        if iscoroutinefunction(self.match.func):
+            raise BatchError(f'Request {self.id}: streaming endpoints cannot be batched')
+
+    @property
+    def key(self):
+        return self.method, self.path, self.params.urlencode()
+
+    def build(self, request):
+        """A copy of the batch request addressed to this sub-request's view."""
+        sub = copy.copy(request)
+        query = self.params.urlencode() if self.method == 'GET' else ''
+        sub.method = self.method
+        sub.path = sub.path_info = self.path
+        sub.META = {
+            **request.META, 'REQUEST_METHOD': self.method, 'PATH_INFO': self.path, 'QUERY_STRING': query,
+        }
+        sub.GET = QueryDict(query)
+        sub._post = self.params if self.method == 'POST' else QueryDict()
+        sub._files = MultiValueDict()
+        sub._body = urlencode(list(self.params.lists()), doseq=True).encode() if self.method == 'POST' else b''
+        sub.resolver_match = self.match
+        # Its own memo: datasets loaded before a POST must not be served after it,
+        # and the loader is not shared between threads.
+        sub.loader = DataLoader()
+        return sub
+
+
+def _error(status, message):
+    return status, json.dumps({'error': message}).encode()
+
+
+def _call(request, sub):
+    """(status, JSON bytes) for one sub-request."""
+    try:
+        response = sub.match.func(sub.build(request), *sub.match.args, **sub.match.kwargs)
+    except Http404 as e:
+        return _error(404, str(e) or 'Not found')
+    except Exception:
+        logger.exception('Batched request to %s failed', sub.path)
+        return _error(500, 'Internal error')
+    if response.streaming or 'json' not in response.get('Content-Type', ''):
+        return _error(400, f'{sub.path} did not return JSON')
+    return response.status_code, response.content
+
+
+def _call_in_thread(context, request, sub):
+    try:
+        return context.run(_call, request, sub)  # keeps the active school
+    finally:
+        connection.close()  # this thread's own connection
+
+
+def parse(body):
+    """The SubRequests of a batch body ``{"requests": [...]}``."""
+    try:
+        specs = json.loads(body)['requests']
+    except (ValueError, KeyError, TypeError):
+        raise BatchError('Expected a JSON body {"requests": [...]}')
+    if not isinstance(specs, list) or not specs:
+        raise BatchError('"requests" must be a non-empty list')
+    if len(specs) > MAX_REQUESTS:
+        raise BatchError(f'At most {MAX_REQUESTS} requests per batch')
+    subs = [SubRequest(index, spec) for index, spec in enumerate(specs)]
+    if len({sub.id for sub in subs}) != len(subs):
+        raise BatchError('Request ids must be unique')
+    return subs
+
+
+def execute(request, subs):
+    """Run the sub-requests; returns (results in request order, number deduplicated)."""
+    results = {}
+    shared = {}  # key of a GET -> index of the sub-request that runs it
+    aliases = {}  # index of a duplicate GET -> index of the one that runs
+    reads = []
+
+    def flush(pool):
+        if len(reads) == 1:
+            results[reads[0]] = _call(request, subs[reads[0]])
+        elif reads:
+            futures = {
+                i: pool.submit(_call_in_thread, contextvars.copy_context(), request, subs[i]) for i in reads
+            }
+            for i, future in futures.items():
+                results[i] = future.result()
+        reads.clear()
+
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='batch') as pool:
+        for i, sub in enumerate(subs):
+            if sub.method != 'GET':
+                flush(pool)
+                shared.clear()  # a write may change what an identical GET returns
+                results[i] = _call(request, sub)
+            elif sub.key in shared:
+                aliases[i] = shared[sub.key]
+            else:
+                shared[sub.key] = i
+                reads.append(i)
+        flush(pool)
+
+    return [results[aliases.get(i, i)] for i in range(len(subs))], len(aliases)
+
+
+def render(subs, results, deduplicated):
+    """The combined JSON body, with each sub-response's bytes embedded as-is."""
+    parts = [
+        b'{"id":%s,"status":%d,"body":%s}' % (json.dumps(sub.id).encode(), status, content)
+        for sub, (status, content) in zip(subs, results)
+    ]
+    return b'{"responses":[%s],"deduplicated":%d}' % (b','.join(parts), deduplicated)
@@ -0,0 +1,179 @@
+# bulk.py
+"""
+Set-based bulk actions on students.
+
+Every action turns a filter (grade, status, id list) into a handful of UPDATE
+statements instead of one save() per student, runs inside a single
+transaction (together with its audit and outbox rows) and can be executed as
+a dry run that reports the affected counts and rolls back.
+"""
+from collections import Counter
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from . import audit, capacity, outbox, singleflight, workload
+from .models import STATUS_CHOICES, Grade, Student
+
+ACTIONS = ['promote', 'add_fees', 'set_status']
+
+
+class BulkActionError(Exception):
+    pass
+
+
+class _DryRun(Exception):
+    pass
+
+
+def filter_students(grade=None, status=None, ids=None):
+    """Queryset for the students a bulk action applies to."""
+    students = Student.objects.all()
+    if grade:
+        students = students.filter(grade_id=grade)
+    if status:
+        students = students.filter(status=status)
+    if ids:
+        students = students.filter(id__in=ids)
+    return students
+
+
+def _promotion_plan(students):
+    """Map each selected grade id to (level, grade its students move into or None to graduate)."""
+    # Only active students take a seat; graduates stay in the top grade's rows.
+    grades = {g.id: g for g in Grade.objects.annotate(enrolled=Count('student', filter=Q(student__status='active')))}
+    # Levels are per school: Grade 4 of one campus never receives another campus's Grade 3.
+    by_level = {(g.school_id, g.level): g for g in grades.values() if g.level is not None}
+    top_level = {}
+    for school_id, level in by_level:
+        top_level[school_id] = max(level, top_level.get(school_id, level))
+
+    selected = Counter(dict(
+        students.order_by().values_list('grade_id').annotate(n=Count('id'))
+    ))
+    seated = Counter(dict(
+        students.filter(status='active').order_by().values_list('grade_id').annotate(n=Count('id'))
+    ))
+
+    plan, skipped = {}, 0
+    for grade_id, count in selected.items():
+        grade = grades[grade_id]
+        target = by_level.get((grade.school_id, grade.level + 1)) if grade.level is not None else None
+        if grade.level is None or (target is None and grade.level != top_level[grade.school_id]):
+            # Unsequenced grade or a gap (e.g. no Grade 5 yet): leave them where they are.
+            skipped += count
+            continue
+        plan[grade_id] = (grade.level, target)
+
+    # Projected headcount of every receiving grade after the move.
+    projected = {}
+    for grade_id, (level, target) in plan.items():
+        if target is not None:
+            projected.setdefault(target.id, target.enrolled)
+            projected[target.id] += seated[grade_id]
+    for grade_id in plan:
+        if grade_id in projected:
+            projected[grade_id] -= seated[grade_id]
+    full = [
+        f"{grades[gid].name} ({count}/{grades[gid].capacity})"
+        for gid, count in projected.items() if count > grades[gid].capacity
+    ]
+    return plan, skipped, full
+
+
+def promote(students, enforce_capacity=True):
+    """Move every selected student one grade up; the top grade graduates."""
+    plan, skipped, full = _promotion_plan(students)
+    if enforce_capacity and full:
+        raise BulkActionError('Promotion would exceed capacity for: ' + ', '.join(full))
+
+    now = timezone.now()
+    promoted = graduated = 0
+    # Highest level first, so students that just moved up are not moved again.
+    for grade_id, (level, target) in sorted(plan.items(), key=lambda item: item[1][0], reverse=True):
+        in_grade = students.filter(grade_id=grade_id)
+        ids = list(in_grade.values_list('id', flat=True))
+        if target is None:
+            changes = {'status': 'graduated'}
+            outbox.student_statuses_changed(in_grade, 'graduated')
+            graduated += in_grade.update(status='graduated', updated_at=now)
+        else:
+            changes = {'grade_id': target.id}
+            promoted += in_grade.update(grade_id=target.id, updated_at=now)
+        audit.record_bulk(Student, ids, changes, summary='Graduated' if target is None else 'Promoted')
+
+    capacity.recount()
+    transaction.on_commit(workload.invalidate)  # UPDATEs send no signals
+
+    return {'affected': promoted + graduated, 'promoted': promoted,
+            'graduated': graduated, 'skipped': skipped}
+
+
+def add_fees(students, amount):
+    """Add a term fee to fees_due for every selected student."""
+    try:
+        amount = Decimal(str(amount))
+    except (InvalidOperation, TypeError):
+        raise BulkActionError(f'Invalid amount: {amount}')
+    if not amount.is_finite():
+        raise BulkActionError(f'Invalid amount: {amount}')
+    field = Student._meta.get_field('fees_due')
+    if abs(amount) >= 10 ** (field.max_digits - field.decimal_places):
+        raise BulkActionError(f'Amount is too large: {amount}')
+    amount = amount.quantize(Decimal('0.01'))
+    if amount <= 0:
+        raise BulkActionError('Amount must be positive')
+
+    ids = list(students.values_list('id', flat=True))
+    affected = students.update(fees_due=F('fees_due') + amount, updated_at=timezone.now())
+    audit.record_bulk(Student, ids, {'fees_due_added': amount}, summary='Term fees applied')
+    return {'affected': affected, 'amount': amount}
+
+
+def set_status(students, status):
+    """Set the status of every selected student."""
+    if status not in dict(STATUS_CHOICES):
+        raise BulkActionError(f'Invalid status: {status}')
+
+    students = students.exclude(status=status)
+    ids = list(students.values_list('id', flat=True))
+    grade_ids = set(Student.objects.filter(id__in=ids).values_list('grade_id', flat=True))
+    outbox.student_statuses_changed(students, status)
+    affected = students.update(status=status, updated_at=timezone.now())
+    audit.record_bulk(Student, ids, {'status': status}, summary='Status changed')
+    capacity.recount(grade_ids)  # seats taken or released
+    transaction.on_commit(workload.invalidate)  # UPDATEs send no signals
+    return {'affected': affected, 'status': status}
+
+
+def run(action, grade=None, status=None, ids=None, dry_run=False, **params):
+    """Apply ``action`` to the filtered students in one transaction."""
+    if action not in ACTIONS:
+        raise BulkActionError(f'Unknown action: {action}')
+    if action == 'promote' and status is None:
+        # Graduated/transferred students stay where they left off.
+        status = 'active'
+    students = filter_students(grade=grade, status=status, ids=ids)
+
+    result = None
+    try:
+        with transaction.atomic():
+            # Bulk UPDATEs send no signals: forget the cached reports they change.
+            school_ids = set(students.order_by().values_list('school_id', flat=True).distinct())
+            transaction.on_commit(lambda: singleflight.forget_for(Student, school_ids))
+            if action == 'promote':
+                result = promote(students, enforce_capacity=params.get('enforce_capacity', True))
+            elif action == 'add_fees':
+                result = add_fees(students, params.get('amount'))
+            else:
+                result = set_status(students, params.get('new_status'))
+            if dry_run:
+                # Roll back the real UPDATEs; their row counts are the report.
+                raise _DryRun
+    except _DryRun:
+        pass
+
+    result.update({'action': action, 'dry_run': dry_run})
+    return result
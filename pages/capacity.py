@@ -0,0 +1,234 @@
+# capacity.py
+"""
+Grade capacity enforcement and next-year rollover planning.
+
+Grade.enrolled_count is a denormalised headcount of active students.
+Admissions lock the grade row (SELECT ... FOR UPDATE), check the counter
+against Grade.capacity and bump it in the same transaction, so concurrent
+admissions can't overfill a grade and nobody has to COUNT(*) the student
+table to know what's left. Any other save or delete of a student (the
+admin, the views, the shell) is caught by signals that recount the grades
+it touches: created, deleted, moved to another grade, or leaving
+(graduated, transferred, inactive). Bulk updates call recount() instead.
+"""
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, Q, Value, When
+from django.db.models.signals import post_delete, post_init, post_save
+
+from . import guardians
+from .models import Grade, Student
+
+UNDER_SUBSCRIBED_RATIO = 0.75
+
+_suppressed = ContextVar('capacity_suppressed', default=False)
+
+
+class CapacityError(Exception):
+    pass
+
+
+def _locked_grades(grade_ids):
+    # Lock in id order so two batch admissions can't deadlock each other.
+    return {g.id: g for g in Grade.objects.select_for_update().filter(id__in=grade_ids).order_by('id')}
+
+
+def admit(grade_id, **fields):
+    """Create a student in ``grade_id`` if the grade has a free spot."""
+    with transaction.atomic():
+        grade = _locked_grades([grade_id]).get(int(grade_id))
+        if grade is None:
+            raise CapacityError('Grade not found')
+        if grade.enrolled_count >= grade.capacity:
+            raise CapacityError(f'{grade.name} is full ({grade.enrolled_count}/{grade.capacity})')
+        student = Student.objects.create(grade=grade, **fields)  # counted by _student_saved
+    return student
+
+
+def admit_many(applications):
+    """Admit a batch of students in one transaction.
+
+    ``applications`` is a list of dicts of Student fields including ``grade_id``.
+    Applicants are taken in order until their grade is full. Returns
+    ``(admitted, rejected)`` lists.
+    """
+    admitted, rejected = [], []
+    with transaction.atomic():
+        grades = _locked_grades({int(a['grade_id']) for a in applications})
+        free = {gid: g.capacity - g.enrolled_count for gid, g in grades.items()}
+
+        for application in applications:
+            grade_id = int(application['grade_id'])
+            if free.get(grade_id, 0) > 0:
+                free[grade_id] -= 1
+                admitted.append(application)
+            else:
+                rejected.append(application)
+
+        student_ids = Student.generate_student_ids(len(admitted))
+        students = [
+            Student(**dict(
+                application,
+                grade_id=int(application['grade_id']),
+                school_id=grades[int(application['grade_id'])].school_id,
+                student_id=student_id,
+            ))
+            for application, student_id in zip(admitted, student_ids)
+        ]
+        Student.objects.bulk_create(students, batch_size=1000)
+        # bulk_create skips the pre_save hook that links students to guardians.
+        guardians.link_guardians(Student.objects.filter(student_id__in=student_ids))
+
+        added = defaultdict(int)
+        for student in students:
+            added[student.grade_id] += 1
+        _add_to_counters(added)
+    return students, rejected
+
+
+def transfer(student, grade_id):
+    """Move ``student`` to another grade, respecting the target's capacity."""
+    grade_id = int(grade_id)
+    if grade_id == student.grade_id:
+        return student
+    with transaction.atomic():
+        grades = _locked_grades([grade_id, student.grade_id])
+        target = grades[grade_id]
+        if student.status == 'active':  # only active students hold a seat
+            if target.enrolled_count >= target.capacity:
+                raise CapacityError(f'{target.name} is full ({target.enrolled_count}/{target.capacity})')
+        student.grade = target
+        student.save()  # both grades are recounted by _student_saved
+    return student
+
+
+def _add_to_counters(deltas):
+    deltas = {gid: d for gid, d in deltas.items() if d}
+    if not deltas:
+        return
+    Grade.objects.filter(id__in=deltas).update(enrolled_count=Case(
+        *[When(id=gid, then=F('enrolled_count') + Value(d)) for gid, d in deltas.items()],
+        output_field=IntegerField(),
+    ))
+
+
+def recount(grade_ids=None):
+    """Resynchronise enrolled_count (active students) from the student table with one grouped query."""
+    grades = Grade.objects.all() if grade_ids is None else Grade.objects.filter(id__in=grade_ids)
+    counts = dict(
+        Student.objects.filter(grade__in=grades, status='active').order_by()
+        .values_list('grade_id').annotate(n=Count('id'))
+    )
+    ids = list(grades.values_list('id', flat=True))
+    if not ids:
+        return 0
+    return Grade.objects.filter(id__in=ids).update(enrolled_count=Case(
+        *[When(id=gid, then=Value(n)) for gid, n in counts.items()],
+        default=Value(0),
+        output_field=IntegerField(),
+    ))
+
+
+@contextmanager
+def suppressed():
+    """Skip the per-row recounts, e.g. inside bulk jobs that call recount() themselves."""
+    token = _suppressed.set(True)
+    try:
+        yield
+    finally:
+        _suppressed.reset(token)
+
+
+def _seat(instance):
+    return instance.__dict__.get('grade_id'), instance.__dict__.get('status')
+
+
+def _seated_grades(*seats):
+    # A status of None was deferred when the student was loaded: it may have held a seat.
+    return {grade_id for grade_id, status in seats if grade_id is not None and status in ('active', None)}
+
+
+def _remember_seat(sender, instance, **kwargs):
+    instance._capacity_seat = _seat(instance)
+
+
+def _student_saved(sender, instance, created, raw=False, **kwargs):
+    previous = None if created else getattr(instance, '_capacity_seat', (None, None))
+    instance._capacity_seat = current = _seat(instance)
+    if raw or previous == current or _suppressed.get():
+        return
+    grade_ids = _seated_grades(current, *([previous] if previous else []))
+    if grade_ids:
+        recount(grade_ids)
+
+
+def _student_deleted(sender, instance, **kwargs):
+    if _suppressed.get():
+        return
+    grade_ids = _seated_grades(getattr(instance, '_capacity_seat', _seat(instance)))
+    if grade_ids:
+        recount(grade_ids)
+
+
+def connect_signals():
+    post_init.connect(_remember_seat, sender=Student, dispatch_uid='capacity-student-init')
+    post_save.connect(_student_saved, sender=Student, dispatch_uid='capacity-student')
+    post_delete.connect(_student_deleted, sender=Student, dispatch_uid='capacity-student-delete')
+
+
+# ============= ROLLOVER PLANNER =============
+def plan_rollover(new_enrollments=None, under_ratio=UNDER_SUBSCRIBED_RATIO):
+    """Simulate next year's headcount per grade.
+
+    Active students move one level up (the top level graduates), grades
+    without a level keep their students, and ``new_enrollments`` maps grade id
+    to the number of incoming admissions. With no active school every school
+    is planned, each on its own levels. Everything is computed in memory
+    from a single grouped query.
+    """
+    new_enrollments = {int(k): int(v) for k, v in (new_enrollments or {}).items()}
+    grades = list(Grade.objects.annotate(
+        active=Count('student', filter=Q(student__status='active'))
+    ).order_by('level', 'name'))
+
+    # Levels are per school: students only move up within their own campus.
+    by_level = {(g.school_id, g.level): g for g in grades if g.level is not None}
+    top_level = {}
+    for school_id, level in by_level:
+        top_level[school_id] = max(level, top_level.get(school_id, level))
+    projected = {g.id: new_enrollments.get(g.id, 0) for g in grades}
+    graduating = 0
+    for grade in grades:
+        if grade.level is None:
+            projected[grade.id] += grade.active
+        elif grade.level == top_level[grade.school_id]:
+            graduating += grade.active
+        elif (grade.school_id, grade.level + 1) in by_level:
+            projected[by_level[grade.school_id, grade.level + 1].id] += grade.active
+        else:
+            projected[grade.id] += grade.active  # gap in the sequence: held back
+
+    report = []
+    for grade in grades:
+        count = projected[grade.id]
+        if count > grade.capacity:
+            status = 'over'
+        elif count < grade.capacity * under_ratio:
+            status = 'under'
+        else:
+            status = 'ok'
+        report.append({
+            'grade_id': grade.id,
+            'grade': grade.name,
+            'level': grade.level,
+            'capacity': grade.capacity,
+            'current': grade.active,
+            'incoming': new_enrollments.get(grade.id, 0),
+            'projected': count,
+            'free': grade.capacity - count,
+            'status': status,
+        })
+    return {'grades': report, 'graduating': graduating}
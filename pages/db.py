@@ -0,0 +1,61 @@
+# db.py
+"""
+SQLite production profile: per-connection pragmas and the optional read-only alias.
+"""
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+READONLY_ALIAS = 'readonly'
+
+
+def is_readonly(connection):
+    return 'mode=ro' in str(connection.settings_dict['NAME'])
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """Apply settings.SQLITE_PRAGMAS to every new SQLite connection."""
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = dict(getattr(settings, 'SQLITE_PRAGMAS', {}))
+    if is_readonly(connection):
+        # journal_mode is persistent in the file and can only be set by a writer.
+        pragmas.pop('journal_mode', None)
+        pragmas['query_only'] = 'ON'
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def current_pragmas(alias='default'):
+    """Effective pragma values on ``alias``, for diagnostics."""
+    names = list(getattr(settings, 'SQLITE_PRAGMAS', {})) + ['query_only']
+    with connections[alias].cursor() as cursor:
+        values = {}
+        for name in names:
+            cursor.execute(f'PRAGMA {name}')
+            row = cursor.fetchone()
+            values[name] = row[0] if row else None
+    return values
+
+
+class ReadOnlyRouter:
+    """Send reads to the read-only alias unless a write transaction is open."""
+
+    def db_for_read(self, model, **hints):
+        # Inside atomic() the caller must see its own uncommitted writes.
+        if connections['default'].in_atomic_block:
+            return 'default'
+        return READONLY_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
+
+
+connection_created.connect(apply_sqlite_pragmas, dispatch_uid='pages.db.sqlite_pragmas')
@@ -0,0 +1,315 @@
+# delivery.py
+"""
+Email and SMS delivery of notifications to parents, students and staff.
+
+queue() resolves a notification's audience with a few values_list queries
+and bulk-inserts one Delivery row per channel and address (a parent with
+three children gets one message). deliver() then works through a channel's
+pending rows in id order, a batch at a time:
+
+* each notification's text is rendered once per batch, and only the
+  greeting differs between recipients;
+* an email batch goes out over one SMTP connection (get_connection() opened
+  once, one send per message so a refused address fails alone); SMS goes to
+  the SMS_BACKEND in one call per batch;
+* a RateLimiter keeps each channel under its provider limit
+  (DELIVERY_RATE_LIMITS, messages per second);
+* outcomes are written back with one UPDATE for the sent ids and one per
+  distinct error. Failed rows stay pending until MAX_ATTEMPTS.
+
+Run one sender per channel (the send_notifications command).
+"""
+import json
+import socketserver
+import threading
+import time
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import Case, F, Value, When
+from django.template.loader import get_template
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Delivery, Notification, Staff, Student
+
+BATCH_SIZE = getattr(settings, 'DELIVERY_BATCH_SIZE', 200)
+RATE_LIMITS = getattr(settings, 'DELIVERY_RATE_LIMITS', {'email': 1000, 'sms': 500})
+MAX_ATTEMPTS = getattr(settings, 'DELIVERY_MAX_ATTEMPTS', 3)
+SMS_LENGTH = 459  # three concatenated SMS segments
+CHANNELS = [code for code, _ in Delivery.CHANNEL_CHOICES]
+
+
+class DeliveryError(Exception):
+    pass
+
+
+# ============= Recipients =============
+def _audience(notification):
+    """(name, email, phone) rows for the notification's target audience."""
+    students = Student.all_objects.filter(school_id=notification.school_id, status='active')
+    audience = notification.target_audience
+    if audience == 'grade_specific':
+        if notification.target_grade_id is None:
+            return
+        students = students.filter(grade_id=notification.target_grade_id)
+    if audience in ('all', 'parents', 'grade_specific'):
+        yield from students.values_list('parent_name', 'parent_email', 'parent_phone').iterator()
+    if audience in ('all', 'students', 'grade_specific'):
+        yield from students.values_list('name', 'email', 'phone').iterator()
+    if audience in ('all', 'staff'):
+        staff = Staff.all_objects.filter(school_id=notification.school_id, status='active')
+        yield from staff.values_list('name', 'email', 'phone').iterator()
+
+
+def recipients(notification):
+    """{(channel, address): name}, one entry per distinct address."""
+    found = {}
+    for name, email, phone in _audience(notification):
+        if email and email.strip():
+            found.setdefault(('email', email.strip().lower()), name or '')
+        if phone and phone.strip():
+            found.setdefault(('sms', phone.strip()), name or '')
+    return found
+
+
+def queue(notification, batch_size=1000):
+    """Create the pending deliveries of ``notification`` (existing ones are kept); returns the recipient count."""
+    rows = [
+        Delivery(school_id=notification.school_id, notification=notification,
+                 channel=channel, address=address, name=name[:100])
+        for (channel, address), name in recipients(notification).items()
+    ]
+    Delivery.all_objects.bulk_create(rows, batch_size=batch_size, ignore_conflicts=True)
+    return len(rows)
+
+
+# ============= Rendering =============
+class Renderer:
+    """Notification text rendered once and reused for every recipient."""
+
+    def __init__(self):
+        self._texts = {}
+        self._templates = {
+            'email': get_template('notification_email.txt'),
+            'sms': get_template('notification_sms.txt'),
+        }
+
+    def text(self, notification, channel):
+        key = (notification.pk, channel)
+        if key not in self._texts:
+            self._texts[key] = self._templates[channel].render({
+                'notification': notification, 'school': notification.school,
+            }).strip()
+        return self._texts[key]
+
+    def email(self, delivery):
+        greeting = f'Dear {delivery.name},\n\n' if delivery.name else ''
+        return delivery.notification.title, greeting + self.text(delivery.notification, 'email')
+
+    def sms(self, delivery):
+        return self.text(delivery.notification, 'sms')[:SMS_LENGTH]
+
+
+# ============= Transports =============
+class EmailTransport:
+    """Sends a batch over one connection of the configured (or given) email backend."""
+
+    def __init__(self, **connection_options):
+        self.connection_options = connection_options
+        self.from_email = settings.DEFAULT_FROM_EMAIL
+
+    def send(self, batch, renderer):
+        """{delivery id: error or None}."""
+        outcome = {}
+        connection = get_connection(fail_silently=False, **self.connection_options)
+        try:
+            connection.open()
+        except Exception as e:
+            return dict.fromkeys((d.id for d in batch), f'Connection failed: {e}')
+        try:
+            for delivery in batch:
+                subject, body = renderer.email(delivery)
+                message = EmailMessage(subject, body, self.from_email, [delivery.address], connection=connection)
+                try:
+                    connection.send_messages([message])
+                    outcome[delivery.id] = None
+                except Exception as e:  # refused recipient, dropped connection, ...
+                    outcome[delivery.id] = str(e) or e.__class__.__name__
+        finally:
+            connection.close()
+        return outcome
+
+
+class SmsTransport:
+    """Hands a batch to SMS_BACKEND in one call."""
+
+    def __init__(self, backend=None, **options):
+        backend_class = import_string(backend or getattr(settings, 'SMS_BACKEND', 'pages.delivery.FileSmsBackend'))
+        self.backend = backend_class(**options)
+
+    def send(self, batch, renderer):
+        errors = self.backend.send_messages([(d.address, renderer.sms(d)) for d in batch])
+        return {d.id: error for d, error in zip(batch, errors)}
+
+
+class FileSmsBackend:
+    """Development SMS backend: appends each message as a JSON line to SMS_FILE_PATH."""
+
+    def __init__(self, path=None, **kwargs):
+        self.path = path or getattr(settings, 'SMS_FILE_PATH', 'sms-outbox.jsonl')
+        self._lock = threading.Lock()
+
+    def send_messages(self, messages):
+        """One error (or None) per (to, body) message."""
+        sent_at = timezone.now().isoformat()
+        with self._lock, open(self.path, 'a', encoding='utf-8') as f:
+            f.writelines(json.dumps({'to': to, 'body': body, 'sent_at': sent_at}) + '\n' for to, body in messages)
+        return [None] * len(messages)
+
+
+class _SmtpSinkHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP to accept every message."""
+
+    def reply(self, line):
+        self.wfile.write(line.encode() + b'\r\n')
+
+    def handle(self):
+        self.reply('220 sink ESMTP')
+        recipients = []
+        for line in self.rfile:
+            command = line[:4].upper()
+            if command == b'EHLO':
+                self.reply('250-sink')
+                self.reply('250 8BITMIME')
+            elif command == b'RCPT':
+                recipients.append(line.decode().partition('<')[2].partition('>')[0])
+                self.reply('250 OK')
+            elif command == b'RSET':
+                recipients = []
+                self.reply('250 OK')
+            elif command == b'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                for data in self.rfile:
+                    if data == b'.\r\n':
+                        break
+                self.server.recipients.extend(recipients)
+                self.server.messages += 1
+                recipients = []
+                self.reply('250 OK')
+            elif command == b'QUIT':
+                self.reply('221 Bye')
+                return
+            else:  # HELO, MAIL, NOOP
+                self.reply('250 OK')
+
+
+class SmtpSink(socketserver.ThreadingTCPServer):
+    """Development SMTP server: accepts every message, counts it and keeps its recipients.
+
+    Bound to 127.0.0.1 on a free port (``port``); start() serves it from a daemon thread.
+    """
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), _SmtpSinkHandler)
+        self.messages = 0
+        self.recipients = []
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def get_transport(channel, **options):
+    if channel == 'email':
+        return EmailTransport(**options)
+    if channel == 'sms':
+        return SmsTransport(**options)
+    raise DeliveryError(f'Unknown channel: {channel}')
+
+
+class RateLimiter:
+    """Blocks so that no more than ``rate`` messages per second are released."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self.next_at = time.monotonic()
+
+    def wait(self, count):
+        now = time.monotonic()
+        if self.next_at > now:
+            time.sleep(self.next_at - now)
+        self.next_at = max(self.next_at, now) + count * self.interval
+
+
+# ============= Sending =============
+def _record(outcome):
+    """Write a batch's outcome back: one UPDATE for the sent rows and one per distinct error."""
+    now = timezone.now()
+    sent = [pk for pk, error in outcome.items() if error is None]
+    if sent:
+        Delivery.all_objects.filter(id__in=sent).update(
+            status='sent', sent_at=now, attempts=F('attempts') + 1, error='',
+        )
+    failures = {}
+    for pk, error in outcome.items():
+        if error is not None:
+            failures.setdefault(error[:255], []).append(pk)
+    for error, ids in failures.items():
+        Delivery.all_objects.filter(id__in=ids).update(
+            attempts=F('attempts') + 1,
+            error=error,
+            status=Case(When(attempts__gte=MAX_ATTEMPTS - 1, then=Value('failed')), default=Value('pending')),
+        )
+    return len(sent), len(outcome) - len(sent)
+
+
+def deliver(channel, batch_size=BATCH_SIZE, rate=None, limit=None, transport=None, notification_id=None):
+    """Send each pending delivery of ``channel`` once (every school, or one notification); returns counts."""
+    transport = transport or get_transport(channel)
+    limiter = RateLimiter(RATE_LIMITS.get(channel) if rate is None else rate)
+    renderer = Renderer()
+    notifications = {}
+    sent = failed = 0
+    pending = Delivery.all_objects.filter(channel=channel, status='pending')
+    if notification_id is not None:
+        pending = pending.filter(notification_id=notification_id)
+    last_id = 0
+    started = time.perf_counter()
+    while limit is None or sent + failed < limit:
+        size = batch_size if limit is None else min(batch_size, limit - sent - failed)
+        batch = list(
+            pending.filter(id__gt=last_id).only('id', 'notification_id', 'address', 'name').order_by('id')[:size]
+        )
+        if not batch:
+            break
+        last_id = batch[-1].id
+        missing = {d.notification_id for d in batch} - notifications.keys()
+        if missing:
+            notifications.update(
+                Notification.all_objects.select_related('school', 'target_grade').in_bulk(missing)
+            )
+        for delivery in batch:
+            delivery.notification = notifications[delivery.notification_id]
+        limiter.wait(len(batch))
+        ok, errors = _record(transport.send(batch, renderer))
+        sent += ok
+        failed += errors
+    seconds = time.perf_counter() - started
+    return {
+        'channel': channel,
+        'sent': sent,
+        'failed': failed,
+        'seconds': round(seconds, 3),
+        'per_second': round((sent + failed) / seconds) if seconds and sent + failed else 0,
+    }
@@ -0,0 +1,342 @@
+# documents.py
+"""
+Documents (birth certificates, photos, transfer letters) attached to students
+and staff.
+
+Storage is content-addressed: a file lives once under DOCUMENT_ROOT at
+``blobs/ab/cd/<sha256>`` however many Document rows point at it, so the same
+certificate uploaded for three siblings takes the disk space of one.
+
+* Uploads stream: StreamingUploadHandler replaces Django's memory/temporary
+  file handlers for the upload view and writes each 64 KB chunk straight to
+  a temporary file next to the blobs while hashing it, so no file is ever
+  held in memory. A finished upload is moved into place with os.replace().
+  The type is taken from the file's first bytes, not the client's claim;
+  only PDFs and common image formats are accepted.
+* Thumbnails of photos are made on first request (Pillow, optional) and
+  cached as ``thumbnails/<sha256>-<size>.jpg``.
+* Downloads go through serve(): with DOCUMENT_SENDFILE set, the response
+  hands the file to the front-end server (nginx X-Accel-Redirect or Apache /
+  lighttpd X-Sendfile) after the access check; otherwise a full download is a
+  FileResponse (gunicorn sends it with sendfile()) and a Range request gets
+  a 206 streamed in chunks.
+
+Blobs no Document refers to are removed by the prune_documents command.
+"""
+import hashlib
+import os
+import re
+import tempfile
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile, StopFutureHandlers
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.http import content_disposition_header
+
+from .models import Document
+
+ROOT = Path(getattr(settings, 'DOCUMENT_ROOT', settings.BASE_DIR / 'documents'))
+MAX_BYTES = getattr(settings, 'DOCUMENT_MAX_BYTES', 20 * 1024 * 1024)
+SENDFILE = getattr(settings, 'DOCUMENT_SENDFILE', '')  # '', 'x-accel-redirect' or 'x-sendfile'
+SENDFILE_PREFIX = getattr(settings, 'DOCUMENT_SENDFILE_PREFIX', '/protected-documents/')
+THUMBNAIL_SIZES = getattr(settings, 'DOCUMENT_THUMBNAIL_SIZES', (128, 512))
+CHUNK_SIZE = 64 * 1024
+SIGNATURES = [
+    (b'%PDF-', 'application/pdf'),
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'GIF87a', 'image/gif'),
+    (b'GIF89a', 'image/gif'),
+]
+RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class DocumentError(Exception):
+    pass
+
+
+def _sniff(head):
+    for signature, content_type in SIGNATURES:
+        if head.startswith(signature):
+            return content_type
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'image/webp'
+    return None
+
+
+def blob_path(sha256):
+    return ROOT / 'blobs' / sha256[:2] / sha256[2:4] / sha256
+
+
+def thumbnail_path(sha256, size):
+    return ROOT / 'thumbnails' / f'{sha256}-{size}.jpg'
+
+
+# ============= Storing =============
+class BlobWriter:
+    """Hashes and spools a file to disk chunk by chunk; commit() moves it to its blob path."""
+
+    def __init__(self, max_bytes=MAX_BYTES):
+        self.max_bytes = max_bytes
+        (ROOT / 'tmp').mkdir(parents=True, exist_ok=True)
+        self.file = tempfile.NamedTemporaryFile(dir=ROOT / 'tmp', prefix='upload-', delete=False)
+        self.hash = hashlib.sha256()
+        self.size = 0
+        self.head = b''
+
+    def write(self, chunk):
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            self.discard()
+            raise DocumentError(f'File is larger than {self.max_bytes // (1024 * 1024)} MB')
+        if len(self.head) < 16:
+            self.head += chunk[:16]
+        self.hash.update(chunk)
+        self.file.write(chunk)
+
+    def commit(self):
+        """(sha256, size, content type) of the stored blob."""
+        self.file.close()
+        content_type = _sniff(self.head)
+        if content_type is None:
+            self.discard()
+            raise DocumentError('Only PDF, JPEG, PNG, GIF and WebP files can be uploaded')
+        sha256 = self.hash.hexdigest()
+        path = blob_path(sha256)
+        if path.exists():
+            os.remove(self.file.name)
+            os.utime(path)  # recently used: keeps prune_documents off it
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(self.file.name, path)
+        return sha256, self.size, content_type
+
+    def discard(self):
+        self.file.close()
+        if os.path.exists(self.file.name):
+            os.remove(self.file.name)
+
+
+class StreamedFile:
+    """What StreamingUploadHandler puts in request.FILES: a spooled, not yet stored, upload."""
+
+    def __init__(self, name, writer):
+        self.name = name
+        self.writer = writer
+
+    def close(self):
+        # Called at the end of the request; a file the view did not store is dropped.
+        if self.writer is not None:
+            self.writer.discard()
+
+
+class StreamingUploadHandler(FileUploadHandler):
+    """Upload handler that spools each file through a BlobWriter instead of memory.
+
+    A file that is too large is skipped and the reason left in ``error``.
+    """
+
+    chunk_size = CHUNK_SIZE
+    error = None
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.writer = BlobWriter()
+        self.error = None
+        raise StopFutureHandlers()
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.error is None:
+            try:
+                self.writer.write(raw_data)
+            except DocumentError as e:
+                self.error = str(e)
+                raise SkipFile()  # the parser drops the rest of this file
+        return None
+
+    def file_complete(self, file_size):
+        return StreamedFile(self.file_name, writer=self.writer)
+
+    def upload_interrupted(self):
+        if getattr(self, 'writer', None) is not None:
+            self.writer.discard()
+
+
+def _owner_fields(owner):
+    field = owner._meta.model_name  # 'student' or 'staff'
+    if field not in ('student', 'staff'):
+        raise DocumentError('Documents belong to a student or a staff member')
+    return {field: owner, 'school_id': owner.school_id}
+
+
+def attach(owner, kind, upload):
+    """Store a StreamedFile for ``owner`` (a Student or Staff) and return its Document."""
+    if kind not in dict(Document.KIND_CHOICES):
+        raise DocumentError(f'Unknown document kind: {kind}')
+    fields = _owner_fields(owner)
+    sha256, size, content_type = upload.writer.commit()
+    upload.writer = None
+    return Document.all_objects.create(
+        kind=kind, name=os.path.basename(upload.name)[:255] or sha256, content_type=content_type,
+        size=size, sha256=sha256, **fields,
+    )
+
+
+def attach_file(owner, kind, fileobj, name):
+    """attach() for a file-like object (imports, management commands), read in chunks."""
+    writer = BlobWriter()
+    try:
+        for chunk in iter(lambda: fileobj.read(CHUNK_SIZE), b''):
+            writer.write(chunk)
+    except BaseException:
+        writer.discard()
+        raise
+    upload = StreamedFile(name, writer=writer)
+    try:
+        return attach(owner, kind, upload)
+    finally:
+        upload.close()
+
+
+def prune(grace_seconds=3600):
+    """Delete blobs (and their thumbnails) no Document refers to; returns how many."""
+    blobs = ROOT / 'blobs'
+    if not blobs.exists():
+        return 0
+    cutoff = time.time() - grace_seconds
+    candidates = {path.name: path for path in blobs.glob('*/*/*') if path.stat().st_mtime < cutoff}
+    names = list(candidates)
+    used = set()
+    for i in range(0, len(names), 1000):
+        used.update(Document.all_objects.filter(sha256__in=names[i:i + 1000]).values_list('sha256', flat=True))
+    removed = 0
+    for sha256, path in candidates.items():
+        if sha256 in used:
+            continue
+        path.unlink(missing_ok=True)
+        for size in THUMBNAIL_SIZES:
+            thumbnail_path(sha256, size).unlink(missing_ok=True)
+        removed += 1
+    return removed
+
+
+# ============= Thumbnails =============
+def thumbnail(document, size):
+    """Path of the JPEG thumbnail of an image document, made on first use."""
+    if size not in THUMBNAIL_SIZES:
+        raise DocumentError(f'Thumbnail size must be one of {", ".join(map(str, THUMBNAIL_SIZES))}')
+    if not document.is_image:
+        raise DocumentError('Only images have thumbnails')
+    path = thumbnail_path(document.sha256, size)
+    if path.exists():
+        return path
+    try:
+        from PIL import Image, ImageOps
+    except ImportError:
+        raise DocumentError('Thumbnails need Pillow (pip install Pillow)')
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with Image.open(blob_path(document.sha256)) as image:
+        image.draft('RGB', (size, size))  # JPEG: decode at a reduced scale
+        image = ImageOps.exif_transpose(image).convert('RGB')
+        image.thumbnail((size, size))
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.jpg')
+        with os.fdopen(fd, 'wb') as f:
+            image.save(f, 'JPEG', quality=85)
+    os.replace(tmp, path)  # concurrent makers of the same thumbnail just overwrite each other
+    return path
+
+
+# ============= Serving =============
+def _range(header, size):
+    """(start, end) of a single-range header; None to send everything; False if unsatisfiable."""
+    match = RANGE.match(header.replace(' ', ''))
+    if not match or match.groups() == ('', ''):
+        return None  # absent, malformed or multi-range: a full response is allowed
+    first, last = match.groups()
+    if first:
+        start, end = int(first), min(int(last), size - 1) if last else size - 1
+    else:
+        start, end = max(size - int(last), 0), size - 1
+    if start > end or start >= size:
+        return False
+    return start, end
+
+
+def _read(path, start, length):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def serve(request, path, content_type, filename, etag):
+    """Response for a stored file, honouring If-None-Match and Range (or handing off to the web server)."""
+    etag = f'"{etag}"'
+    if etag in request.headers.get('If-None-Match', ''):
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
+
+    size = path.stat().st_size
+    if SENDFILE == 'x-accel-redirect':
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = SENDFILE_PREFIX + path.relative_to(ROOT).as_posix()
+    elif SENDFILE == 'x-sendfile':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = str(path)
+    else:
+        span = None
+        if request.headers.get('If-Range', etag) == etag:
+            span = _range(request.headers.get('Range', ''), size)
+        if span is False:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+        if span is None:
+            response = FileResponse(open(path, 'rb'), content_type=content_type)
+        else:
+            start, end = span
+            response = StreamingHttpResponse(_read(path, start, end - start + 1), status=206, content_type=content_type)
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+            response['Content-Length'] = str(end - start + 1)
+        response['Accept-Ranges'] = 'bytes'
+
+    response['ETag'] = etag
+    response['Content-Disposition'] = content_disposition_header(False, filename)
+    response['X-Content-Type-Options'] = 'nosniff'
+    response['Cache-Control'] = 'private, max-age=86400'
+    return response
+
+
+def serve_document(request, document):
+    return serve(request, blob_path(document.sha256), document.content_type, document.name, document.sha256)
+
+
+def serve_thumbnail(request, document, size):
+    path = thumbnail(document, size)
+    stem = os.path.splitext(document.name)[0]
+    return serve(request, path, 'image/jpeg', f'{stem}-{size}.jpg', f'{document.sha256}-{size}')
+
+
+def serialize(document):
+    return {
+        'id': document.id,
+        'kind': document.kind,
+        'name': document.name,
+        'content_type': document.content_type,
+        'size': document.size,
+        'sha256': document.sha256,
+        'uploaded_at': document.uploaded_at,
+        'student': document.student_id,
+        'staff': document.staff_id,
+        'archived_student': document.archived_student_id,
+        'url': reverse('document_download', args=[document.id]),
+        'thumbnail_url': reverse('document_thumbnail', args=[document.id]) if document.is_image else None,
+    }
@@ -0,0 +1,182 @@
+# gradebook.py
+"""
+Exam results, GPA, ranks and percentiles for a whole grade, computed in SQL.
+
+Each result's percentage of the exam's max_marks and its grade points
+(GRADE_POINTS) are annotated inside the query. Averages, GPA, ranks and
+percentiles are aggregates and window functions over those annotations, so
+ranking a grade takes a fixed number of queries and never loops over
+students in Python. Report cards are rendered for batches of students and
+streamed.
+"""
+from django.db import transaction
+from django.db.models import (
+    Avg, Case, Count, ExpressionWrapper, F, FloatField, Max, Min, Value, When, Window,
+)
+from django.db.models.functions import Cast, PercentRank, Rank
+from django.template.loader import render_to_string
+
+from .models import Result, Student
+
+# (minimum percentage, grade points, letter)
+GRADE_POINTS = [
+    (90, 4.0, 'A'),
+    (80, 3.0, 'B'),
+    (70, 2.0, 'C'),
+    (60, 1.0, 'D'),
+    (0, 0.0, 'F'),
+]
+
+REPORT_CARD_BATCH_SIZE = 50
+CARDS_MARKER = '<!-- report-cards -->'
+
+
+class GradebookError(Exception):
+    pass
+
+
+def letter(percentage):
+    if percentage is None:
+        return ''
+    return next(mark for minimum, _, mark in GRADE_POINTS if percentage >= minimum)
+
+
+def _scored(results):
+    """Annotate ``percentage`` and grade ``points`` on a Result queryset."""
+    return results.annotate(
+        percentage=ExpressionWrapper(
+            Cast('marks', FloatField()) * 100.0 / F('exam__max_marks'), output_field=FloatField()
+        ),
+    ).annotate(
+        points=Case(
+            *[When(percentage__gte=minimum, then=Value(points)) for minimum, points, _ in GRADE_POINTS],
+            output_field=FloatField(),
+        ),
+    )
+
+
+def term_results(grade, term):
+    return _scored(Result.objects.filter(exam__grade=grade, exam__term=term))
+
+
+def exam_results(exam):
+    """Results of one exam with rank, percentile and the class average."""
+    return (
+        _scored(exam.results.all())
+        .annotate(
+            rank=Window(Rank(), order_by=F('marks').desc()),
+            percentile=Window(PercentRank(), order_by=F('marks').asc()),
+            class_average=Window(Avg('marks')),
+        )
+        .select_related('student')
+        .order_by('rank', 'student__name')
+    )
+
+
+def grade_ranking(grade, term):
+    """One row per student: GPA, average percentage, class rank and percentile."""
+    return (
+        term_results(grade, term)
+        .values('student_id', 'student__name', 'student__student_id')
+        .annotate(gpa=Avg('points'), average=Avg('percentage'), exams=Count('id'))
+        .annotate(
+            rank=Window(Rank(), order_by=F('gpa').desc()),
+            percentile=Window(PercentRank(), order_by=F('gpa').asc()),
+        )
+        .order_by('rank', 'student__name')
+    )
+
+
+def subject_standings(grade, term):
+    """One row per student and subject with the subject rank and percentile."""
+    by_subject = {'partition_by': [F('exam__subject_id')]}
+    return (
+        term_results(grade, term)
+        .values('student_id', 'exam__subject_id', 'exam__subject__name')
+        .annotate(average=Avg('percentage'), gpa=Avg('points'))
+        .annotate(
+            subject_rank=Window(Rank(), order_by=F('average').desc(), **by_subject),
+            subject_percentile=Window(PercentRank(), order_by=F('average').asc(), **by_subject),
+        )
+        .order_by('exam__subject__name', 'subject_rank')
+    )
+
+
+def subject_averages(grade, term):
+    """Class average, highest and lowest percentage per subject."""
+    return (
+        term_results(grade, term)
+        .values('exam__subject_id', 'exam__subject__name')
+        .annotate(
+            average=Avg('percentage'), highest=Max('percentage'), lowest=Min('percentage'),
+            results=Count('id'),
+        )
+        .order_by('exam__subject__name')
+    )
+
+
+def enter_results(exam, marks):
+    """Insert or update results for ``exam`` from a {student_id: marks} mapping in one statement."""
+    enrolled = set(Student.objects.filter(grade_id=exam.grade_id).values_list('id', flat=True))
+    rows, errors = [], {}
+    for student_id, value in marks.items():
+        student_id = int(student_id)
+        if student_id not in enrolled:
+            errors[student_id] = f'not in {exam.grade}'
+            continue
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            errors[student_id] = f'invalid marks: {value}'
+            continue
+        if not 0 <= value <= exam.max_marks:
+            errors[student_id] = f'marks must be between 0 and {exam.max_marks}'
+            continue
+        rows.append(Result(exam=exam, student_id=student_id, marks=round(value, 2)))
+    if errors:
+        raise GradebookError(errors)
+
+    with transaction.atomic():
+        Result.objects.bulk_create(
+            rows,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['exam', 'student'],
+            update_fields=['marks', 'updated_at'],
+        )
+    return len(rows)
+
+
+def report_card_contexts(grade, term):
+    """Template context of each report card in ``grade``, in student name order."""
+    ranking = {row['student_id']: row for row in grade_ranking(grade, term)}
+    averages = {row['exam__subject_id']: row['average'] for row in subject_averages(grade, term)}
+    # Ranked over the whole grade first; filtering by batch would rank within the batch.
+    subjects = {}
+    for row in subject_standings(grade, term):
+        row['letter'] = letter(row['average'])
+        row['class_average'] = averages.get(row['exam__subject_id'])
+        subjects.setdefault(row['student_id'], []).append(row)
+    return [
+        {
+            'grade': grade,
+            'term': term,
+            'student': ranking[sid],
+            'letter': letter(ranking[sid]['average']),
+            'subjects': subjects.get(sid, []),
+            'class_size': len(ranking),
+        }
+        for sid in sorted(ranking, key=lambda sid: ranking[sid]['student__name'])
+    ]
+
+
+def stream_report_cards(grade, term, batch_size=REPORT_CARD_BATCH_SIZE):
+    """Yield an HTML document of report cards for ``grade``, one batch of students at a time."""
+    cards = report_card_contexts(grade, term)
+    page = render_to_string('report_cards.html', {'grade': grade, 'term': term, 'count': len(cards)})
+    head, tail = page.split(CARDS_MARKER)
+    yield head
+
+    for start in range(0, len(cards), batch_size):
+        yield ''.join(render_to_string('report_card.html', card) for card in cards[start:start + batch_size])
+    yield tail
@@ -0,0 +1,270 @@
+# guardians.py
+"""
+Guardians: the parent contact on Student rows, grouped into one record per family.
+
+Students carry free-text parent_name/parent_phone/parent_email. Guardian rows
+hold the same contact plus normalized keys (digits of the phone, lower-cased
+email) that are indexed per school, so siblings whose parents typed
+"(555) 010-2000" and "555.010.2000" end up linked to one guardian and "all
+children of this parent" is an index lookup. Students are linked on save;
+link_guardians() backfills in batches (migration 0014 runs a frozen copy).
+"""
+import re
+
+from django.db import connection
+from django.db.models import F, Q
+from django.db.models.signals import post_init, pre_save
+from django.utils import timezone
+
+from .models import Guardian, Notification, Student
+
+BATCH_SIZE = 1000
+PHONE_DIGITS = 10
+NOTIFICATION_LIMIT = 20
+
+
+class GuardianError(Exception):
+    pass
+
+
+def normalize_phone(value):
+    """'+1 (555) 010-2000 x12' -> '5550102000' (extension dropped, last PHONE_DIGITS digits kept)."""
+    number = re.split(r'[xX#]|ext', value or '')[0]
+    return re.sub(r'\D', '', number)[-PHONE_DIGITS:]
+
+
+def normalize_email(value):
+    return (value or '').strip().lower()
+
+
+def _remember(known, school_id, phone_key, email_key, guardian):
+    if phone_key:
+        known.setdefault((school_id, 'phone', phone_key), guardian)
+    if email_key:
+        known.setdefault((school_id, 'email', email_key), guardian)
+
+
+def _match(known, school_id, phone_key, email_key):
+    return (
+        (phone_key and known.get((school_id, 'phone', phone_key)))
+        or (email_key and known.get((school_id, 'email', email_key)))
+        or None
+    )
+
+
+def _pk(guardian):
+    return guardian if isinstance(guardian, int) else guardian.pk
+
+
+def _set_guardians(pairs):
+    """One UPDATE ... SET guardian_id = CASE id WHEN ... END for (student_id, guardian_id) pairs.
+
+    Same statement as bulk_update(), without building an expression per row
+    (which is where bulk_update spends its time on a few thousand students).
+    updated_at is set as save() would, so delta sync and the roster see the link.
+    """
+    if not pairs:
+        return
+    qn = connection.ops.quote_name
+    meta = Student._meta
+    pk, column = qn(meta.pk.column), qn(meta.get_field('guardian').column)
+    updated_at = qn(meta.get_field('updated_at').column)
+    sql = (
+        f'UPDATE {qn(meta.db_table)} SET {updated_at} = %s, '
+        f'{column} = CASE {pk} {" ".join(["WHEN %s THEN %s"] * len(pairs))} END '
+        f'WHERE {pk} IN ({", ".join(["%s"] * len(pairs))})'
+    )
+    params = (
+        [connection.ops.adapt_datetimefield_value(timezone.now())]
+        + [value for pair in pairs for value in pair]
+        + [student_id for student_id, _ in pairs]
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
+
+def link_guardians(students=None, batch_size=BATCH_SIZE):
+    """Link students without a guardian to one, creating guardians as needed.
+
+    Students are matched on normalized phone first, then email, within their
+    school; students of one batch sharing a contact share the new guardian.
+    ``students`` optionally narrows the queryset. Returns
+    ``(guardians_created, students_linked)``.
+    """
+    unlinked = (students if students is not None else Student._base_manager.all()).filter(
+        Q(guardian__isnull=True),
+        ~Q(parent_phone='') | (Q(parent_email__isnull=False) & ~Q(parent_email='')),
+    )
+    known, created, linked, last_id = {}, 0, 0, 0
+    while True:
+        rows = list(
+            unlinked.filter(id__gt=last_id).order_by('id')
+            .values_list('id', 'school_id', 'parent_name', 'parent_phone', 'parent_email')[:batch_size]
+        )
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        rows = [
+            (student_id, school_id, name, phone, email, normalize_phone(phone), normalize_email(email))
+            for student_id, school_id, name, phone, email in rows
+        ]
+
+        # Existing guardians for this batch's contacts: one indexed lookup.
+        phone_keys = {row[5] for row in rows if row[5]}
+        email_keys = {row[6] for row in rows if row[6]}
+        for guardian_id, school_id, phone_key, email_key in Guardian._base_manager.filter(
+            Q(phone_key__in=phone_keys) | Q(email_key__in=email_keys)
+        ).order_by('id').values_list('id', 'school_id', 'phone_key', 'email_key'):
+            _remember(known, school_id, phone_key, email_key, guardian_id)
+
+        pending, links = [], []
+        for student_id, school_id, name, phone, email, phone_key, email_key in rows:
+            if not (phone_key or email_key):
+                continue
+            guardian = _match(known, school_id, phone_key, email_key)
+            if guardian is None:
+                guardian = Guardian(school_id=school_id, name=name)
+                pending.append(guardian)
+            if not isinstance(guardian, int) and guardian.pk is None:
+                # Still unsaved: complete its contact from the siblings.
+                if phone_key and not guardian.phone_key:
+                    guardian.phone, guardian.phone_key = phone, phone_key
+                if email_key and not guardian.email_key:
+                    guardian.email, guardian.email_key = email.strip(), email_key
+            _remember(known, school_id, phone_key, email_key, guardian)
+            links.append((student_id, guardian))
+
+        if pending:
+            Guardian._base_manager.bulk_create(pending, batch_size=batch_size)
+            # MySQL does not return primary keys from bulk_create, so look them up.
+            ids = {}
+            for guardian_id, school_id, phone_key, email_key in Guardian._base_manager.filter(
+                Q(phone_key__in={g.phone_key for g in pending if g.phone_key})
+                | Q(email_key__in={g.email_key for g in pending if g.email_key})
+            ).order_by('id').values_list('id', 'school_id', 'phone_key', 'email_key'):
+                ids[school_id, phone_key, email_key] = guardian_id
+            for guardian in pending:
+                guardian.pk = ids[guardian.school_id, guardian.phone_key, guardian.email_key]
+            created += len(pending)
+
+        _set_guardians([(student_id, _pk(guardian)) for student_id, guardian in links])
+        linked += len(links)
+    return created, linked
+
+
+def find(school_id, phone='', email=''):
+    """The guardian matching ``phone`` (preferred) or ``email`` in a school, or None."""
+    phone_key, email_key = normalize_phone(phone), normalize_email(email)
+    match = Q(pk__in=[])
+    if phone_key:
+        match |= Q(phone_key=phone_key)
+    if email_key:
+        match |= Q(email_key=email_key)
+    candidates = list(Guardian.all_objects.filter(match, school_id=school_id).order_by('id')[:10])
+    return next(
+        (g for g in candidates if phone_key and g.phone_key == phone_key),
+        candidates[0] if candidates else None,
+    )
+
+
+def family(guardian_id=None, phone='', email=''):
+    """A guardian's children with balances and the notifications meant for them, in two queries.
+
+    Looks the guardian up by id or by normalized phone/email. Returns None
+    when there is no such guardian with children in the active school.
+    """
+    if guardian_id:
+        lookup = Q(guardian_id=guardian_id)
+    else:
+        phone_key, email_key = normalize_phone(phone), normalize_email(email)
+        if not (phone_key or email_key):
+            raise GuardianError('A guardian id, phone or email is required')
+        lookup = Q(guardian__phone_key=phone_key) if phone_key else Q(guardian__email_key=email_key)
+
+    children = list(
+        Student.objects.filter(lookup)
+        .annotate(balance=F('fees_due') - F('fees_paid'))
+        .order_by('guardian_id', 'name')
+        .values(
+            'id', 'name', 'student_id', 'status', 'grade_id', 'grade__name', 'fees_due', 'fees_paid', 'balance',
+            'guardian_id', 'guardian__name', 'guardian__phone', 'guardian__email', 'school_id',
+        )
+    )
+    if not children:
+        return None
+    first = children[0]
+    grade_ids = {child['grade_id'] for child in children if child['status'] == 'active'}
+    notifications = list(
+        Notification.all_objects.filter(school_id=first['school_id'], is_active=True)
+        .filter(
+            Q(target_audience__in=['all', 'parents'])
+            | Q(target_audience='grade_specific', target_grade_id__in=grade_ids)
+        )
+        .values('id', 'title', 'message', 'priority', 'target_audience', 'date_created')[:NOTIFICATION_LIMIT]
+    )
+    return {
+        'guardian': {
+            'id': first['guardian_id'],
+            'name': first['guardian__name'],
+            'phone': first['guardian__phone'],
+            'email': first['guardian__email'],
+        },
+        'children': [
+            {
+                'id': child['id'],
+                'name': child['name'],
+                'student_id': child['student_id'],
+                'status': child['status'],
+                'grade': child['grade__name'],
+                'fees_due': child['fees_due'],
+                'fees_paid': child['fees_paid'],
+                'balance': child['balance'],
+            }
+            for child in children
+        ],
+        'total_balance': sum(child['balance'] for child in children),
+        'notifications': notifications,
+    }
+
+
+# ============= Signals =============
+def _set_keys(sender, instance, raw=False, **kwargs):
+    instance.phone_key = normalize_phone(instance.phone)
+    instance.email_key = normalize_email(instance.email)
+
+
+def _contact(phone, email):
+    return normalize_phone(phone), normalize_email(email)
+
+
+def _remember_contact(sender, instance, **kwargs):
+    fields = instance.__dict__
+    if 'parent_phone' in fields and 'parent_email' in fields:
+        instance._guardian_contact = _contact(fields['parent_phone'], fields['parent_email'])
+
+
+def _link_student(sender, instance, raw=False, **kwargs):
+    """Point a saved student without a guardian, or whose parent contact changed, at the matching guardian."""
+    contact = _contact(instance.parent_phone, instance.parent_email)
+    previous = getattr(instance, '_guardian_contact', contact)
+    instance._guardian_contact = contact
+    if raw or not any(contact):
+        return
+    if instance.guardian_id is not None and contact == previous:
+        return  # linked already, maybe by hand: keep it
+    guardian = find(instance.school_id, instance.parent_phone, instance.parent_email)
+    if guardian is None:
+        guardian = Guardian.all_objects.create(
+            school_id=instance.school_id,
+            name=instance.parent_name,
+            phone=instance.parent_phone,
+            email=instance.parent_email or '',
+        )
+    instance.guardian_id = guardian.id
+
+
+def connect_signals():
+    pre_save.connect(_set_keys, sender=Guardian, dispatch_uid='guardians-keys')
+    post_init.connect(_remember_contact, sender=Student, dispatch_uid='guardians-contact')
+    # Connected after tenancy's hook, so the student's school_id is already set.
+    pre_save.connect(_link_student, sender=Student, dispatch_uid='guardians-link')
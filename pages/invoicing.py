@@ -0,0 +1,110 @@
+# invoicing.py
+"""
+Batch invoice generation from fee schedules.
+
+For one schedule (grade + term) every active student without an invoice for
+that term gets one, with a line per schedule item. Invoices and lines are
+written with bulk_create in batches, and the totals are added to
+Student.fees_due by a single UPDATE over the invoices not yet applied, all in
+one transaction. Re-running for the same term only picks up students that
+were added since, so generation is idempotent.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F, OuterRef, Subquery, Sum
+from django.utils import timezone
+
+from . import audit
+from .models import FeeSchedule, Invoice, InvoiceLine, Student
+
+BATCH_SIZE = 1000
+
+
+class InvoicingError(Exception):
+    pass
+
+
+def invoice_number(term_id, student_id):
+    return f'INV-{term_id:03d}-{student_id:06d}'
+
+
+def _apply_to_balances(term):
+    """Add every unapplied, non-void invoice total for ``term`` to fees_due in one UPDATE."""
+    pending = Invoice.objects.filter(term=term, applied=False).exclude(status='void')
+    pending_total = (
+        pending.filter(student_id=OuterRef('pk'))
+        .values('student_id')
+        .annotate(total=Sum('total'))
+        .values('total')
+    )
+    ids = list(pending.values_list('student_id', flat=True))
+    affected = Student.objects.filter(id__in=ids).update(
+        fees_due=F('fees_due') + Subquery(pending_total), updated_at=timezone.now()
+    )
+    pending.update(applied=True)
+    return ids, affected
+
+
+def generate_for_schedule(schedule, batch_size=BATCH_SIZE, issued_on=None):
+    """Invoice every active student in the schedule's grade who has no invoice for its term."""
+    items = list(schedule.items.all())
+    if not items:
+        raise InvoicingError(f'Fee schedule "{schedule}" has no items')
+    total = sum((item.amount for item in items), Decimal('0.00'))
+    issued_on = issued_on or timezone.now().date()
+    due_date = schedule.due_date or schedule.term.start_date
+
+    student_ids = list(
+        Student.objects.filter(grade_id=schedule.grade_id, status='active')
+        .exclude(invoices__term_id=schedule.term_id)
+        .values_list('id', flat=True)
+        .order_by('id')
+    )
+    with transaction.atomic():
+        for start in range(0, len(student_ids), batch_size):
+            batch = student_ids[start:start + batch_size]
+            Invoice.objects.bulk_create([
+                Invoice(
+                    number=invoice_number(schedule.term_id, student_id),
+                    school_id=schedule.grade.school_id,
+                    student_id=student_id,
+                    term_id=schedule.term_id,
+                    schedule=schedule,
+                    total=total,
+                    issued_on=issued_on,
+                    due_date=due_date,
+                )
+                for student_id in batch
+            ])
+            # MySQL does not return primary keys from bulk_create, so look them up.
+            invoice_ids = Invoice.objects.filter(
+                term_id=schedule.term_id, student_id__in=batch
+            ).values_list('id', flat=True)
+            InvoiceLine.objects.bulk_create([
+                InvoiceLine(invoice_id=invoice_id, description=item.description, amount=item.amount)
+                for invoice_id in invoice_ids
+                for item in items
+            ])
+    return {'schedule': str(schedule), 'invoiced': len(student_ids), 'amount': total}
+
+
+def generate(term, grade=None, batch_size=BATCH_SIZE):
+    """Generate invoices for every active schedule of ``term`` and apply them to balances."""
+    schedules = FeeSchedule.objects.filter(term=term, is_active=True).select_related('grade', 'term')
+    if grade:
+        schedules = schedules.filter(grade_id=grade)
+    schedules = list(schedules)
+    if not schedules:
+        raise InvoicingError(f'No active fee schedules for {term}')
+
+    with transaction.atomic():
+        results = [generate_for_schedule(s, batch_size=batch_size) for s in schedules]
+        ids, affected = _apply_to_balances(term)
+        audit.record_bulk(Student, ids, {'invoiced_term': term.name}, summary='Term invoices issued')
+    return {
+        'term': term.name,
+        'invoiced': sum(r['invoiced'] for r in results),
+        'students_updated': affected,
+        'schedules': results,
+    }
@@ -0,0 +1,198 @@
+# live.py
+"""
+Live dashboard numbers pushed over server-sent events.
+
+Clients of one school subscribe to a shared Channel. Saves and deletes of
+Student, FeePayment, Notification and Event mark the school's channel dirty
+(after commit); the channel's single worker task recomputes the stats once,
+after a short debounce so bursts coalesce, and wakes every subscriber. Each
+subscriber then sends only the keys that changed since its last message. An
+idle subscriber is one suspended coroutine waiting on an asyncio.Event, so
+hundreds of open dashboards cost little more than their sockets.
+
+The broadcaster is in-process: run the ASGI application (asgi.py) with a
+single event loop per worker, and each worker keeps its own channels.
+"""
+import asyncio
+import contextvars
+import json
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+
+from . import attendance, tenancy
+from .models import Event, FeePayment, Grade, Notification, Staff, Student
+
+logger = logging.getLogger(__name__)
+
+DEBOUNCE = getattr(settings, 'LIVE_DEBOUNCE', 0.5)  # seconds
+KEEPALIVE = getattr(settings, 'LIVE_KEEPALIVE', 25.0)  # seconds
+RETRY_MS = 5000
+WATCHED_MODELS = (Student, FeePayment, Notification, Event)
+
+
+def dashboard_stats():
+    """Headline dashboard figures for the active school, a handful of aggregate queries."""
+    students = Student.objects.aggregate(
+        total=Count('id'),
+        outstanding=Sum(F('fees_due') - F('fees_paid'), filter=Q(fees_due__gt=F('fees_paid'))),
+    )
+    return {
+        'total_students': students['total'],
+        'total_staff': Staff.objects.count(),
+        'total_grades': Grade.objects.count(),
+        'outstanding_fees': students['outstanding'] or 0,
+        'upcoming_events': Event.objects.filter(is_active=True, start_date__gte=timezone.now()).count(),
+        'new_notifications': Notification.objects.count(),
+        **attendance.school_rates(),
+    }
+
+
+def _encode(data):
+    return json.dumps(data, cls=DjangoJSONEncoder)
+
+
+def sse(event, data, event_id=None):
+    """One server-sent event as text."""
+    head = f'id: {event_id}\n' if event_id is not None else ''
+    return f'{head}event: {event}\ndata: {data}\n\n'
+
+
+class Channel:
+    """Latest stats for one school, recomputed by one task and shared by all its subscribers."""
+
+    def __init__(self, broadcaster, school_id):
+        self.broadcaster = broadcaster
+        self.school_id = school_id
+        self.subscribers = 0
+        self.version = 0
+        self.snapshot = None
+        self.delta = None  # encoded changes from version - 1 to version
+        self.computations = 0
+        self._dirty = asyncio.Event()
+        self._published = asyncio.Event()
+        self._first = asyncio.Lock()
+        self._task = None
+
+    def _compute(self):
+        with tenancy.using_school(self.school_id):
+            return dashboard_stats()
+
+    async def refresh(self):
+        snapshot = await sync_to_async(self._compute)()
+        self.computations += 1
+        changes = {k: v for k, v in snapshot.items() if self.snapshot is None or self.snapshot.get(k) != v}
+        if self.snapshot is not None and not changes:
+            return
+        self.snapshot, self.delta = snapshot, _encode(changes)
+        self.version += 1
+        published, self._published = self._published, asyncio.Event()
+        published.set()
+
+    async def _run(self):
+        try:
+            while self.subscribers:
+                await self._dirty.wait()
+                if not self.subscribers:
+                    break
+                await asyncio.sleep(DEBOUNCE)
+                self._dirty.clear()
+                try:
+                    await self.refresh()
+                except Exception:
+                    logger.exception('Live dashboard refresh failed for school %s', self.school_id)
+        finally:
+            self._task = None
+
+    def mark_dirty(self):
+        self._dirty.set()
+
+    async def subscribe(self, keepalive=KEEPALIVE):
+        """Yield SSE text: the full stats first, then changed keys and keepalive comments."""
+        self.subscribers += 1
+        try:
+            async with self._first:  # the first subscribers share one computation
+                if self.snapshot is None:
+                    await self.refresh()
+                if self._task is None:
+                    # A fresh context: the worker outlives this request and must not inherit its state.
+                    self._task = asyncio.get_running_loop().create_task(self._run(), context=contextvars.Context())
+            seen = self.version
+            yield f'retry: {RETRY_MS}\n' + sse('stats', _encode(self.snapshot), seen)
+            while True:
+                published = self._published
+                try:
+                    await asyncio.wait_for(published.wait(), keepalive)
+                except asyncio.TimeoutError:
+                    yield ': keepalive\n\n'
+                    continue
+                # One version behind: the shared delta; further behind: everything.
+                data = self.delta if self.version == seen + 1 else _encode(self.snapshot)
+                seen = self.version
+                yield sse('stats', data, seen)
+        finally:
+            self.subscribers -= 1
+            if not self.subscribers:
+                self.broadcaster.drop(self)
+
+
+class Broadcaster:
+    """Per-process registry of live channels, one per school."""
+
+    def __init__(self):
+        self.channels = {}
+        self.loop = None
+
+    def channel(self, school_id):
+        self.loop = asyncio.get_running_loop()
+        channel = self.channels.get(school_id)
+        if channel is None:
+            channel = self.channels[school_id] = Channel(self, school_id)
+        return channel
+
+    def drop(self, channel):
+        if self.channels.get(channel.school_id) is channel and not channel.subscribers:
+            del self.channels[channel.school_id]
+            channel._dirty.set()  # let the worker task see there is nobody left and exit
+
+    def _mark(self, school_id):
+        for key, channel in list(self.channels.items()):
+            # None is the all-schools channel; it changes with every school.
+            if key is None or school_id is None or key == school_id:
+                channel.mark_dirty()
+
+    def notify(self, school_id=None):
+        """Mark a school's stats changed; safe to call from any thread."""
+        loop = self.loop
+        if not self.channels or loop is None or loop.is_closed():
+            return
+        loop.call_soon_threadsafe(self._mark, school_id, context=contextvars.Context())
+
+    def stats(self):
+        return {
+            'channels': len(self.channels),
+            'subscribers': sum(c.subscribers for c in self.channels.values()),
+            'computations': sum(c.computations for c in self.channels.values()),
+        }
+
+
+broadcaster = Broadcaster()
+
+
+def _changed(sender, instance, raw=False, **kwargs):
+    if raw or not broadcaster.channels:
+        return
+    school_id = getattr(instance, 'school_id', None)
+    transaction.on_commit(lambda: broadcaster.notify(school_id))
+
+
+def connect_signals():
+    for model in WATCHED_MODELS:
+        post_save.connect(_changed, sender=model, dispatch_uid=f'live-save-{model.__name__}')
+        post_delete.connect(_changed, sender=model, dispatch_uid=f'live-delete-{model.__name__}')
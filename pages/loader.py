@@ -0,0 +1,139 @@
+# loader.py
+"""
+Request-scoped data loading for page and API views.
+
+Views ask ``loader_for(request).get(name, **params)`` for a named dataset
+instead of building querysets inline. Each distinct (name, params) is
+fetched once per request and materialised as a list, so the same rows used
+under several context keys, or looped over and counted in a template, cost
+one query instead of one per use. The datasets themselves are the plain
+functions registered with @dataset below.
+
+QueryCountMiddleware attaches the loader to the request and reports the
+number of SQL statements the request ran (on its own connection) in the
+X-Query-Count response header.
+"""
+import logging
+
+from django.db import connection
+from django.db.models import F, Q, QuerySet
+
+from .models import Activity, Event, Grade, Notification, Staff, Student
+
+logger = logging.getLogger(__name__)
+
+DATASETS = {}
+
+
+def dataset(fetch):
+    DATASETS[fetch.__name__] = fetch
+    return fetch
+
+
+class DataLoader:
+    """Memo of the datasets one request has loaded."""
+
+    def __init__(self):
+        self._loaded = {}
+        self.loads = 0
+        self.hits = 0
+
+    def get(self, name, **params):
+        key = (name, tuple(sorted(params.items())))
+        if key in self._loaded:
+            self.hits += 1
+            return self._loaded[key]
+        value = DATASETS[name](**params)
+        if isinstance(value, QuerySet):
+            value = list(value)
+        self._loaded[key] = value
+        self.loads += 1
+        return value
+
+
+def loader_for(request):
+    """The request's DataLoader (created on first use outside the middleware)."""
+    loader = getattr(request, 'loader', None)
+    if loader is None:
+        loader = request.loader = DataLoader()
+    return loader
+
+
+class QueryCountMiddleware:
+    """Give each request a DataLoader and report its query count in X-Query-Count."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.loader = DataLoader()
+        queries = 0
+
+        def count(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count):
+            response = self.get_response(request)
+        response['X-Query-Count'] = str(queries)
+        logger.debug(
+            '%s %s: %d queries, %d datasets loaded, %d reused',
+            request.method, request.path, queries, request.loader.loads, request.loader.hits,
+        )
+        return response
+
+
+# ============= Datasets =============
+def _limited(queryset, limit):
+    return queryset[:limit] if limit else queryset
+
+
+@dataset
+def grades():
+    return Grade.objects.all()
+
+
+@dataset
+def students(query='', balance=None, order=None, limit=None):
+    """Students with their grade; ``balance`` is 'outstanding' or 'paid'."""
+    rows = Student.objects.select_related('grade')
+    if query:
+        rows = rows.filter(Q(name__icontains=query) | Q(grade__name__icontains=query))
+    if balance == 'outstanding':
+        rows = rows.filter(fees_due__gt=F('fees_paid'))
+    elif balance == 'paid':
+        rows = rows.filter(fees_due__lte=F('fees_paid'))
+    if order:
+        rows = rows.order_by(order)
+    return _limited(rows, limit)
+
+
+@dataset
+def staff(query='', role=None, limit=None):
+    rows = Staff.objects.all()
+    if query:
+        rows = rows.filter(Q(name__icontains=query) | Q(role__icontains=query))
+    if role:
+        rows = rows.filter(role=role)
+    return _limited(rows, limit)
+
+
+@dataset
+def notifications(limit=None):
+    return _limited(Notification.objects.order_by('-date'), limit)
+
+
+@dataset
+def events(limit=None):
+    return _limited(Event.objects.all(), limit)
+
+
+@dataset
+def activities(limit=None):
+    return _limited(Activity.objects.all(), limit)
+
+
+@dataset
+def grade_students(grade_id):
+    return Student.objects.filter(grade_id=grade_id)
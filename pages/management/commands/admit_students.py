@@ -0,0 +1,46 @@
+# pages/management/commands/admit_students.py
+import csv
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from pages import tenancy
+from pages.capacity import admit_many
+from pages.models import Grade
+
+FIELDS = ['name', 'date_of_birth', 'gender', 'email', 'phone', 'address',
+          'parent_name', 'parent_phone', 'parent_email', 'fees_due']
+
+
+class Command(BaseCommand):
+    help = 'Admit students from a CSV file (columns: name, grade, and optional student fields) within grade capacity'
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_file', help='CSV with a header row; "grade" holds the grade name')
+        parser.add_argument('--school', help='School id or code (default: every school)')
+
+    def handle(self, *args, **options):
+        school_id = None
+        if options['school']:
+            try:
+                school_id = tenancy.school_id_for_value(options['school'])
+            except tenancy.TenancyError as e:
+                raise CommandError(str(e))
+        with tenancy.using_school(school_id):
+            grade_ids = dict(Grade.objects.values_list('name', 'id'))
+            applications = []
+            with open(options['csv_file'], newline='') as f:
+                for line, row in enumerate(csv.DictReader(f), start=2):
+                    if row.get('grade') not in grade_ids:
+                        raise CommandError(f"Line {line}: unknown grade {row.get('grade')!r}")
+                    application = {k: row[k] for k in FIELDS if row.get(k)}
+                    application['grade_id'] = grade_ids[row['grade']]
+                    applications.append(application)
+
+            start = time.perf_counter()
+            admitted, rejected = admit_many(applications)
+            elapsed = time.perf_counter() - start
+
+            self.stdout.write(self.style.SUCCESS(f'Admitted {len(admitted)} students in {elapsed:.2f}s.'))
+            if rejected:
+                self.stdout.write(self.style.WARNING(f'{len(rejected)} applicants rejected: grade full.'))
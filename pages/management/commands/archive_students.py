@@ -0,0 +1,41 @@
+# pages/management/commands/archive_students.py
+from django.core.management.base import BaseCommand
+
+from pages.archive import DEFAULT_BATCH_SIZE, archive_students
+
+
+class Command(BaseCommand):
+    help = 'Move graduated/transferred students and their history into the archive tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--years',
+            type=int,
+            default=2,
+            help='Archive students whose record has not changed for this many years (default: 2)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f'Students moved per transaction (default: {DEFAULT_BATCH_SIZE})'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report how many rows would be archived'
+        )
+
+    def handle(self, *args, **options):
+        totals = archive_students(
+            options['years'],
+            batch_size=options['batch_size'],
+            dry_run=options['dry_run'],
+        )
+        prefix = 'Would archive' if options['dry_run'] else 'Archived'
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix} {totals['students']} students, {totals['payments']} payments, "
+            f"{totals['invoices']} invoices, {totals['results']} exam results, "
+            f"{totals['attendance']} attendance records, {totals['activities']} activity memberships "
+            f"and {totals['documents']} documents."
+        ))
@@ -0,0 +1,66 @@
+# pages/management/commands/bench_delivery.py
+import os
+import tempfile
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from pages import delivery, outbox
+from pages.models import Delivery, Notification, OutboxEvent, School
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure delivery throughput: queue synthetic deliveries for a temporary notification and send them to '
+        'a local SMTP sink and the file SMS backend, without rate limits (everything is deleted afterwards)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--messages', type=int, default=10000, help='Deliveries per channel (default: 10000)')
+        parser.add_argument('--batch-size', type=int, default=delivery.BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        if options['messages'] < 1 or options['batch_size'] < 1:
+            raise CommandError('--messages and --batch-size must be at least 1')
+        school = School.objects.order_by('id').first()
+        if school is None:
+            raise CommandError('No schools; run seed first')
+
+        with transaction.atomic():
+            notification = Notification.all_objects.create(
+                school=school, title='Delivery benchmark', message='Benchmark message, please ignore.',
+            )
+            Delivery.all_objects.bulk_create([
+                Delivery(
+                    school=school, notification=notification, channel=channel, address=address, name=f'Parent {i}',
+                )
+                for i in range(options['messages'])
+                for channel, address in (('email', f'parent{i}@example.com'), ('sms', f'+2547{i:08d}'))
+            ], batch_size=1000)
+
+        server = delivery.SmtpSink().start()
+        fd, path = tempfile.mkstemp(suffix='.jsonl')
+        os.close(fd)
+        transports = {
+            'email': delivery.EmailTransport(
+                backend='django.core.mail.backends.smtp.EmailBackend', host='127.0.0.1', port=server.port,
+                use_tls=False, use_ssl=False, username='', password='',
+            ),
+            'sms': delivery.SmsTransport('pages.delivery.FileSmsBackend', path=path),
+        }
+        try:
+            for channel, transport in transports.items():
+                result = delivery.deliver(
+                    channel, options['batch_size'], rate=0, transport=transport, notification_id=notification.pk,
+                )
+                self.stdout.write(
+                    f'{channel:>5}: {result["sent"]} sent, {result["failed"]} failed in '
+                    f'{result["seconds"]:.2f}s ({result["per_second"]}/s)'
+                )
+            self.stdout.write(f'SMTP sink accepted {server.messages} messages.')
+        finally:
+            server.stop()
+            os.remove(path)
+            OutboxEvent.objects.filter(topic=outbox.NOTIFICATION_CREATED, object_id=notification.pk).delete()
+            notification.delete()
+        self.stdout.write(self.style.SUCCESS('Benchmark deliveries removed.'))
@@ -0,0 +1,81 @@
+# pages/management/commands/bench_outbox.py
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from pages import outbox
+from pages.models import OutboxCheckpoint, OutboxEvent, Student
+
+CONSUMER = 'bench'
+
+
+class _Accept(BaseHTTPRequestHandler):
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure outbox throughput: write synthetic events in one transaction, then relay them to the null, '
+        'file and a local HTTP sink (the benchmark events and checkpoint are deleted afterwards)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--events', type=int, default=20000, help='Events to write (default: 20000)')
+        parser.add_argument('--batch-size', type=int, default=outbox.BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        if options['events'] < 1 or options['batch_size'] < 1:
+            raise CommandError('--events and --batch-size must be at least 1')
+        student = Student.all_objects.only('id', 'school_id', 'student_id').first()
+        if student is None:
+            raise CommandError('No students; run seed first')
+
+        start = OutboxEvent.objects.aggregate(last=Max('id'))['last'] or 0
+        rows = [
+            (student.pk, student.school_id, {'student_id': student.student_id, 'from': 'active', 'to': 'active'})
+        ] * options['events']
+        started = time.perf_counter()
+        with transaction.atomic():
+            outbox.emit_bulk('bench', Student, rows)
+        seconds = time.perf_counter() - started
+        self.stdout.write(f'Wrote {options["events"]} events in {seconds:.2f}s ({options["events"] / seconds:.0f}/s)')
+        # Past the settle window, so the relay sees them straight away.
+        OutboxEvent.objects.filter(id__gt=start, topic='bench').update(created_at=timezone.now() - 2 * outbox.SETTLE)
+
+        server = ThreadingHTTPServer(('127.0.0.1', 0), _Accept)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        fd, path = tempfile.mkstemp(suffix='.jsonl')
+        os.close(fd)
+        sinks = {
+            'null': outbox.NullSink(),
+            'file': outbox.FileSink(path),
+            'http': outbox.HttpSink(f'http://127.0.0.1:{server.server_port}/'),
+        }
+        try:
+            for name, sink in sinks.items():
+                OutboxCheckpoint.objects.update_or_create(consumer=CONSUMER, defaults={'position': start, 'gaps': {}})
+                result = outbox.relay(sink, CONSUMER, options['batch_size'], max_events=options['events'])
+                self.stdout.write(
+                    f'{name:>4}: {result["delivered"]} events in {result["batches"]} batches, '
+                    f'{result["seconds"]:.2f}s ({result["events_per_second"]}/s)'
+                )
+        finally:
+            server.shutdown()
+            server.server_close()
+            os.remove(path)
+            OutboxCheckpoint.objects.filter(consumer=CONSUMER).delete()
+            OutboxEvent.objects.filter(id__gt=start, topic='bench').delete()
+        self.stdout.write(self.style.SUCCESS('Benchmark events removed.'))
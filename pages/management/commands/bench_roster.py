@@ -0,0 +1,86 @@
+# pages/management/commands/bench_roster.py
+import gc
+import time
+import tracemalloc
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from pages import roster
+from pages.models import Student
+
+
+class Command(BaseCommand):
+    help = (
+        'Load the columnar roster and time histograms, percentiles and group-bys over it; compare its memory '
+        'with loading the same students as model instances (seed e.g. 100000 students first)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per operation; the best is reported')
+        parser.add_argument(
+            '--instances', type=int, default=20000,
+            help='Model instances to load for the memory comparison (default: 20000; 0 to skip)'
+        )
+
+    def _time(self, label, func, repeat):
+        best = min(self._once(func) for _ in range(repeat))
+        self.stdout.write(f'  {label:<28} {best * 1000:8.1f} ms')
+
+    @staticmethod
+    def _once(func):
+        started = time.perf_counter()
+        func()
+        return time.perf_counter() - started
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1:
+            raise CommandError('--repeat must be at least 1')
+        started = time.perf_counter()
+        data = roster.Roster()
+        data.load()
+        loaded = time.perf_counter() - started
+        gc.collect()
+        tracemalloc.start()  # a second load, traced (tracing slows it down several times)
+        traced = roster.Roster()
+        traced.load()
+        heap = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del traced
+        if not len(data):
+            raise CommandError('No students; run seed first')
+        self.stdout.write(
+            f'Loaded {len(data)} students in {loaded:.2f}s: {data.nbytes() / 1024:.0f} KiB of columns, '
+            f'{heap / 1024:.0f} KiB heap with the id index ({heap / len(data):.0f} B/student)'
+        )
+
+        if options['instances']:
+            gc.collect()
+            tracemalloc.start()
+            instances = list(Student.all_objects.all()[:options['instances']])
+            per_instance = tracemalloc.get_traced_memory()[0] / len(instances)
+            tracemalloc.stop()
+            del instances
+            self.stdout.write(
+                f'Model instances: {per_instance:.0f} B/student '
+                f'({per_instance / (heap / len(data)):.0f}x the roster)'
+            )
+
+        repeat = options['repeat']
+        self.stdout.write(f'Operations over {len(data)} students (best of {repeat}):')
+        balance = data.column('balance')
+        grade_id = data.grade[0]
+        self._time('balance column', lambda: data.column('balance'), repeat)
+        self._time('balance histogram (20 bins)', lambda: roster.histogram(balance, 20), repeat)
+        self._time('balance percentiles', lambda: roster.percentiles(balance), repeat)
+        self._time('balance by grade', lambda: roster.group_by(data.keys('grade'), balance), repeat)
+        self._time('status mix', lambda: Counter(data.keys('status')), repeat)
+        self._time('age histogram', lambda: Counter(data.column('age')), repeat)
+        self._time('one grade, active (mask)', lambda: data.column('balance', data.mask(
+            grade_id=grade_id, status='active')), repeat)
+        self._time('full summary', lambda: roster.summary(data=data), repeat)
+
+        started = time.perf_counter()
+        data.catch_up()
+        self.stdout.write(f'Catch-up with the database: {(time.perf_counter() - started) * 1000:.1f} ms')
+        self.stdout.write(self.style.SUCCESS('Roster benchmark complete.'))
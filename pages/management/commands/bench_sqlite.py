@@ -0,0 +1,89 @@
+# pages/management/commands/bench_sqlite.py
+import multiprocessing
+import os
+import random
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+
+def _worker(worker_id, seconds, write_ratio, student_ids, grade_ids, results):
+    """Run a read/write mix against the shared database file for ``seconds``."""
+    import django
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'django_project.settings')
+    django.setup()
+
+    from django.db import OperationalError, transaction
+    from django.db.models import F, Sum
+    from pages.models import Student
+
+    rng = random.Random(worker_id)
+    reads = writes = errors = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        try:
+            if rng.random() < write_ratio:
+                with transaction.atomic():
+                    Student.objects.filter(pk=rng.choice(student_ids)).update(fees_paid=F('fees_paid') + 1)
+                writes += 1
+            else:
+                Student.objects.filter(grade_id=rng.choice(grade_ids)).aggregate(Sum('fees_due'))
+                reads += 1
+        except OperationalError:  # "database is locked" after busy_timeout
+            errors += 1
+    connections.close_all()
+    results.put((reads, writes, errors))
+
+
+class Command(BaseCommand):
+    help = 'Measure concurrent read/write throughput of several worker processes on the SQLite file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help='Worker processes (default: 4)')
+        parser.add_argument('--seconds', type=float, default=5.0, help='Duration per run (default: 5)')
+        parser.add_argument(
+            '--write-ratio',
+            type=float,
+            default=0.1,
+            help='Fraction of operations that are writes (default: 0.1)'
+        )
+
+    def handle(self, *args, **options):
+        from pages.db import current_pragmas
+        from pages.models import Grade, Student
+
+        if connections['default'].vendor != 'sqlite' or ':memory:' in str(settings.DATABASES['default']['NAME']):
+            raise CommandError('bench_sqlite needs the file-backed SQLite profile (set RENDER).')
+        student_ids = list(Student.objects.values_list('id', flat=True))
+        grade_ids = list(Grade.objects.values_list('id', flat=True))
+        if not student_ids:
+            raise CommandError('No students to work on; run "manage.py seed" first.')
+
+        self.stdout.write(f"Database: {settings.DATABASES['default']['NAME']}")
+        for name, value in current_pragmas().items():
+            self.stdout.write(f'  {name} = {value}')
+        connections.close_all()  # never share a connection with child processes
+
+        ctx = multiprocessing.get_context('spawn')
+        results = ctx.Queue()
+        workers = [
+            ctx.Process(target=_worker, args=(i, options['seconds'], options['write_ratio'],
+                                              student_ids, grade_ids, results))
+            for i in range(options['workers'])
+        ]
+        for process in workers:
+            process.start()
+        totals = [results.get() for _ in workers]
+        for process in workers:
+            process.join()
+
+        reads = sum(r for r, _, _ in totals)
+        writes = sum(w for _, w, _ in totals)
+        errors = sum(e for _, _, e in totals)
+        seconds = options['seconds']
+        self.stdout.write(self.style.SUCCESS(
+            f"{options['workers']} workers, {seconds:.0f}s: "
+            f"{reads / seconds:,.0f} reads/s, {writes / seconds:,.0f} writes/s, {errors} lock errors"
+        ))
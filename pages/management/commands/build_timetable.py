@@ -0,0 +1,69 @@
+# pages/management/commands/build_timetable.py
+from django.core.management.base import BaseCommand, CommandError
+
+from pages import tenancy
+from pages.models import TeachingAssignment
+from pages.timetable import PERIODS_PER_DAY, auto_assign, build_timetable
+
+
+class Command(BaseCommand):
+    help = 'Generate the weekly timetable from teaching assignments without teacher, grade or room clashes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--assign',
+            action='store_true',
+            help='First create missing grade/subject assignments from teachers\' subjects'
+        )
+        parser.add_argument(
+            '--periods-per-week',
+            type=int,
+            default=5,
+            help='Periods per week for assignments created by --assign (default: 5)'
+        )
+        parser.add_argument(
+            '--periods-per-day',
+            type=int,
+            default=PERIODS_PER_DAY,
+            help=f'Teaching periods per day (default: {PERIODS_PER_DAY})'
+        )
+        parser.add_argument('--no-rooms', action='store_true', help='Do not allocate rooms')
+        parser.add_argument('--school', help='School id or code (default: every school)')
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report what would be scheduled without saving'
+        )
+
+    def handle(self, *args, **options):
+        school_id = None
+        if options['school']:
+            try:
+                school_id = tenancy.school_id_for_value(options['school'])
+            except tenancy.TenancyError as e:
+                raise CommandError(str(e))
+        with tenancy.using_school(school_id):
+            if options['assign']:
+                created = auto_assign(options['periods_per_week'], options['periods_per_day'])
+                self.stdout.write(f'Created {created} teaching assignments.')
+
+            result = build_timetable(
+                periods_per_day=options['periods_per_day'],
+                use_rooms=not options['no_rooms'],
+                dry_run=options['dry_run'],
+            )
+            unplaced = list(result['unplaced'].items())
+            if unplaced:
+                shown = dict(unplaced[:20])
+                names = {a.id: str(a) for a in TeachingAssignment.objects.filter(id__in=shown)
+                         .select_related('teacher', 'grade', 'subject')}
+                for assignment_id, lessons in shown.items():
+                    self.stdout.write(self.style.WARNING(f'  {names[assignment_id]}: {lessons} lesson(s) did not fit'))
+                if len(unplaced) > len(shown):
+                    self.stdout.write(self.style.WARNING(f'  ... and {len(unplaced) - len(shown)} more assignments'))
+
+            prefix = 'Dry run: would place' if options['dry_run'] else 'Placed'
+            self.stdout.write(self.style.SUCCESS(
+                f"{prefix} {result['lessons_placed']} lessons for {result['assignments']} assignments "
+                f"in {result['seconds']:.2f}s ({result['lessons_unplaced']} unplaced)."
+            ))
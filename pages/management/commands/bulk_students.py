@@ -0,0 +1,63 @@
+# pages/management/commands/bulk_students.py
+from django.core.management.base import BaseCommand, CommandError
+
+from pages import tenancy
+from pages.bulk import ACTIONS, BulkActionError, run
+from pages.models import Grade
+
+
+class Command(BaseCommand):
+    help = 'Apply a bulk action (promote, add_fees, set_status) to a filtered set of students'
+
+    def add_arguments(self, parser):
+        parser.add_argument('action', choices=ACTIONS)
+        parser.add_argument('--grade', help='Grade id or name to restrict to')
+        parser.add_argument('--school', help='School id or code (default: every school)')
+        parser.add_argument('--status', help='Only students with this status')
+        parser.add_argument('--ids', help='Comma-separated student ids')
+        parser.add_argument('--amount', help='Fee amount for add_fees')
+        parser.add_argument('--new-status', help='Target status for set_status')
+        parser.add_argument(
+            '--ignore-capacity',
+            action='store_true',
+            help='Promote even if a grade would exceed its capacity'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report affected counts without changing anything'
+        )
+
+    def handle(self, *args, **options):
+        school_id = None
+        if options['school']:
+            try:
+                school_id = tenancy.school_id_for_value(options['school'])
+            except tenancy.TenancyError as e:
+                raise CommandError(str(e))
+        with tenancy.using_school(school_id):
+            grade = options['grade']
+            if grade and not grade.isdigit():
+                try:
+                    grade = Grade.objects.get(name=grade).id
+                except Grade.DoesNotExist:
+                    raise CommandError(f'Grade not found: {grade}')
+            ids = [int(i) for i in options['ids'].split(',') if i.strip()] if options['ids'] else None
+
+            try:
+                result = run(
+                    options['action'],
+                    grade=grade,
+                    status=options['status'],
+                    ids=ids,
+                    dry_run=options['dry_run'],
+                    amount=options['amount'],
+                    new_status=options['new_status'],
+                    enforce_capacity=not options['ignore_capacity'],
+                )
+            except BulkActionError as e:
+                raise CommandError(str(e))
+
+            prefix = 'Dry run: would affect' if options['dry_run'] else 'Affected'
+            details = ', '.join(f'{k}={v}' for k, v in result.items() if k not in ('action', 'dry_run', 'affected'))
+            self.stdout.write(self.style.SUCCESS(f"{prefix} {result['affected']} students ({details})."))
@@ -0,0 +1,50 @@
+# pages/management/commands/generate_invoices.py
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from pages.invoicing import InvoicingError, generate
+from pages.models import Grade, Term
+
+
+class Command(BaseCommand):
+    help = 'Issue invoices for a term from its fee schedules and add them to student balances'
+
+    def add_arguments(self, parser):
+        parser.add_argument('term', help='Term id or name')
+        parser.add_argument('--grade', help='Grade id or name to restrict to')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Invoices written per bulk insert (default: 1000)'
+        )
+
+    def handle(self, *args, **options):
+        term = options['term']
+        lookup = {'id': term} if term.isdigit() else {'name': term}
+        try:
+            term = Term.objects.get(**lookup)
+        except Term.DoesNotExist:
+            raise CommandError(f'Term not found: {options["term"]}')
+
+        grade = options['grade']
+        if grade and not grade.isdigit():
+            try:
+                grade = Grade.objects.get(name=grade).id
+            except Grade.DoesNotExist:
+                raise CommandError(f'Grade not found: {grade}')
+
+        start = time.perf_counter()
+        try:
+            result = generate(term, grade=grade, batch_size=options['batch_size'])
+        except InvoicingError as e:
+            raise CommandError(str(e))
+        elapsed = time.perf_counter() - start
+
+        for schedule in result['schedules']:
+            self.stdout.write(f"  {schedule['schedule']}: {schedule['invoiced']} invoices of ${schedule['amount']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Issued {result['invoiced']} invoices for {result['term']} in {elapsed:.2f}s "
+            f"({result['students_updated']} balances updated)."
+        ))
@@ -0,0 +1,119 @@
+# pages/management/commands/live_soak.py
+import asyncio
+import time
+import tracemalloc
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from pages import audit, outbox
+from pages.live import broadcaster
+from pages.models import Notification, OutboxEvent, Tombstone
+
+
+def _create_notification():
+    with audit.suppressed():
+        return Notification.objects.create(title='Live soak', message='Temporary notification from live_soak')
+
+
+def _delete_notification(notification):
+    """Delete a soak notification and everything its save and delete left behind."""
+    pk = notification.pk
+    with audit.suppressed():
+        notification.delete()
+    OutboxEvent.objects.filter(topic=outbox.NOTIFICATION_CREATED, object_id=pk).delete()
+    Tombstone.objects.filter(model_name='notifications', object_id=pk).delete()
+
+
+class Command(BaseCommand):
+    help = (
+        'Open many live dashboard streams against the in-process ASGI app, then measure memory per idle '
+        'connection, shared recomputations and fan-out latency (creates and deletes one unaudited notification per '
+        'change, removing its outbox event and sync tombstone)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=500, help='Concurrent streams (default: 500)')
+        parser.add_argument('--changes', type=int, default=3, help='Changes to broadcast (default: 3)')
+        parser.add_argument('--hold', type=float, default=2.0, help='Seconds to hold the streams idle (default: 2)')
+        parser.add_argument('--timeout', type=float, default=30.0, help='Give up waiting after this many seconds')
+
+    def handle(self, *args, **options):
+        if options['clients'] < 1:
+            raise CommandError('--clients must be at least 1')
+        asyncio.run(self.soak(options['clients'], options['changes'], options['hold'], options['timeout']))
+
+    async def soak(self, clients, changes, hold, timeout):
+        from django_project.asgi import application
+
+        host = next((h for h in settings.ALLOWED_HOSTS if '*' not in h), 'localhost')
+        chunks = [[] for _ in range(clients)]
+        arrived = asyncio.Condition()
+        closing = asyncio.Event()
+
+        async def client(i):
+            requested = False
+
+            async def receive():
+                nonlocal requested
+                if not requested:
+                    requested = True
+                    return {'type': 'http.request', 'body': b'', 'more_body': False}
+                await closing.wait()
+                return {'type': 'http.disconnect'}
+
+            async def send(message):
+                if message['type'] == 'http.response.body' and message.get('body'):
+                    chunks[i].append(message['body'])
+                    async with arrived:
+                        arrived.notify_all()
+
+            await application({
+                'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+                'method': 'GET', 'scheme': 'http', 'path': '/api/dashboard/stream/',
+                'raw_path': b'/api/dashboard/stream/', 'query_string': b'', 'root_path': '',
+                'headers': [(b'host', host.encode())], 'client': ('127.0.0.1', 20000 + i), 'server': (host, 80),
+            }, receive, send)
+
+        async def all_have(count):
+            async with arrived:
+                await asyncio.wait_for(
+                    arrived.wait_for(lambda: all(len(c) >= count for c in chunks)), timeout,
+                )
+
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        started = time.perf_counter()
+        tasks = [asyncio.create_task(client(i)) for i in range(clients)]
+        await all_have(1)
+        connected = time.perf_counter() - started
+        await asyncio.sleep(hold)
+        per_client = (tracemalloc.get_traced_memory()[0] - baseline) / clients
+        tracemalloc.stop()
+        stats = broadcaster.stats()
+        self.stdout.write(
+            f'{clients} streams open in {connected:.2f}s, {stats["computations"]} stats computation(s); '
+            f'~{per_client / 1024:.1f} KiB Python heap per idle stream after {hold:g}s'
+        )
+
+        for n in range(changes):
+            before = broadcaster.stats()['computations']
+            started = time.perf_counter()
+            notification = await sync_to_async(_create_notification)()
+            await all_have(2 + 2 * n)
+            created = time.perf_counter() - started
+            await sync_to_async(_delete_notification)(notification)
+            await all_have(3 + 2 * n)
+            deleted = time.perf_counter() - started - created
+            self.stdout.write(
+                f'Change {n + 1}: fan-out to {clients} streams in {created * 1000:.0f} ms (create) / '
+                f'{deleted * 1000:.0f} ms (delete), '
+                f'{broadcaster.stats()["computations"] - before} computation(s)'
+            )
+
+        closing.set()
+        await asyncio.wait_for(asyncio.gather(*tasks, return_exceptions=True), timeout)
+        left = broadcaster.stats()['subscribers']
+        style = self.style.SUCCESS if not left else self.style.ERROR
+        self.stdout.write(style(f'All streams closed; {left} subscriber(s) left.'))
@@ -0,0 +1,52 @@
+# pages/management/commands/outbox_http_stub.py
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Local HTTP endpoint for the outbox http sink: accepts POSTed batches and counts their events'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--quiet', action='store_true', help='Do not log every batch')
+
+    def handle(self, *args, **options):
+        counts = {'batches': 0, 'events': 0}
+        lock = threading.Lock()
+        stdout, quiet = self.stdout, options['quiet']
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                try:
+                    events = json.loads(body)['events']
+                except (ValueError, KeyError):
+                    self.send_error(400, 'Expected {"events": [...]}')
+                    return
+                with lock:
+                    counts['batches'] += 1
+                    counts['events'] += len(events)
+                    total = counts['events']
+                if not quiet and events:
+                    stdout.write(f'{len(events)} events, ids {events[0]["id"]}-{events[-1]["id"]} ({total} total)')
+                self.send_response(204)
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((options['host'], options['port']), Handler)
+        self.stdout.write(f'Outbox stub listening on http://{options["host"]}:{options["port"]}/ (Ctrl+C to stop)')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+        self.stdout.write(self.style.SUCCESS(
+            f'Received {counts["events"]} events in {counts["batches"]} batches.'
+        ))
@@ -0,0 +1,58 @@
+# pages/management/commands/plan_capacity.py
+from django.core.management.base import BaseCommand, CommandError
+
+from pages import tenancy
+from pages.capacity import plan_rollover, recount
+from pages.models import Grade
+
+
+class Command(BaseCommand):
+    help = "Simulate next year's grade rollover and report over/under-subscribed grades"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--new',
+            action='append',
+            default=[],
+            metavar='GRADE=COUNT',
+            help='Expected new admissions for a grade, e.g. --new "Kindergarten=40" (repeatable)'
+        )
+        parser.add_argument(
+            '--recount',
+            action='store_true',
+            help='Resynchronise Grade.enrolled_count from the student table first'
+        )
+        parser.add_argument('--school', help='School id or code (default: every school)')
+
+    def handle(self, *args, **options):
+        school_id = None
+        if options['school']:
+            try:
+                school_id = tenancy.school_id_for_value(options['school'])
+            except tenancy.TenancyError as e:
+                raise CommandError(str(e))
+        with tenancy.using_school(school_id):
+            if options['recount']:
+                recount()
+                self.stdout.write('Enrolment counters resynchronised.')
+
+            grade_ids = dict(Grade.objects.values_list('name', 'id'))
+            new_enrollments = {}
+            for item in options['new']:
+                name, _, count = item.rpartition('=')
+                if name not in grade_ids or not count.isdigit():
+                    raise CommandError(f'Invalid --new value: {item}')
+                new_enrollments[grade_ids[name]] = int(count)
+
+            plan = plan_rollover(new_enrollments)
+            self.stdout.write(f"{'Grade':<15}{'Capacity':>10}{'Current':>10}{'Incoming':>10}{'Projected':>11}  Status")
+            for row in plan['grades']:
+                line = (f"{row['grade']:<15}{row['capacity']:>10}{row['current']:>10}"
+                        f"{row['incoming']:>10}{row['projected']:>11}  {row['status']}")
+                if row['status'] == 'over':
+                    self.stdout.write(self.style.ERROR(line))
+                elif row['status'] == 'under':
+                    self.stdout.write(self.style.WARNING(line))
+                else:
+                    self.stdout.write(line)
+            self.stdout.write(f"Graduating: {plan['graduating']}")
@@ -0,0 +1,20 @@
+# pages/management/commands/prune_documents.py
+from django.core.management.base import BaseCommand
+
+from pages.documents import prune
+
+
+class Command(BaseCommand):
+    help = 'Delete stored document files (and their thumbnails) that no document refers to any more'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace-minutes',
+            type=int,
+            default=60,
+            help='Leave files written or re-uploaded this recently (default: 60), so uploads in progress are safe'
+        )
+
+    def handle(self, *args, **options):
+        removed = prune(options['grace_minutes'] * 60)
+        self.stdout.write(self.style.SUCCESS(f'Deleted {removed} unreferenced files.'))
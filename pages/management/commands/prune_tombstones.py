@@ -0,0 +1,23 @@
+# pages/management/commands/prune_tombstones.py
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from pages.sync import TOMBSTONE_RETENTION, prune_tombstones
+
+
+class Command(BaseCommand):
+    help = 'Delete delta-sync tombstones older than the sync token lifetime'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=TOMBSTONE_RETENTION.days,
+            help=f'Keep tombstones this many days (default: {TOMBSTONE_RETENTION.days}); '
+                 'clients with older tokens must resync'
+        )
+
+    def handle(self, *args, **options):
+        deleted = prune_tombstones(timedelta(days=options['days']))
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} tombstones.'))
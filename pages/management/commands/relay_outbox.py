@@ -0,0 +1,69 @@
+# pages/management/commands/relay_outbox.py
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from pages import outbox
+
+
+class Command(BaseCommand):
+    help = (
+        'Deliver outbox events (payments, student status changes, notifications) to a sink in checkpointed '
+        'batches; run with --follow as a long-lived relay'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sink', default='file',
+            help='file, http, null or the dotted path of a sink class (default: file)'
+        )
+        parser.add_argument('--path', default='outbox.jsonl', help='File sink: JSON lines file to append to')
+        parser.add_argument('--url', help='HTTP sink: URL each batch is POSTed to')
+        parser.add_argument('--consumer', default='default', help='Checkpoint name (one per downstream system)')
+        parser.add_argument('--batch-size', type=int, default=outbox.BATCH_SIZE)
+        parser.add_argument('--follow', action='store_true', help='Keep polling for new events')
+        parser.add_argument('--interval', type=float, default=1.0, help='Seconds between polls with --follow')
+        parser.add_argument('--compact', action='store_true', help='Afterwards delete events all consumers have')
+        parser.add_argument(
+            '--keep-days', type=int, default=outbox.KEEP.days,
+            help=f'With --compact, keep delivered events this many days (default: {outbox.KEEP.days})'
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+        if options['sink'] == 'http' and not options['url']:
+            raise CommandError('The http sink needs --url')
+        try:
+            sink = outbox.get_sink(options['sink'], path=options['path'], url=options['url'])
+        except ImportError as e:
+            raise CommandError(f'Unknown sink {options["sink"]}: {e}')
+
+        try:
+            while True:
+                try:
+                    result = outbox.relay(sink, options['consumer'], options['batch_size'])
+                except outbox.OutboxError as e:
+                    if not options['follow']:
+                        raise CommandError(str(e))
+                    self.stderr.write(f'{e}; retrying')  # the checkpoint still points at the failed batch
+                    result = None
+                if result and result['delivered']:
+                    self.stdout.write(
+                        f'{result["delivered"]} events in {result["batches"]} batches to {options["sink"]} '
+                        f'({result["events_per_second"]}/s), {options["consumer"]} at {result["position"]} '
+                        f'with {result["gaps"]} gap(s) open'
+                    )
+                if not options['follow']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            sink.close()
+
+        if options['compact']:
+            deleted = outbox.compact(timedelta(days=options['keep_days']))
+            self.stdout.write(f'Compacted {deleted} delivered events.')
+        self.stdout.write(self.style.SUCCESS('Outbox relayed.'))
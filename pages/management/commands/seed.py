@@ -6,7 +6,10 @@ import random
 from decimal import Decimal
 from datetime import date, timedelta
 
-from pages.models import Grade, Student, Staff, Notification, Event, Activity
+from pages.capacity import recount
+from pages.models import Grade, School, Student, Staff, Notification, Event, Activity
+from pages.tenancy import default_school_id, using_school
+from pages.timetable import link_subjects_from_text
 
 fake = Faker()
 
@@ -31,8 +34,23 @@ class Command(BaseCommand):
             action='store_true',
             help='Clear existing data before seeding'
         )
+        parser.add_argument(
+            '--school',
+            help='Code of the school (campus) to seed, created if missing (default: the main school)'
+        )
 
     def handle(self, *args, **options):
+        if options['school']:
+            school, _ = School.objects.get_or_create(
+                code=options['school'], defaults={'name': options['school'].replace('-', ' ').title()}
+            )
+            school_id = school.id
+        else:
+            school_id = default_school_id()
+        with using_school(school_id):
+            self.seed(options)
+
+    def seed(self, options):
         if options['clear']:
             self.stdout.write('Clearing existing data...')
             self.clear_data()
@@ -79,7 +97,8 @@ class Command(BaseCommand):
                 name=grade_data["name"],
                 defaults={
                     'description': grade_data["description"],
-                    'capacity': grade_data["capacity"]
+                    'capacity': grade_data["capacity"],
+                    'level': self.extract_grade_number(grade_data["name"]),
                 }
             )
             if created:
@@ -128,6 +147,7 @@ class Command(BaseCommand):
             if i % 10 == 0:
                 self.stdout.write(f'Created {i+1} students...')
         
+        recount()
         self.stdout.write(f'Created {count} students total.')
 
     def seed_staff(self, count):
@@ -163,6 +183,7 @@ class Command(BaseCommand):
                 qualifications=fake.text(max_nb_chars=200) if random.choice([True, False]) else '',
                 subjects=subjects
             )
+        link_subjects_from_text()
         
         self.stdout.write(f'Created {count} staff members.')
 
@@ -0,0 +1,63 @@
+# pages/management/commands/send_notifications.py
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from pages import delivery
+from pages.models import Notification
+
+
+class Command(BaseCommand):
+    help = (
+        'Send pending notification deliveries by email and SMS in batches, one connection per batch and within '
+        'the provider rate limits; run with --follow as a long-lived sender'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--channel', choices=[*delivery.CHANNELS, 'all'], default='all')
+        parser.add_argument('--batch-size', type=int, default=delivery.BATCH_SIZE)
+        parser.add_argument(
+            '--rate', type=float,
+            help='Messages per second (default: DELIVERY_RATE_LIMITS for the channel; 0 for no limit)'
+        )
+        parser.add_argument('--limit', type=int, help='Send at most this many messages per channel')
+        parser.add_argument(
+            '--queue', action='store_true',
+            help='First queue deliveries for notifications that have none (e.g. created in the admin)'
+        )
+        parser.add_argument('--follow', action='store_true', help='Keep polling for new deliveries')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds between polls with --follow')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+        channels = delivery.CHANNELS if options['channel'] == 'all' else [options['channel']]
+
+        if options['queue']:
+            queued = 0
+            for notification in Notification.all_objects.filter(deliveries__isnull=True).iterator():
+                queued += delivery.queue(notification)
+            self.stdout.write(f'Queued {queued} deliveries.')
+
+        try:
+            transports = {channel: delivery.get_transport(channel) for channel in channels}
+        except ImportError as e:
+            raise CommandError(f'Cannot load SMS_BACKEND: {e}')
+
+        try:
+            while True:
+                for channel in channels:
+                    result = delivery.deliver(
+                        channel, options['batch_size'], options['rate'], options['limit'], transports[channel],
+                    )
+                    if result['sent'] or result['failed']:
+                        self.stdout.write(
+                            f'{channel}: {result["sent"]} sent, {result["failed"]} failed in '
+                            f'{result["seconds"]:.2f}s ({result["per_second"]}/s)'
+                        )
+                if not options['follow']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS('Notifications sent.'))
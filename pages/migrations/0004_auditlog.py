@@ -0,0 +1,76 @@
+# Generated by Django 5.2.4 on 2026-10-19 08:00
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pages", "0003_activityparticipant_feepayment_and_more"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AuditLog",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("model_name", models.CharField(max_length=50)),
+                ("object_id", models.CharField(max_length=50)),
+                ("object_repr", models.CharField(blank=True, max_length=200)),
+                (
+                    "action",
+                    models.CharField(
+                        choices=[
+                            ("create", "Create"),
+                            ("update", "Update"),
+                            ("delete", "Delete"),
+                            ("bulk", "Bulk Update"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "changes",
+                    models.JSONField(
+                        blank=True, default=dict, help_text="Field name -> [old, new]"
+                    ),
+                ),
+                ("actor_repr", models.CharField(blank=True, max_length=150)),
+                ("timestamp", models.DateTimeField(default=django.utils.timezone.now)),
+                (
+                    "actor",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-timestamp"],
+                "indexes": [
+                    models.Index(
+                        fields=["model_name", "object_id", "-timestamp"],
+                        name="pages_audit_model_n_e1a630_idx",
+                    ),
+                    models.Index(
+                        fields=["actor", "-timestamp"],
+                        name="pages_audit_actor_i_199daf_idx",
+                    ),
+                ],
+            },
+        ),
+    ]
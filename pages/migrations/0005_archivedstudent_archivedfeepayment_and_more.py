@@ -0,0 +1,132 @@
+# Generated by Django 5.2.4 on 2026-10-19 08:01
+
+import django.db.models.deletion
+import django.utils.timezone
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pages", "0004_auditlog"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedStudent",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("name", models.CharField(max_length=100)),
+                ("student_id", models.CharField(db_index=True, max_length=20)),
+                ("grade_id", models.BigIntegerField(blank=True, null=True)),
+                ("grade_name", models.CharField(blank=True, max_length=20)),
+                ("date_of_birth", models.DateField(blank=True, null=True)),
+                (
+                    "gender",
+                    models.CharField(
+                        blank=True,
+                        choices=[("M", "Male"), ("F", "Female")],
+                        max_length=1,
+                    ),
+                ),
+                ("email", models.EmailField(blank=True, max_length=254, null=True)),
+                ("phone", models.CharField(blank=True, max_length=15)),
+                ("address", models.TextField(blank=True)),
+                ("parent_name", models.CharField(blank=True, max_length=100)),
+                ("parent_phone", models.CharField(blank=True, max_length=15)),
+                (
+                    "parent_email",
+                    models.EmailField(blank=True, max_length=254, null=True),
+                ),
+                (
+                    "fees_due",
+                    models.DecimalField(
+                        decimal_places=2, default=Decimal("0.00"), max_digits=10
+                    ),
+                ),
+                (
+                    "fees_paid",
+                    models.DecimalField(
+                        decimal_places=2, default=Decimal("0.00"), max_digits=10
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("active", "Active"),
+                            ("inactive", "Inactive"),
+                            ("graduated", "Graduated"),
+                            ("transferred", "Transferred"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("enrolled_on", models.DateField(blank=True, null=True)),
+                ("created_at", models.DateTimeField(blank=True, null=True)),
+                ("updated_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "archived_at",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+            ],
+            options={
+                "ordering": ["name"],
+            },
+        ),
+        migrations.CreateModel(
+            name="ArchivedFeePayment",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("amount", models.DecimalField(decimal_places=2, max_digits=10)),
+                (
+                    "payment_method",
+                    models.CharField(
+                        choices=[
+                            ("cash", "Cash"),
+                            ("bank_transfer", "Bank Transfer"),
+                            ("cheque", "Cheque"),
+                            ("online", "Online Payment"),
+                            ("card", "Card Payment"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("reference_number", models.CharField(blank=True, max_length=100)),
+                ("notes", models.TextField(blank=True)),
+                ("payment_date", models.DateField(blank=True, null=True)),
+                ("recorded_at", models.DateTimeField(blank=True, null=True)),
+                ("recorded_by_id", models.BigIntegerField(blank=True, null=True)),
+                (
+                    "student",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="payments",
+                        to="pages.archivedstudent",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-payment_date"],
+            },
+        ),
+        migrations.CreateModel(
+            name="ArchivedActivityParticipant",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("activity_id", models.BigIntegerField()),
+                ("activity_title", models.CharField(max_length=100)),
+                ("date_joined", models.DateField(blank=True, null=True)),
+                ("is_active", models.BooleanField(default=False)),
+                (
+                    "student",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="activities",
+                        to="pages.archivedstudent",
+                    ),
+                ),
+            ],
+        ),
+    ]
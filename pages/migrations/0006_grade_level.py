@@ -0,0 +1,36 @@
+# Generated by Django 5.2.4 on 2026-10-19 08:02
+
+from django.db import migrations, models
+
+
+def populate_levels(apps, schema_editor):
+    Grade = apps.get_model("pages", "Grade")
+    for grade in Grade.objects.filter(level__isnull=True):
+        name = grade.name.strip().lower()
+        if name.startswith("kindergarten"):
+            grade.level = 0
+        elif name.startswith("grade ") and name[6:].strip().isdigit():
+            grade.level = int(name[6:].strip())
+        else:
+            continue
+        grade.save(update_fields=["level"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pages", "0005_archivedstudent_archivedfeepayment_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="grade",
+            name="level",
+            field=models.PositiveSmallIntegerField(
+                blank=True,
+                help_text="Position in the promotion sequence (Kindergarten = 0)",
+                null=True,
+            ),
+        ),
+        migrations.RunPython(populate_levels, migrations.RunPython.noop),
+    ]
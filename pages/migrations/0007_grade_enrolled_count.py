@@ -0,0 +1,30 @@
+# Generated by Django 5.2.4 on 2026-10-19 08:03
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def populate_enrolled_count(apps, schema_editor):
+    Grade = apps.get_model("pages", "Grade")
+    for grade in Grade.objects.annotate(n=Count("student")):
+        Grade.objects.filter(pk=grade.pk).update(enrolled_count=grade.n)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pages", "0006_grade_level"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="grade",
+            name="enrolled_count",
+            field=models.PositiveIntegerField(
+                default=0,
+                editable=False,
+                help_text="Students assigned to this grade, kept by pages.capacity",
+            ),
+        ),
+        migrations.RunPython(populate_enrolled_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.4 on 2026-10-19 08:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pages", "0007_grade_enrolled_count"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="feepayment",
+            index=models.Index(
+                fields=["student", "payment_date"],
+                name="pages_feepa_student_90c3b3_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,142 @@
+# Generated by Django 5.2.4 on 2026-10-19 08:13
+
+import django.db.models.deletion
+import pages.tenancy
+from django.conf import settings
+from django.db import migrations, models
+
+
+TENANT_MODELS = [
+    "activity", "archivedstudent", "event", "feepayment", "grade",
+    "invoice", "notification", "staff", "student", "term",
+]
+
+
+def assign_default_school(apps, schema_editor):
+    # Existing rows belong to the default school; new ones get the ``school`` field default.
+    School = apps.get_model("pages", "School")
+    school, _ = School.objects.get_or_create(
+        code=getattr(settings, "DEFAULT_SCHOOL_CODE", "main"),
+        defaults={"name": "Main Campus"},
+    )
+    for model_name in TENANT_MODELS:
+        apps.get_model("pages", model_name).objects.filter(school__isnull=True).update(school=school)
+
+
+def school_field(**kwargs):
+    return models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to="pages.school", **kwargs)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pages", "0009_term_feeschedule_invoice_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="School",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=100)),
+                (
+                    "code",
+                    models.SlugField(
+                        help_text="Short code used in the X-School header",
+                        max_length=20,
+                        unique=True,
+                    ),
+                ),
+                ("is_active", models.BooleanField(default=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True, null=True)),
+            ],
+            options={
+                "ordering": ["name"],
+            },
+        ),
+        migrations.AlterField(
+            model_name="grade",
+            name="name",
+            field=models.CharField(max_length=20),
+        ),
+        migrations.AlterField(
+            model_name="term",
+            name="name",
+            field=models.CharField(help_text="e.g., 2026 Term 1", max_length=50),
+        ),
+        # Nullable first, filled with historical models, then required: the
+        # live default (pages.tenancy.school_for_new_record) is never called here.
+        *[
+            migrations.AddField(model_name=model_name, name="school", field=school_field(null=True))
+            for model_name in TENANT_MODELS
+        ],
+        migrations.RunPython(assign_default_school, migrations.RunPython.noop),
+        *[
+            migrations.SeparateDatabaseAndState(
+                database_operations=[
+                    migrations.AlterField(model_name=model_name, name="school", field=school_field()),
+                ],
+                state_operations=[
+                    migrations.AlterField(
+                        model_name=model_name,
+                        name="school",
+                        field=school_field(default=pages.tenancy.school_for_new_record),
+                    ),
+                ],
+            )
+            for model_name in TENANT_MODELS
+        ],
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                fields=["school", "start_date"], name="pages_event_school__64a9f1_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="feepayment",
+            index=models.Index(
+                fields=["school", "payment_date"], name="pages_feepa_school__b13cce_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                fields=["school", "is_active", "date_created"],
+                name="pages_notif_school__874005_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="staff",
+            index=models.Index(
+                fields=["school", "role", "status"],
+                name="pages_staff_school__c1441a_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="student",
+            index=models.Index(
+                fields=["school", "status", "name"],
+                name="pages_stude_school__dba300_idx",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="grade",
+            constraint=models.UniqueConstraint(
+                fields=("school", "name"), name="unique_grade_name_per_school"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="term",
+            constraint=models.UniqueConstraint(
+                fields=("school", "name"), name="unique_term_name_per_school"
+            ),
+        ),
+    ]
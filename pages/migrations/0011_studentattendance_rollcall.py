@@ -0,0 +1,103 @@
+# Generated by Django 5.2.4 on 2026-10-19 08:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pages", "0010_school_tenancy"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RollCall",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("present", models.PositiveIntegerField(default=0)),
+                ("absent", models.PositiveIntegerField(default=0)),
+                ("taken_at", models.DateTimeField(auto_now=True)),
+                (
+                    "grade",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="roll_calls",
+                        to="pages.grade",
+                    ),
+                ),
+                (
+                    "taken_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to="pages.staff",
+                    ),
+                ),
+                (
+                    "term",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="roll_calls",
+                        to="pages.term",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-date", "grade"],
+                "indexes": [
+                    models.Index(fields=["date"], name="pages_rollc_date_1f1678_idx")
+                ],
+                "unique_together": {("grade", "date")},
+            },
+        ),
+        migrations.CreateModel(
+            name="StudentAttendance",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("present", models.BinaryField(default=b"")),
+                ("recorded", models.BinaryField(default=b"")),
+                ("days_present", models.PositiveSmallIntegerField(default=0)),
+                ("days_recorded", models.PositiveSmallIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "student",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="attendance",
+                        to="pages.student",
+                    ),
+                ),
+                (
+                    "term",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="attendance",
+                        to="pages.term",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "Student attendance",
+                "unique_together": {("student", "term")},
+            },
+        ),
+    ]
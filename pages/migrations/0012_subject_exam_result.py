@@ -0,0 +1,156 @@
+# Generated by Django 5.2.4 on 2026-10-19 08:17
+
+import django.core.validators
+import django.db.models.deletion
+import django.utils.timezone
+import pages.tenancy
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pages", "0011_studentattendance_rollcall"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Subject",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=100)),
+                ("code", models.CharField(help_text="e.g., MATH", max_length=20)),
+                (
+                    "school",
+                    models.ForeignKey(
+                        default=pages.tenancy.school_for_new_record,
+                        on_delete=django.db.models.deletion.PROTECT,
+                        to="pages.school",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["name"],
+            },
+        ),
+        migrations.CreateModel(
+            name="Exam",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(help_text="e.g., Midterm", max_length=100)),
+                ("date", models.DateField(default=django.utils.timezone.now)),
+                ("max_marks", models.PositiveSmallIntegerField(default=100)),
+                (
+                    "event",
+                    models.ForeignKey(
+                        blank=True,
+                        limit_choices_to={"event_type": "exam"},
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="exams",
+                        to="pages.event",
+                    ),
+                ),
+                (
+                    "grade",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="exams",
+                        to="pages.grade",
+                    ),
+                ),
+                (
+                    "term",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="exams",
+                        to="pages.term",
+                    ),
+                ),
+                (
+                    "subject",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="exams",
+                        to="pages.subject",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-date", "subject"],
+            },
+        ),
+        migrations.CreateModel(
+            name="Result",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "marks",
+                    models.DecimalField(
+                        decimal_places=2,
+                        max_digits=5,
+                        validators=[
+                            django.core.validators.MinValueValidator(Decimal("0.00"))
+                        ],
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "exam",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="results",
+                        to="pages.exam",
+                    ),
+                ),
+                (
+                    "student",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="results",
+                        to="pages.student",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("exam", "student")},
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="subject",
+            constraint=models.UniqueConstraint(
+                fields=("school", "code"), name="unique_subject_code_per_school"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="exam",
+            index=models.Index(
+                fields=["grade", "term"], name="pages_exam_grade_i_5be326_idx"
+            ),
+        ),
+    ]
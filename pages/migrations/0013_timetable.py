@@ -0,0 +1,252 @@
+# Generated by Django 5.2.4 on 2026-10-19 08:19
+
+import re
+
+import django.db.models.deletion
+import pages.tenancy
+from django.db import migrations, models
+
+
+# A frozen copy of pages.timetable.link_subjects_from_text as of this
+# migration, so later changes to that module don't change what it does.
+def parse_subjects(text):
+    names, seen = [], set()
+    for part in re.split(r"[,;/&]|\band\b", text or ""):
+        name = " ".join(part.split())
+        if name and name.lower() not in seen:
+            seen.add(name.lower())
+            names.append(name[0].upper() + name[1:])
+    return names
+
+
+def subject_code(name, taken):
+    base = re.sub(r"[^A-Z0-9]", "", name.upper())[:8] or "SUBJECT"
+    code, n = base, 2
+    while code in taken:
+        code, n = f"{base[:6]}{n}", n + 1
+    taken.add(code)
+    return code
+
+
+def link_subjects(apps, schema_editor):
+    Staff = apps.get_model("pages", "Staff")
+    Subject = apps.get_model("pages", "Subject")
+    db = schema_editor.connection.alias
+    staff = list(
+        Staff._base_manager.using(db).exclude(subjects="").values_list("id", "school_id", "subjects")
+    )
+    subject_ids, codes = {}, {}
+    for subject_id, school_id, name, code in Subject._base_manager.using(db).values_list(
+        "id", "school_id", "name", "code"
+    ):
+        subject_ids[school_id, name.lower()] = subject_id
+        codes.setdefault(school_id, set()).add(code)
+
+    missing = {}
+    for _, school_id, text in staff:
+        for name in parse_subjects(text):
+            if (school_id, name.lower()) not in subject_ids:
+                missing.setdefault((school_id, name.lower()), name)
+    Subject._base_manager.using(db).bulk_create([
+        Subject(school_id=school_id, name=name, code=subject_code(name, codes.setdefault(school_id, set())))
+        for (school_id, _), name in missing.items()
+    ])
+    if missing:
+        for subject_id, school_id, name in Subject._base_manager.using(db).values_list("id", "school_id", "name"):
+            subject_ids[school_id, name.lower()] = subject_id
+
+    through = Staff.teaching_subjects.through
+    links = [
+        through(staff_id=staff_id, subject_id=subject_ids[school_id, name.lower()])
+        for staff_id, school_id, text in staff
+        for name in parse_subjects(text)
+    ]
+    through._base_manager.using(db).bulk_create(links, batch_size=1000, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pages", "0012_subject_exam_result"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="staff",
+            name="teaching_subjects",
+            field=models.ManyToManyField(
+                blank=True, related_name="teachers", to="pages.subject"
+            ),
+        ),
+        migrations.CreateModel(
+            name="Room",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=50)),
+                ("capacity", models.PositiveIntegerField(default=40)),
+                (
+                    "school",
+                    models.ForeignKey(
+                        default=pages.tenancy.school_for_new_record,
+                        on_delete=django.db.models.deletion.PROTECT,
+                        to="pages.school",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["name"],
+            },
+        ),
+        migrations.CreateModel(
+            name="TeachingAssignment",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("periods_per_week", models.PositiveSmallIntegerField(default=5)),
+                (
+                    "grade",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="teaching_assignments",
+                        to="pages.grade",
+                    ),
+                ),
+                (
+                    "subject",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="assignments",
+                        to="pages.subject",
+                    ),
+                ),
+                (
+                    "teacher",
+                    models.ForeignKey(
+                        limit_choices_to={"role": "Teacher"},
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="assignments",
+                        to="pages.staff",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["grade", "subject"],
+            },
+        ),
+        migrations.CreateModel(
+            name="TimetableSlot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "day",
+                    models.PositiveSmallIntegerField(
+                        choices=[
+                            (0, "Monday"),
+                            (1, "Tuesday"),
+                            (2, "Wednesday"),
+                            (3, "Thursday"),
+                            (4, "Friday"),
+                        ]
+                    ),
+                ),
+                ("period", models.PositiveSmallIntegerField()),
+                (
+                    "assignment",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="slots",
+                        to="pages.teachingassignment",
+                    ),
+                ),
+                (
+                    "grade",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="timetable_slots",
+                        to="pages.grade",
+                    ),
+                ),
+                (
+                    "room",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="timetable_slots",
+                        to="pages.room",
+                    ),
+                ),
+                (
+                    "subject",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="timetable_slots",
+                        to="pages.subject",
+                    ),
+                ),
+                (
+                    "teacher",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="timetable_slots",
+                        to="pages.staff",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["day", "period"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="room",
+            constraint=models.UniqueConstraint(
+                fields=("school", "name"), name="unique_room_name_per_school"
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name="teachingassignment",
+            unique_together={("grade", "subject")},
+        ),
+        migrations.AddConstraint(
+            model_name="timetableslot",
+            constraint=models.UniqueConstraint(
+                fields=("grade", "day", "period"), name="unique_grade_slot"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="timetableslot",
+            constraint=models.UniqueConstraint(
+                fields=("teacher", "day", "period"), name="unique_teacher_slot"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="timetableslot",
+            constraint=models.UniqueConstraint(
+                fields=("room", "day", "period"), name="unique_room_slot"
+            ),
+        ),
+        migrations.RunPython(link_subjects, migrations.RunPython.noop),
+    ]
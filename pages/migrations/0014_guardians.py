@@ -0,0 +1,192 @@
+# Generated by Django 5.2.4 on 2026-10-19 08:24
+
+import re
+
+import django.db.models.deletion
+import pages.tenancy
+from django.db import migrations, models
+from django.db.models import Q
+from django.utils import timezone
+
+
+# A frozen copy of pages.guardians.link_guardians as of this migration, so
+# later changes to that module don't change what it does.
+BATCH_SIZE = 1000
+PHONE_DIGITS = 10
+
+
+def normalize_phone(value):
+    number = re.split(r"[xX#]|ext", value or "")[0]
+    return re.sub(r"\D", "", number)[-PHONE_DIGITS:]
+
+
+def normalize_email(value):
+    return (value or "").strip().lower()
+
+
+def set_guardians(connection, Student, pairs):
+    """UPDATE ... SET guardian_id = CASE id WHEN ... END for (student_id, guardian_id) pairs."""
+    if not pairs:
+        return
+    qn = connection.ops.quote_name
+    meta = Student._meta
+    pk, column = qn(meta.pk.column), qn(meta.get_field("guardian").column)
+    updated_at = qn(meta.get_field("updated_at").column)
+    sql = (
+        f"UPDATE {qn(meta.db_table)} SET {updated_at} = %s, "
+        f"{column} = CASE {pk} {' '.join(['WHEN %s THEN %s'] * len(pairs))} END "
+        f"WHERE {pk} IN ({', '.join(['%s'] * len(pairs))})"
+    )
+    params = (
+        [connection.ops.adapt_datetimefield_value(timezone.now())]
+        + [value for pair in pairs for value in pair]
+        + [student_id for student_id, _ in pairs]
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
+
+def link_guardians(apps, schema_editor):
+    Student = apps.get_model("pages", "Student")
+    Guardian = apps.get_model("pages", "Guardian")
+    connection = schema_editor.connection
+    db = connection.alias
+    unlinked = Student._base_manager.using(db).filter(
+        Q(guardian__isnull=True),
+        ~Q(parent_phone="") | (Q(parent_email__isnull=False) & ~Q(parent_email="")),
+    )
+    # (school_id, "phone" or "email", key) -> guardian id, or an unsaved Guardian
+    known, last_id = {}, 0
+    while True:
+        rows = list(
+            unlinked.filter(id__gt=last_id).order_by("id")
+            .values_list("id", "school_id", "parent_name", "parent_phone", "parent_email")[:BATCH_SIZE]
+        )
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        rows = [
+            (student_id, school_id, name, phone, email, normalize_phone(phone), normalize_email(email))
+            for student_id, school_id, name, phone, email in rows
+        ]
+
+        phone_keys = {row[5] for row in rows if row[5]}
+        email_keys = {row[6] for row in rows if row[6]}
+        for guardian_id, school_id, phone_key, email_key in Guardian._base_manager.using(db).filter(
+            Q(phone_key__in=phone_keys) | Q(email_key__in=email_keys)
+        ).order_by("id").values_list("id", "school_id", "phone_key", "email_key"):
+            if phone_key:
+                known.setdefault((school_id, "phone", phone_key), guardian_id)
+            if email_key:
+                known.setdefault((school_id, "email", email_key), guardian_id)
+
+        pending, links = [], []
+        for student_id, school_id, name, phone, email, phone_key, email_key in rows:
+            if not (phone_key or email_key):
+                continue
+            guardian = (
+                (phone_key and known.get((school_id, "phone", phone_key)))
+                or (email_key and known.get((school_id, "email", email_key)))
+                or None
+            )
+            if guardian is None:
+                guardian = Guardian(school_id=school_id, name=name)
+                pending.append(guardian)
+            if not isinstance(guardian, int) and guardian.pk is None:
+                if phone_key and not guardian.phone_key:
+                    guardian.phone, guardian.phone_key = phone, phone_key
+                if email_key and not guardian.email_key:
+                    guardian.email, guardian.email_key = email.strip(), email_key
+            if phone_key:
+                known.setdefault((school_id, "phone", phone_key), guardian)
+            if email_key:
+                known.setdefault((school_id, "email", email_key), guardian)
+            links.append((student_id, guardian))
+
+        if pending:
+            Guardian._base_manager.using(db).bulk_create(pending, batch_size=BATCH_SIZE)
+            # MySQL does not return primary keys from bulk_create, so look them up.
+            ids = {}
+            for guardian_id, school_id, phone_key, email_key in Guardian._base_manager.using(db).filter(
+                Q(phone_key__in={g.phone_key for g in pending if g.phone_key})
+                | Q(email_key__in={g.email_key for g in pending if g.email_key})
+            ).order_by("id").values_list("id", "school_id", "phone_key", "email_key"):
+                ids[school_id, phone_key, email_key] = guardian_id
+            for guardian in pending:
+                guardian.pk = ids[guardian.school_id, guardian.phone_key, guardian.email_key]
+
+        set_guardians(connection, Student, [
+            (student_id, guardian if isinstance(guardian, int) else guardian.pk) for student_id, guardian in links
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pages", "0013_timetable"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Guardian",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(blank=True, max_length=100)),
+                ("phone", models.CharField(blank=True, max_length=15)),
+                ("email", models.EmailField(blank=True, max_length=254)),
+                (
+                    "phone_key",
+                    models.CharField(blank=True, editable=False, max_length=15),
+                ),
+                (
+                    "email_key",
+                    models.CharField(blank=True, editable=False, max_length=254),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "school",
+                    models.ForeignKey(
+                        default=pages.tenancy.school_for_new_record,
+                        on_delete=django.db.models.deletion.PROTECT,
+                        to="pages.school",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["name"],
+            },
+        ),
+        migrations.AddField(
+            model_name="student",
+            name="guardian",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="children",
+                to="pages.guardian",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="guardian",
+            index=models.Index(
+                fields=["school", "phone_key"], name="pages_guard_school__838aa3_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="guardian",
+            index=models.Index(
+                fields=["school", "email_key"], name="pages_guard_school__14aea0_idx"
+            ),
+        ),
+        migrations.RunPython(link_guardians, migrations.RunPython.noop),
+    ]
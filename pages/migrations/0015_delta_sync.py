@@ -0,0 +1,145 @@
+# Generated by Django 5.2.4 on 2026-10-19 08:35
+
+import django.db.models.deletion
+import pages.tenancy
+from django.db import migrations, models
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+
+def backfill_updated_at(apps, schema_editor):
+    # AddField stamps existing rows with the migration time; use their creation time instead.
+    for model_name, created in [
+        ("Notification", "date_created"),
+        ("Event", "created_at"),
+        ("Activity", "created_at"),
+        ("FeePayment", "recorded_at"),
+    ]:
+        model = apps.get_model("pages", model_name)
+        model._base_manager.filter(**{f"{created}__isnull": False}).update(
+            updated_at=F(created)
+        )
+    now = timezone.now()
+    for model_name in ["Student", "Staff", "Grade"]:
+        model = apps.get_model("pages", model_name)
+        model._base_manager.filter(updated_at__isnull=True).update(
+            updated_at=Coalesce(F("created_at"), Value(now))
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pages", "0014_guardians"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Tombstone",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("model_name", models.CharField(max_length=30)),
+                ("object_id", models.BigIntegerField()),
+                ("deleted_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+                (
+                    # In CreateModel, not a later AddField: on SQLite that remakes the
+                    # table and would call the live default during the migration.
+                    "school",
+                    models.ForeignKey(
+                        default=pages.tenancy.school_for_new_record,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="pages.school",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["id"],
+            },
+        ),
+        migrations.AddField(
+            model_name="activity",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="event",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="feepayment",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="notification",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="activity",
+            index=models.Index(
+                fields=["school", "updated_at", "id"],
+                name="pages_activ_school__36f50a_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                fields=["school", "updated_at", "id"],
+                name="pages_event_school__4d791e_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="feepayment",
+            index=models.Index(
+                fields=["school", "updated_at", "id"],
+                name="pages_feepa_school__487804_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="grade",
+            index=models.Index(
+                fields=["school", "updated_at", "id"],
+                name="pages_grade_school__b72d96_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                fields=["school", "updated_at", "id"],
+                name="pages_notif_school__0cc6e5_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="staff",
+            index=models.Index(
+                fields=["school", "updated_at", "id"],
+                name="pages_staff_school__7cca4d_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="student",
+            index=models.Index(
+                fields=["school", "updated_at", "id"],
+                name="pages_stude_school__d887b4_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="tombstone",
+            index=models.Index(
+                fields=["model_name", "school", "id"],
+                name="pages_tombs_model_n_d35b62_idx",
+            ),
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.4 on 2026-10-19 09:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pages", "0018_documents"),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name="document",
+            name="document_has_one_owner",
+        ),
+        migrations.AddField(
+            model_name="document",
+            name="archived_student",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="documents",
+                to="pages.archivedstudent",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="document",
+            constraint=models.CheckConstraint(
+                condition=models.Q(
+                    models.Q(
+                        ("archived_student__isnull", True),
+                        ("staff__isnull", True),
+                        ("student__isnull", False),
+                    ),
+                    models.Q(
+                        ("archived_student__isnull", True),
+                        ("staff__isnull", False),
+                        ("student__isnull", True),
+                    ),
+                    models.Q(
+                        ("archived_student__isnull", False),
+                        ("staff__isnull", True),
+                        ("student__isnull", True),
+                    ),
+                    _connector="OR",
+                ),
+                name="document_has_one_owner",
+            ),
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.4 on 2026-10-19 09:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pages", "0019_document_archived_student"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedInvoice",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("number", models.CharField(db_index=True, max_length=30)),
+                ("term_id", models.BigIntegerField()),
+                ("term_name", models.CharField(max_length=50)),
+                ("total", models.DecimalField(decimal_places=2, max_digits=10)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("open", "Open"), ("paid", "Paid"), ("void", "Void")],
+                        max_length=10,
+                    ),
+                ),
+                ("issued_on", models.DateField()),
+                ("due_date", models.DateField(blank=True, null=True)),
+                ("applied", models.BooleanField(default=False)),
+                (
+                    "student",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="invoices",
+                        to="pages.archivedstudent",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-issued_on", "number"],
+            },
+        ),
+        migrations.CreateModel(
+            name="ArchivedInvoiceLine",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("description", models.CharField(max_length=100)),
+                ("amount", models.DecimalField(decimal_places=2, max_digits=10)),
+                (
+                    "invoice",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="lines",
+                        to="pages.archivedinvoice",
+                    ),
+                ),
+            ],
+        ),
+    ]
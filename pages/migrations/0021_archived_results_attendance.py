@@ -0,0 +1,62 @@
+# Generated by Django 5.2.4 on 2026-10-19 09:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pages", "0020_archived_invoices"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedAttendance",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("term_id", models.BigIntegerField()),
+                ("term_name", models.CharField(max_length=50)),
+                ("present", models.BinaryField(default=b"")),
+                ("recorded", models.BinaryField(default=b"")),
+                ("days_present", models.PositiveSmallIntegerField(default=0)),
+                ("days_recorded", models.PositiveSmallIntegerField(default=0)),
+                (
+                    "student",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="attendance",
+                        to="pages.archivedstudent",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "Archived attendance",
+            },
+        ),
+        migrations.CreateModel(
+            name="ArchivedResult",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("exam_id", models.BigIntegerField()),
+                ("exam_name", models.CharField(max_length=100)),
+                ("subject_name", models.CharField(max_length=100)),
+                ("term_id", models.BigIntegerField()),
+                ("term_name", models.CharField(max_length=50)),
+                ("exam_date", models.DateField()),
+                ("max_marks", models.PositiveSmallIntegerField()),
+                ("marks", models.DecimalField(decimal_places=2, max_digits=5)),
+                (
+                    "student",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="results",
+                        to="pages.archivedstudent",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-exam_date", "subject_name"],
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.4 on 2026-10-19 09:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pages", "0021_archived_results_attendance"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="outboxcheckpoint",
+            name="gaps",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                help_text="Ids below position not seen yet, with the time they were passed",
+            ),
+        ),
+    ]
@@ -1,9 +1,12 @@
 # models.py
+from django.conf import settings
 from django.db import models
 from django.utils import timezone
 from django.core.validators import MinValueValidator
 from decimal import Decimal
 
+from . import tenancy
+
 # Common choices
 GENDER_CHOICES = [
     ('M', 'Male'),
@@ -17,16 +20,43 @@ STATUS_CHOICES = [
     ('transferred', 'Transferred'),
 ]
 
+# New Model: School (tenant)
+class School(models.Model):
+    name = models.CharField(max_length=100)
+    code = models.SlugField(max_length=20, unique=True, help_text="Short code used in the X-School header")
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True, null=True, blank=True)
+
+    class Meta:
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
 # Grade Model (Enhanced)
 class Grade(models.Model):
-    name = models.CharField(max_length=20, unique=True)
+    school = models.ForeignKey(School, on_delete=models.PROTECT, default=tenancy.school_for_new_record)
+    name = models.CharField(max_length=20)
     description = models.TextField(blank=True, null=True, help_text="Grade description or notes")
     capacity = models.PositiveIntegerField(default=30, help_text="Maximum students per grade")
+    level = models.PositiveSmallIntegerField(null=True, blank=True,
+                                             help_text="Position in the promotion sequence (Kindergarten = 0)")
+    enrolled_count = models.PositiveIntegerField(default=0, editable=False,
+                                                 help_text="Students assigned to this grade, kept by pages.capacity")
     created_at = models.DateTimeField(auto_now_add=True, null=True, blank=True)
     updated_at = models.DateTimeField(auto_now=True, null=True, blank=True)
 
+    objects = tenancy.TenantManager()
+    all_objects = models.Manager()
+
     class Meta:
         ordering = ['name']
+        constraints = [
+            models.UniqueConstraint(fields=['school', 'name'], name='unique_grade_name_per_school'),
+        ]
+        indexes = [
+            models.Index(fields=['school', 'updated_at', 'id']),  # delta sync (pages/sync.py)
+        ]
 
     def __str__(self):
         return self.name
@@ -35,10 +65,11 @@ class Grade(models.Model):
         return self.student_set.count()
 
     def available_spots(self):
-        return self.capacity - self.student_count()
+        return self.capacity - self.enrolled_count
 
 # Student Model (Enhanced)
 class Student(models.Model):
+    school = models.ForeignKey(School, on_delete=models.PROTECT, default=tenancy.school_for_new_record)
     # Basic Information
     name = models.CharField(max_length=100)
     student_id = models.CharField(max_length=20, unique=True, blank=True, help_text="Auto-generated if empty")
@@ -55,6 +86,7 @@ class Student(models.Model):
     parent_name = models.CharField(max_length=100, blank=True)
     parent_phone = models.CharField(max_length=15, blank=True)
     parent_email = models.EmailField(blank=True, null=True)
+    guardian = models.ForeignKey('Guardian', on_delete=models.SET_NULL, null=True, blank=True, related_name='children')
     
     # Financial Information
     fees_due = models.DecimalField(
@@ -76,11 +108,16 @@ class Student(models.Model):
     created_at = models.DateTimeField(auto_now_add=True, null=True, blank=True)
     updated_at = models.DateTimeField(auto_now=True, null=True, blank=True)
 
+    objects = tenancy.TenantManager()
+    all_objects = models.Manager()
+
     class Meta:
         ordering = ['name']
         indexes = [
             models.Index(fields=['grade', 'status']),
             models.Index(fields=['student_id']),
+            models.Index(fields=['school', 'status', 'name']),
+            models.Index(fields=['school', 'updated_at', 'id']),  # delta sync (pages/sync.py)
         ]
 
     def __str__(self):
@@ -89,14 +126,18 @@ class Student(models.Model):
     def save(self, *args, **kwargs):
         # Auto-generate student ID if not provided
         if not self.student_id:
-            last_student = Student.objects.order_by('-id').first()
-            if last_student:
-                last_id = int(last_student.student_id.split('-')[-1]) if '-' in last_student.student_id else 0
-                self.student_id = f"STU-{last_id + 1:04d}"
-            else:
-                self.student_id = "STU-0001"
+            self.student_id = Student.generate_student_ids(1)[0]
         super().save(*args, **kwargs)
 
+    @classmethod
+    def generate_student_ids(cls, count):
+        """Next ``count`` sequential student IDs, for save() and bulk admissions."""
+        last_student = cls.all_objects.order_by('-id').first()
+        last_id = 0
+        if last_student and '-' in last_student.student_id:
+            last_id = int(last_student.student_id.split('-')[-1])
+        return [f"STU-{last_id + i:04d}" for i in range(1, count + 1)]
+
     def balance(self):
         return self.fees_due - self.fees_paid
 
@@ -128,6 +169,7 @@ class Staff(models.Model):
     ]
     
     # Basic Information
+    school = models.ForeignKey(School, on_delete=models.PROTECT, default=tenancy.school_for_new_record)
     name = models.CharField(max_length=100)
     staff_id = models.CharField(max_length=20, unique=True, blank=True, help_text="Auto-generated if empty")
     role = models.CharField(max_length=50, choices=ROLE_CHOICES, default='Teacher')
@@ -146,17 +188,23 @@ class Staff(models.Model):
     # Additional Information
     qualifications = models.TextField(blank=True, help_text="Educational qualifications and certifications")
     subjects = models.CharField(max_length=200, blank=True, help_text="Subjects taught (comma-separated)")
+    teaching_subjects = models.ManyToManyField('Subject', blank=True, related_name='teachers')
     
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True, null=True, blank=True)
     updated_at = models.DateTimeField(auto_now=True, null=True, blank=True)
 
+    objects = tenancy.TenantManager()
+    all_objects = models.Manager()
+
     class Meta:
         ordering = ['name']
         verbose_name_plural = 'Staff'
         indexes = [
             models.Index(fields=['role', 'status']),
             models.Index(fields=['staff_id']),
+            models.Index(fields=['school', 'role', 'status']),
+            models.Index(fields=['school', 'updated_at', 'id']),  # delta sync (pages/sync.py)
         ]
 
     def __str__(self):
@@ -165,7 +213,7 @@ class Staff(models.Model):
     def save(self, *args, **kwargs):
         # Auto-generate staff ID if not provided
         if not self.staff_id:
-            last_staff = Staff.objects.order_by('-id').first()
+            last_staff = Staff.all_objects.order_by('-id').first()
             if last_staff:
                 last_id = int(last_staff.staff_id.split('-')[-1]) if '-' in last_staff.staff_id else 0
                 self.staff_id = f"STF-{last_id + 1:04d}"
@@ -190,6 +238,7 @@ class Notification(models.Model):
         ('grade_specific', 'Grade Specific'),
     ]
     
+    school = models.ForeignKey(School, on_delete=models.PROTECT, default=tenancy.school_for_new_record)
     title = models.CharField(max_length=200, default="General Notification")
     message = models.TextField()
     priority = models.CharField(max_length=10, choices=PRIORITY_CHOICES, default='medium')
@@ -200,11 +249,19 @@ class Notification(models.Model):
     # Status and Dates
     is_active = models.BooleanField(default=True)
     date_created = models.DateTimeField(auto_now_add=True, null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True, null=True, blank=True)
     date = models.DateField(default=timezone.now)  # Keep for backward compatibility
     created_by = models.ForeignKey(Staff, on_delete=models.SET_NULL, null=True, blank=True)
 
+    objects = tenancy.TenantManager()
+    all_objects = models.Manager()
+
     class Meta:
         ordering = ['-date_created']
+        indexes = [
+            models.Index(fields=['school', 'is_active', 'date_created']),
+            models.Index(fields=['school', 'updated_at', 'id']),  # delta sync (pages/sync.py)
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.message[:50]}..."
@@ -221,6 +278,7 @@ class Event(models.Model):
         ('other', 'Other'),
     ]
     
+    school = models.ForeignKey(School, on_delete=models.PROTECT, default=tenancy.school_for_new_record)
     title = models.CharField(max_length=100)
     description = models.TextField(blank=True)
     event_type = models.CharField(max_length=20, choices=EVENT_TYPE_CHOICES, default='other')
@@ -232,10 +290,18 @@ class Event(models.Model):
     # Status
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True, null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True, null=True, blank=True)
     created_by = models.ForeignKey(Staff, on_delete=models.SET_NULL, null=True, blank=True)
 
+    objects = tenancy.TenantManager()
+    all_objects = models.Manager()
+
     class Meta:
         ordering = ['start_date']
+        indexes = [
+            models.Index(fields=['school', 'start_date']),
+            models.Index(fields=['school', 'updated_at', 'id']),  # delta sync (pages/sync.py)
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.start_date.strftime('%Y-%m-%d')}"
@@ -253,6 +319,7 @@ class Activity(models.Model):
         ('other', 'Other'),
     ]
     
+    school = models.ForeignKey(School, on_delete=models.PROTECT, default=tenancy.school_for_new_record)
     title = models.CharField(max_length=100)
     description = models.TextField(blank=True)
     activity_type = models.CharField(max_length=20, choices=ACTIVITY_TYPE_CHOICES, default='other')
@@ -263,10 +330,17 @@ class Activity(models.Model):
     # Status
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True, null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True, null=True, blank=True)
+
+    objects = tenancy.TenantManager()
+    all_objects = models.Manager()
 
     class Meta:
         ordering = ['title']
         verbose_name_plural = 'Activities'
+        indexes = [
+            models.Index(fields=['school', 'updated_at', 'id']),  # delta sync (pages/sync.py)
+        ]
 
     def __str__(self):
         return self.title
@@ -300,6 +374,7 @@ class FeePayment(models.Model):
         ('card', 'Card Payment'),
     ]
     
+    school = models.ForeignKey(School, on_delete=models.PROTECT, default=tenancy.school_for_new_record)
     student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='payments')
     amount = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(Decimal('0.01'))])
     payment_method = models.CharField(max_length=20, choices=PAYMENT_METHOD_CHOICES, default='cash')
@@ -309,10 +384,573 @@ class FeePayment(models.Model):
     # Dates
     payment_date = models.DateField(default=timezone.now, null=True, blank= True)
     recorded_at = models.DateTimeField(auto_now_add=True, null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True, null=True, blank=True)
     recorded_by = models.ForeignKey(Staff, on_delete=models.SET_NULL, null=True, blank=True)
 
+    objects = tenancy.TenantManager()
+    all_objects = models.Manager()
+
     class Meta:
         ordering = ['-payment_date']
+        indexes = [
+            models.Index(fields=['student', 'payment_date']),
+            models.Index(fields=['school', 'payment_date']),
+            models.Index(fields=['school', 'updated_at', 'id']),  # delta sync (pages/sync.py)
+        ]
+
+    def __str__(self):
+        return f"{self.student.name} - ${self.amount} ({self.payment_date})"
+
+# New Model: Audit Log
+class AuditLog(models.Model):
+    ACTION_CHOICES = [
+        ('create', 'Create'),
+        ('update', 'Update'),
+        ('delete', 'Delete'),
+        ('bulk', 'Bulk Update'),
+    ]
+
+    model_name = models.CharField(max_length=50)
+    object_id = models.CharField(max_length=50)
+    object_repr = models.CharField(max_length=200, blank=True)
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
+    changes = models.JSONField(default=dict, blank=True, help_text="Field name -> [old, new]")
+
+    actor = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    actor_repr = models.CharField(max_length=150, blank=True)
+    timestamp = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['model_name', 'object_id', '-timestamp']),
+            models.Index(fields=['actor', '-timestamp']),
+        ]
 
     def __str__(self):
-        return f"{self.student.name} - ${self.amount} ({self.payment_date})"
\ No newline at end of file
+        return f"{self.action} {self.model_name}#{self.object_id} by {self.actor_repr or 'system'}"
+
+# Archive Models: graduated/transferred students moved out of the hot tables
+class ArchivedStudent(models.Model):
+    # Primary keys are carried over from Student so history lookups by id keep working.
+    id = models.BigIntegerField(primary_key=True)
+    school = models.ForeignKey(School, on_delete=models.PROTECT, default=tenancy.school_for_new_record)
+    name = models.CharField(max_length=100)
+    student_id = models.CharField(max_length=20, db_index=True)
+    grade_id = models.BigIntegerField(null=True, blank=True)
+    grade_name = models.CharField(max_length=20, blank=True)
+    date_of_birth = models.DateField(null=True, blank=True)
+    gender = models.CharField(max_length=1, choices=GENDER_CHOICES, blank=True)
+
+    email = models.EmailField(blank=True, null=True)
+    phone = models.CharField(max_length=15, blank=True)
+    address = models.TextField(blank=True)
+
+    parent_name = models.CharField(max_length=100, blank=True)
+    parent_phone = models.CharField(max_length=15, blank=True)
+    parent_email = models.EmailField(blank=True, null=True)
+
+    fees_due = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal('0.00'))
+    fees_paid = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal('0.00'))
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES)
+    enrolled_on = models.DateField(null=True, blank=True)
+    created_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    objects = tenancy.TenantManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        ordering = ['name']
+
+    def __str__(self):
+        return f"{self.name} ({self.student_id}, archived)"
+
+    def balance(self):
+        return self.fees_due - self.fees_paid
+
+class ArchivedFeePayment(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    student = models.ForeignKey(ArchivedStudent, on_delete=models.CASCADE, related_name='payments')
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    payment_method = models.CharField(max_length=20, choices=FeePayment.PAYMENT_METHOD_CHOICES)
+    reference_number = models.CharField(max_length=100, blank=True)
+    notes = models.TextField(blank=True)
+    payment_date = models.DateField(null=True, blank=True)
+    recorded_at = models.DateTimeField(null=True, blank=True)
+    recorded_by_id = models.BigIntegerField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-payment_date']
+
+    def __str__(self):
+        return f"{self.student.name} - ${self.amount} ({self.payment_date})"
+
+class ArchivedActivityParticipant(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    student = models.ForeignKey(ArchivedStudent, on_delete=models.CASCADE, related_name='activities')
+    activity_id = models.BigIntegerField()
+    activity_title = models.CharField(max_length=100)
+    date_joined = models.DateField(null=True, blank=True)
+    is_active = models.BooleanField(default=False)
+
+    def __str__(self):
+        return f"{self.student.name} - {self.activity_title}"
+
+# New Model: Academic Term
+class Term(models.Model):
+    school = models.ForeignKey(School, on_delete=models.PROTECT, default=tenancy.school_for_new_record)
+    name = models.CharField(max_length=50, help_text="e.g., 2026 Term 1")
+    start_date = models.DateField()
+    end_date = models.DateField()
+
+    objects = tenancy.TenantManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        ordering = ['-start_date']
+        constraints = [
+            models.UniqueConstraint(fields=['school', 'name'], name='unique_term_name_per_school'),
+        ]
+
+    def __str__(self):
+        return self.name
+
+# New Model: Fee Schedule per grade and term
+class FeeSchedule(models.Model):
+    grade = models.ForeignKey(Grade, on_delete=models.CASCADE, related_name='fee_schedules')
+    term = models.ForeignKey(Term, on_delete=models.CASCADE, related_name='fee_schedules')
+    due_date = models.DateField(null=True, blank=True, help_text="Defaults to the term start date")
+    is_active = models.BooleanField(default=True)
+
+    class Meta:
+        ordering = ['term', 'grade']
+        unique_together = ['grade', 'term']
+
+    def __str__(self):
+        return f"{self.grade.name} - {self.term.name}"
+
+    def total(self):
+        return sum((item.amount for item in self.items.all()), Decimal('0.00'))
+
+class FeeScheduleItem(models.Model):
+    schedule = models.ForeignKey(FeeSchedule, on_delete=models.CASCADE, related_name='items')
+    description = models.CharField(max_length=100, help_text="e.g., Tuition, Lab fee")
+    amount = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(Decimal('0.00'))])
+
+    def __str__(self):
+        return f"{self.description} (${self.amount})"
+
+# New Model: Invoices
+class Invoice(models.Model):
+    STATUS_CHOICES = [
+        ('open', 'Open'),
+        ('paid', 'Paid'),
+        ('void', 'Void'),
+    ]
+
+    school = models.ForeignKey(School, on_delete=models.PROTECT, default=tenancy.school_for_new_record)
+    number = models.CharField(max_length=30, unique=True)
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='invoices')
+    term = models.ForeignKey(Term, on_delete=models.PROTECT, related_name='invoices')
+    schedule = models.ForeignKey(FeeSchedule, on_delete=models.SET_NULL, null=True, blank=True, related_name='invoices')
+    total = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal('0.00'))
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='open')
+    issued_on = models.DateField(default=timezone.now)
+    due_date = models.DateField(null=True, blank=True)
+    # Set once the invoice total has been added to Student.fees_due.
+    applied = models.BooleanField(default=False)
+
+    objects = tenancy.TenantManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        ordering = ['-issued_on', 'number']
+        unique_together = ['student', 'term']
+        indexes = [
+            models.Index(fields=['term', 'applied']),
+        ]
+
+    def __str__(self):
+        return f"{self.number} - {self.student.name} (${self.total})"
+
+class InvoiceLine(models.Model):
+    invoice = models.ForeignKey(Invoice, on_delete=models.CASCADE, related_name='lines')
+    description = models.CharField(max_length=100)
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+
+    def __str__(self):
+        return f"{self.description} (${self.amount})"
+
+# Archive Models: invoices of archived students (financial records are never dropped)
+class ArchivedInvoice(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    student = models.ForeignKey(ArchivedStudent, on_delete=models.CASCADE, related_name='invoices')
+    number = models.CharField(max_length=30, db_index=True)
+    term_id = models.BigIntegerField()
+    term_name = models.CharField(max_length=50)
+    total = models.DecimalField(max_digits=10, decimal_places=2)
+    status = models.CharField(max_length=10, choices=Invoice.STATUS_CHOICES)
+    issued_on = models.DateField()
+    due_date = models.DateField(null=True, blank=True)
+    applied = models.BooleanField(default=False)
+
+    class Meta:
+        ordering = ['-issued_on', 'number']
+
+    def __str__(self):
+        return f"{self.number} - {self.student.name} (${self.total})"
+
+class ArchivedInvoiceLine(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    invoice = models.ForeignKey(ArchivedInvoice, on_delete=models.CASCADE, related_name='lines')
+    description = models.CharField(max_length=100)
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+
+    def __str__(self):
+        return f"{self.description} (${self.amount})"
+
+# New Model: Attendance, one bitmap per student per term
+class StudentAttendance(models.Model):
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='attendance')
+    term = models.ForeignKey(Term, on_delete=models.CASCADE, related_name='attendance')
+    # Bit n (little-endian) stands for day n of the term, counted from term.start_date.
+    present = models.BinaryField(default=b'')
+    recorded = models.BinaryField(default=b'')
+    # Popcounts of the bitmaps, kept in step by pages.attendance for SQL aggregation.
+    days_present = models.PositiveSmallIntegerField(default=0)
+    days_recorded = models.PositiveSmallIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['student', 'term']
+        verbose_name_plural = 'Student attendance'
+
+    def __str__(self):
+        return f"{self.student} - {self.term} ({self.days_present}/{self.days_recorded})"
+
+    def rate(self):
+        return self.days_present / self.days_recorded if self.days_recorded else None
+
+class RollCall(models.Model):
+    grade = models.ForeignKey(Grade, on_delete=models.CASCADE, related_name='roll_calls')
+    term = models.ForeignKey(Term, on_delete=models.CASCADE, related_name='roll_calls')
+    date = models.DateField()
+    present = models.PositiveIntegerField(default=0)
+    absent = models.PositiveIntegerField(default=0)
+    taken_by = models.ForeignKey(Staff, on_delete=models.SET_NULL, null=True, blank=True)
+    taken_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-date', 'grade']
+        unique_together = ['grade', 'date']
+        indexes = [
+            models.Index(fields=['date']),
+        ]
+
+    def __str__(self):
+        return f"{self.grade.name} - {self.date} ({self.present}/{self.present + self.absent})"
+
+# New Models: Subjects, exams and results
+class Subject(models.Model):
+    school = models.ForeignKey(School, on_delete=models.PROTECT, default=tenancy.school_for_new_record)
+    name = models.CharField(max_length=100)
+    code = models.CharField(max_length=20, help_text="e.g., MATH")
+
+    objects = tenancy.TenantManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        ordering = ['name']
+        constraints = [
+            models.UniqueConstraint(fields=['school', 'code'], name='unique_subject_code_per_school'),
+        ]
+
+    def __str__(self):
+        return self.name
+
+class Exam(models.Model):
+    grade = models.ForeignKey(Grade, on_delete=models.CASCADE, related_name='exams')
+    subject = models.ForeignKey(Subject, on_delete=models.PROTECT, related_name='exams')
+    term = models.ForeignKey(Term, on_delete=models.CASCADE, related_name='exams')
+    event = models.ForeignKey(Event, on_delete=models.SET_NULL, null=True, blank=True,
+                              limit_choices_to={'event_type': 'exam'}, related_name='exams')
+    name = models.CharField(max_length=100, help_text="e.g., Midterm")
+    date = models.DateField(default=timezone.now)
+    max_marks = models.PositiveSmallIntegerField(default=100)
+
+    class Meta:
+        ordering = ['-date', 'subject']
+        indexes = [
+            models.Index(fields=['grade', 'term']),
+        ]
+
+    def __str__(self):
+        return f"{self.grade.name} {self.subject.name} - {self.name}"
+
+class Result(models.Model):
+    exam = models.ForeignKey(Exam, on_delete=models.CASCADE, related_name='results')
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='results')
+    marks = models.DecimalField(max_digits=5, decimal_places=2, validators=[MinValueValidator(Decimal('0.00'))])
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['exam', 'student']
+
+    def __str__(self):
+        return f"{self.student.name} - {self.exam}: {self.marks}"
+
+# Archive Models: exam results and attendance of archived students
+class ArchivedResult(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    student = models.ForeignKey(ArchivedStudent, on_delete=models.CASCADE, related_name='results')
+    # Exams and terms can be deleted later; keep what is needed to read the result.
+    exam_id = models.BigIntegerField()
+    exam_name = models.CharField(max_length=100)
+    subject_name = models.CharField(max_length=100)
+    term_id = models.BigIntegerField()
+    term_name = models.CharField(max_length=50)
+    exam_date = models.DateField()
+    max_marks = models.PositiveSmallIntegerField()
+    marks = models.DecimalField(max_digits=5, decimal_places=2)
+
+    class Meta:
+        ordering = ['-exam_date', 'subject_name']
+
+    def __str__(self):
+        return f"{self.student.name} - {self.subject_name} {self.exam_name}: {self.marks}"
+
+class ArchivedAttendance(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    student = models.ForeignKey(ArchivedStudent, on_delete=models.CASCADE, related_name='attendance')
+    term_id = models.BigIntegerField()
+    term_name = models.CharField(max_length=50)
+    present = models.BinaryField(default=b'')
+    recorded = models.BinaryField(default=b'')
+    days_present = models.PositiveSmallIntegerField(default=0)
+    days_recorded = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = 'Archived attendance'
+
+    def __str__(self):
+        return f"{self.student.name} - {self.term_name} ({self.days_present}/{self.days_recorded})"
+
+# New Models: Timetable
+class TeachingAssignment(models.Model):
+    teacher = models.ForeignKey(Staff, on_delete=models.CASCADE, related_name='assignments',
+                                limit_choices_to={'role': 'Teacher'})
+    grade = models.ForeignKey(Grade, on_delete=models.CASCADE, related_name='teaching_assignments')
+    subject = models.ForeignKey(Subject, on_delete=models.CASCADE, related_name='assignments')
+    periods_per_week = models.PositiveSmallIntegerField(default=5)
+
+    class Meta:
+        ordering = ['grade', 'subject']
+        unique_together = ['grade', 'subject']
+
+    def __str__(self):
+        return f"{self.teacher.name}: {self.subject.name} ({self.grade.name})"
+
+class Room(models.Model):
+    school = models.ForeignKey(School, on_delete=models.PROTECT, default=tenancy.school_for_new_record)
+    name = models.CharField(max_length=50)
+    capacity = models.PositiveIntegerField(default=40)
+
+    objects = tenancy.TenantManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        ordering = ['name']
+        constraints = [
+            models.UniqueConstraint(fields=['school', 'name'], name='unique_room_name_per_school'),
+        ]
+
+    def __str__(self):
+        return self.name
+
+class TimetableSlot(models.Model):
+    DAY_CHOICES = [
+        (0, 'Monday'),
+        (1, 'Tuesday'),
+        (2, 'Wednesday'),
+        (3, 'Thursday'),
+        (4, 'Friday'),
+    ]
+
+    # grade, teacher and subject are copied from the assignment so the
+    # database itself rejects double-booked grades, teachers and rooms.
+    assignment = models.ForeignKey(TeachingAssignment, on_delete=models.CASCADE, related_name='slots')
+    grade = models.ForeignKey(Grade, on_delete=models.CASCADE, related_name='timetable_slots')
+    teacher = models.ForeignKey(Staff, on_delete=models.CASCADE, related_name='timetable_slots')
+    subject = models.ForeignKey(Subject, on_delete=models.CASCADE, related_name='timetable_slots')
+    room = models.ForeignKey(Room, on_delete=models.SET_NULL, null=True, blank=True, related_name='timetable_slots')
+    day = models.PositiveSmallIntegerField(choices=DAY_CHOICES)
+    period = models.PositiveSmallIntegerField()
+
+    class Meta:
+        ordering = ['day', 'period']
+        constraints = [
+            models.UniqueConstraint(fields=['grade', 'day', 'period'], name='unique_grade_slot'),
+            models.UniqueConstraint(fields=['teacher', 'day', 'period'], name='unique_teacher_slot'),
+            models.UniqueConstraint(fields=['room', 'day', 'period'], name='unique_room_slot'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_day_display()} P{self.period + 1}: {self.grade.name} {self.subject.name}"
+
+# New Model: Guardian (parents grouped across siblings)
+class Guardian(models.Model):
+    school = models.ForeignKey(School, on_delete=models.PROTECT, default=tenancy.school_for_new_record)
+    name = models.CharField(max_length=100, blank=True)
+    phone = models.CharField(max_length=15, blank=True)
+    email = models.EmailField(blank=True)
+    # Normalized contact keys (see guardians.normalize_phone / normalize_email), filled on save.
+    phone_key = models.CharField(max_length=15, blank=True, editable=False)
+    email_key = models.CharField(max_length=254, blank=True, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = tenancy.TenantManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        ordering = ['name']
+        indexes = [
+            models.Index(fields=['school', 'phone_key']),
+            models.Index(fields=['school', 'email_key']),
+        ]
+
+    def __str__(self):
+        return self.name or self.phone or self.email
+
+# New Model: Tombstone (deleted rows, for delta sync)
+class Tombstone(models.Model):
+    school = models.ForeignKey(School, on_delete=models.CASCADE, default=tenancy.school_for_new_record)
+    model_name = models.CharField(max_length=30)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['model_name', 'school', 'id']),
+        ]
+
+    def __str__(self):
+        return f"{self.model_name} #{self.object_id} deleted {self.deleted_at:%Y-%m-%d %H:%M}"
+
+# New Models: Transactional outbox (change feed for downstream systems)
+class OutboxEvent(models.Model):
+    topic = models.CharField(max_length=50)
+    model_name = models.CharField(max_length=30)
+    object_id = models.BigIntegerField()
+    school_id = models.BigIntegerField(null=True, blank=True)
+    payload = models.JSONField(default=dict)
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        ordering = ['id']
+
+    def __str__(self):
+        return f"#{self.id} {self.topic} {self.model_name} #{self.object_id}"
+
+class OutboxCheckpoint(models.Model):
+    consumer = models.CharField(max_length=50, unique=True)
+    position = models.BigIntegerField(default=0, help_text="Id of the last event delivered")
+    gaps = models.JSONField(
+        default=dict, blank=True, help_text="Ids below position not seen yet, with the time they were passed",
+    )
+    delivered = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['consumer']
+
+    def __str__(self):
+        return f"{self.consumer} @ {self.position}"
+
+# New Model: One email or SMS of a notification to one recipient
+class Delivery(models.Model):
+    CHANNEL_CHOICES = [
+        ('email', 'Email'),
+        ('sms', 'SMS'),
+    ]
+
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    school = models.ForeignKey(School, on_delete=models.PROTECT, default=tenancy.school_for_new_record)
+    notification = models.ForeignKey(Notification, on_delete=models.CASCADE, related_name='deliveries')
+    channel = models.CharField(max_length=10, choices=CHANNEL_CHOICES)
+    address = models.CharField(max_length=254, help_text="Email address or phone number")
+    name = models.CharField(max_length=100, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    objects = tenancy.TenantManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        ordering = ['id']
+        constraints = [
+            models.UniqueConstraint(fields=['notification', 'channel', 'address'], name='unique_delivery_per_address'),
+        ]
+        indexes = [
+            models.Index(fields=['channel', 'status', 'id']),  # the sender's queue
+        ]
+        verbose_name_plural = 'deliveries'
+
+    def __str__(self):
+        return f"{self.get_channel_display()} to {self.address} ({self.status})"
+
+# New Model: Document (files attached to students and staff, stored by content hash)
+class Document(models.Model):
+    KIND_CHOICES = [
+        ('birth_certificate', 'Birth Certificate'),
+        ('photo', 'Photo'),
+        ('transfer_letter', 'Transfer Letter'),
+        ('other', 'Other'),
+    ]
+
+    school = models.ForeignKey(School, on_delete=models.PROTECT, default=tenancy.school_for_new_record)
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, null=True, blank=True, related_name='documents')
+    staff = models.ForeignKey(Staff, on_delete=models.CASCADE, null=True, blank=True, related_name='documents')
+    # Set instead of ``student`` once the student is archived (pages/archive.py).
+    archived_student = models.ForeignKey(ArchivedStudent, on_delete=models.PROTECT, null=True, blank=True,
+                                         related_name='documents')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, default='other')
+    name = models.CharField(max_length=255, help_text="Uploaded file name")
+    content_type = models.CharField(max_length=100)
+    size = models.PositiveBigIntegerField()
+    # Files live once on disk under their SHA-256 (see pages/documents.py).
+    sha256 = models.CharField(max_length=64, db_index=True)
+    uploaded_at = models.DateTimeField(auto_now_add=True)
+
+    objects = tenancy.TenantManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        ordering = ['-uploaded_at']
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(student__isnull=False, staff__isnull=True, archived_student__isnull=True)
+                | models.Q(student__isnull=True, staff__isnull=False, archived_student__isnull=True)
+                | models.Q(student__isnull=True, staff__isnull=True, archived_student__isnull=False),
+                name='document_has_one_owner',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()}: {self.name}"
+
+    @property
+    def is_image(self):
+        return self.content_type.startswith('image/')
@@ -0,0 +1,274 @@
+# outbox.py
+"""
+Transactional outbox: a change feed for accounting, the SMS gateway and BI.
+
+Fee payments, student status changes and new notifications append an
+OutboxEvent from the same model signals/bulk updates that change the data, so
+the event commits or rolls back with the change (views and bulk actions make
+these writes inside transaction.atomic). relay() reads events in id order in
+batches, hands each batch to a sink and then moves the consumer's
+OutboxCheckpoint forward: delivery is at-least-once, sinks should be
+idempotent on the event id.
+
+Ids are allocated at INSERT but become visible at COMMIT, so a transaction
+that commits late can make a lower id appear after the relay has passed it.
+The relay only reads events older than SETTLE, which keeps most of them in
+order; any id it still skips is kept in the checkpoint's ``gaps`` and looked
+up again on every run, and sent as soon as it shows up. A gap still empty
+after GAP_TIMEOUT is taken for a rolled-back insert and forgotten, as are
+the lowest ones past MAX_GAPS. Late events arrive after higher ids, so sinks
+must not rely on strict id order. Gaps are found by counting ids, so MySQL's
+auto_increment_increment must be 1. compact() deletes events every consumer
+has already passed.
+"""
+import json
+import time
+import urllib.request
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Min
+from django.db.models.signals import post_init, post_save
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import FeePayment, Notification, OutboxCheckpoint, OutboxEvent, Student
+
+BATCH_SIZE = 1000
+MAX_GAPS = 10000  # beyond this the lowest (oldest) gaps are forgotten
+FIELDS = ['id', 'topic', 'model_name', 'object_id', 'school_id', 'payload', 'created_at']
+SETTLE = timedelta(seconds=getattr(settings, 'OUTBOX_SETTLE_SECONDS', 2))
+GAP_TIMEOUT = timedelta(seconds=getattr(settings, 'OUTBOX_GAP_SECONDS', 3600))
+KEEP = timedelta(days=getattr(settings, 'OUTBOX_KEEP_DAYS', 7))
+
+PAYMENT_RECORDED = 'payment.recorded'
+STUDENT_STATUS_CHANGED = 'student.status_changed'
+NOTIFICATION_CREATED = 'notification.created'
+
+
+class OutboxError(Exception):
+    pass
+
+
+def _jsonable(payload):
+    return json.loads(json.dumps(payload, cls=DjangoJSONEncoder))
+
+
+def emit(topic, instance, payload):
+    """Append one event for ``instance`` (call inside the transaction that changed it)."""
+    return OutboxEvent.objects.create(
+        topic=topic,
+        model_name=instance._meta.model_name,
+        object_id=instance.pk,
+        school_id=getattr(instance, 'school_id', None),
+        payload=_jsonable(payload),
+    )
+
+
+def emit_bulk(topic, model, rows):
+    """Append one event per ``(object_id, school_id, payload)`` with a single INSERT per batch."""
+    now = timezone.now()
+    OutboxEvent.objects.bulk_create([
+        OutboxEvent(
+            topic=topic, model_name=model._meta.model_name, object_id=object_id,
+            school_id=school_id, payload=_jsonable(payload), created_at=now,
+        )
+        for object_id, school_id, payload in rows
+    ], batch_size=BATCH_SIZE)
+
+
+# ============= Sinks =============
+class FileSink:
+    """Appends events as JSON lines."""
+
+    def __init__(self, path, **kwargs):
+        self.path = path
+
+    def send(self, events):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.writelines(json.dumps(event, cls=DjangoJSONEncoder) + '\n' for event in events)
+
+    def close(self):
+        pass
+
+
+class HttpSink:
+    """POSTs each batch as one JSON document ({"events": [...]}) to ``url``."""
+
+    def __init__(self, url, timeout=10, **kwargs):
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, events):
+        body = json.dumps({'events': events}, cls=DjangoJSONEncoder).encode()
+        request = urllib.request.Request(
+            self.url, data=body, method='POST', headers={'Content-Type': 'application/json'},
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                response.read()
+        except OSError as e:  # URLError, HTTPError and timeouts
+            raise OutboxError(f'{self.url}: {e}')
+
+    def close(self):
+        pass
+
+
+class NullSink:
+    """Discards events; measures the relay itself."""
+
+    def __init__(self, **kwargs):
+        pass
+
+    def send(self, events):
+        pass
+
+    def close(self):
+        pass
+
+
+SINKS = {'file': FileSink, 'http': HttpSink, 'null': NullSink}
+
+
+def get_sink(name, **options):
+    """A sink by short name or dotted path to a class with send(events) and close()."""
+    sink_class = SINKS.get(name) or import_string(name)
+    return sink_class(**options)
+
+
+# ============= Relay =============
+def _late(gaps, batch_size):
+    """Batches of events that have committed since the relay passed their ids."""
+    ids = sorted(gaps)
+    for i in range(0, len(ids), batch_size):
+        events = list(OutboxEvent.objects.filter(id__in=ids[i:i + batch_size]).order_by('id').values(*FIELDS))
+        if events:
+            yield events
+
+
+def relay(sink, consumer='default', batch_size=BATCH_SIZE, max_events=None):
+    """Deliver pending events to ``sink`` in batches, checkpointing after each one."""
+    checkpoint, _ = OutboxCheckpoint.objects.get_or_create(consumer=consumer)
+    position = checkpoint.position
+    expired = (timezone.now() - GAP_TIMEOUT).timestamp()
+    gaps = {int(pk): seen for pk, seen in checkpoint.gaps.items() if seen >= expired}
+    delivered = batches = 0
+    started = time.perf_counter()
+
+    def send(events):
+        nonlocal delivered, batches
+        sink.send(events)
+        delivered += len(events)
+        batches += 1
+        OutboxCheckpoint.objects.filter(pk=checkpoint.pk).update(
+            position=position, gaps={str(pk): seen for pk, seen in gaps.items()},
+            delivered=checkpoint.delivered + delivered, updated_at=timezone.now(),
+        )
+
+    for events in _late(gaps, batch_size):
+        if max_events is not None and delivered >= max_events:
+            break
+        events = events if max_events is None else events[:max_events - delivered]
+        for event in events:
+            del gaps[event['id']]
+        send(events)
+    while max_events is None or delivered < max_events:
+        limit = batch_size if max_events is None else min(batch_size, max_events - delivered)
+        events = list(
+            OutboxEvent.objects.filter(id__gt=position, created_at__lt=timezone.now() - SETTLE)
+            .order_by('id').values(*FIELDS)[:limit]
+        )
+        if not events:
+            break
+        seen = timezone.now().timestamp()
+        ids = {event['id'] for event in events}
+        first = position + 1 if position else events[0]['id']  # a new consumer starts at the oldest event
+        gaps.update((pk, seen) for pk in range(first, events[-1]['id']) if pk not in ids)
+        for pk in sorted(gaps)[:len(gaps) - MAX_GAPS]:
+            del gaps[pk]
+        position = events[-1]['id']
+        send(events)
+    seconds = time.perf_counter() - started
+    return {
+        'consumer': consumer,
+        'delivered': delivered,
+        'batches': batches,
+        'position': position,
+        'gaps': len(gaps),
+        'seconds': round(seconds, 3),
+        'events_per_second': round(delivered / seconds) if seconds and delivered else 0,
+    }
+
+
+def compact(keep=KEEP, batch_size=10000):
+    """Delete events older than ``keep`` that every consumer has already been sent."""
+    positions = OutboxCheckpoint.objects.aggregate(low=Min('position'))['low']
+    if positions is None:
+        return 0
+    cutoff = timezone.now() - keep
+    deleted = 0
+    while True:
+        ids = list(
+            OutboxEvent.objects.filter(id__lte=positions, created_at__lt=cutoff)
+            .order_by('id').values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            return deleted
+        deleted += OutboxEvent.objects.filter(id__gte=ids[0], id__lte=ids[-1]).delete()[0]
+
+
+# ============= Signals =============
+def _remember_status(sender, instance, **kwargs):
+    instance._outbox_status = instance.__dict__.get('status')
+
+
+def _student_saved(sender, instance, created, raw=False, **kwargs):
+    previous = getattr(instance, '_outbox_status', None)
+    instance._outbox_status = instance.status
+    if raw or created or previous is None or previous == instance.status:
+        return
+    emit(STUDENT_STATUS_CHANGED, instance, {
+        'student_id': instance.student_id, 'from': previous, 'to': instance.status,
+    })
+
+
+def _payment_saved(sender, instance, created, raw=False, **kwargs):
+    if raw or not created:
+        return
+    emit(PAYMENT_RECORDED, instance, {
+        'student': instance.student_id,
+        'amount': instance.amount,
+        'payment_method': instance.payment_method,
+        'payment_date': instance.payment_date,
+        'reference_number': instance.reference_number,
+    })
+
+
+def _notification_saved(sender, instance, created, raw=False, **kwargs):
+    if raw or not created:
+        return
+    emit(NOTIFICATION_CREATED, instance, {
+        'title': instance.title,
+        'message': instance.message,
+        'priority': instance.priority,
+        'target_audience': instance.target_audience,
+        'target_grade': instance.target_grade_id,
+    })
+
+
+def student_statuses_changed(students, status):
+    """Events for a set-based status UPDATE; call with the queryset before updating it."""
+    emit_bulk(STUDENT_STATUS_CHANGED, Student, [
+        (pk, school_id, {'student_id': student_id, 'from': previous, 'to': status})
+        for pk, school_id, student_id, previous in students.exclude(status=status).values_list(
+            'id', 'school_id', 'student_id', 'status',
+        )
+    ])
+
+
+def connect_signals():
+    post_init.connect(_remember_status, sender=Student, dispatch_uid='outbox-student-init')
+    post_save.connect(_student_saved, sender=Student, dispatch_uid='outbox-student')
+    post_save.connect(_payment_saved, sender=FeePayment, dispatch_uid='outbox-payment')
+    post_save.connect(_notification_saved, sender=Notification, dispatch_uid='outbox-notification')
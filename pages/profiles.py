@@ -0,0 +1,150 @@
+# profiles.py
+"""
+Student profile loading in a fixed number of queries.
+
+1. the student and their grade (select_related),
+2. one page of payments with running totals from window functions,
+3. activity memberships and applicable upcoming events as one UNION ALL.
+
+The query count does not depend on how much history a student has.
+"""
+import math
+
+from django.db.models import Count, F, Q, Sum, Value, CharField, Window
+from django.db.models.functions import TruncDate
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+
+from .models import ActivityParticipant, Event, FeePayment, Student
+
+PAYMENTS_PER_PAGE = 20
+MAX_PAGE = 100000  # keeps the OFFSET well inside a 64-bit integer
+
+
+def payments_with_balance(student):
+    """Student payments, newest first, annotated with running totals.
+
+    ``running_paid`` is the cumulative amount paid up to and including each
+    payment in chronological order, ``balance_after`` what was still due
+    after it, and ``payment_total`` the number of payments (for paging).
+    """
+    chronological = [F('payment_date').asc(nulls_first=True), F('id').asc()]
+    return (
+        FeePayment.objects.filter(student_id=student.id)
+        .annotate(
+            running_paid=Window(Sum('amount'), order_by=chronological),
+            payment_total=Window(Count('id')),
+        )
+        .annotate(balance_after=Value(student.fees_due) - F('running_paid'))
+        .order_by('-payment_date', '-id')
+    )
+
+
+def _payment_page(student, page, per_page):
+    offset = (page - 1) * per_page
+    return payments_with_balance(student)[offset:offset + per_page]
+
+
+def _engagements(student):
+    activities = (
+        ActivityParticipant.objects.filter(student_id=student.id)
+        .annotate(
+            kind=Value('activity', output_field=CharField()),
+            title=F('activity__title'),
+            category=F('activity__activity_type'),
+            day=F('date_joined'),
+            detail=F('activity__schedule'),
+        )
+        .values_list('kind', 'activity_id', 'title', 'category', 'day', 'detail', 'is_active')
+        .order_by()
+    )
+    events = (
+        Event.objects.filter(
+            Q(target_grades=student.grade_id) | Q(target_grades__isnull=True),
+            Q(start_date__gte=timezone.now()) | Q(start_date__isnull=True),
+            is_active=True,
+        )
+        .annotate(
+            kind=Value('event', output_field=CharField()),
+            category=F('event_type'),
+            day=TruncDate('start_date'),
+            detail=F('location'),
+        )
+        .values_list('kind', 'id', 'title', 'category', 'day', 'detail', 'is_active')
+        .order_by()
+    )
+    rows = activities.union(events, all=True)
+    fields = ['kind', 'id', 'title', 'category', 'date', 'detail', 'is_active']
+    return [dict(zip(fields, row)) for row in rows]
+
+
+def load_profile(student_id, page=1, per_page=PAYMENTS_PER_PAGE):
+    """Everything shown on a student's profile, in three queries.
+
+    A page past the last one shows the last page, as Paginator.get_page()
+    does, which takes two more queries.
+    """
+    student = get_object_or_404(Student.objects.select_related('grade'), id=student_id)
+
+    try:
+        page = min(max(int(page), 1), MAX_PAGE)
+    except (TypeError, ValueError):
+        page = 1  # ?page=abc: the first page, as Paginator.get_page() does
+    payments = list(_payment_page(student, page, per_page))
+    if payments:
+        payment_total = payments[0].payment_total
+    else:
+        payment_total = FeePayment.objects.filter(student_id=student.id).count() if page > 1 else 0
+        page = max(math.ceil(payment_total / per_page), 1)
+        if payment_total:
+            payments = list(_payment_page(student, page, per_page))
+
+    engagements = _engagements(student)
+    return {
+        'student': student,
+        'payments': payments,
+        'page': page,
+        'num_pages': max(math.ceil(payment_total / per_page), 1),
+        'payment_total': payment_total,
+        'activities': [e for e in engagements if e['kind'] == 'activity'],
+        'events': sorted(
+            (e for e in engagements if e['kind'] == 'event'),
+            key=lambda e: (e['date'] is None, e['date'] or timezone.now().date()),
+        ),
+    }
+
+
+def serialize_profile(profile):
+    student = profile['student']
+    return {
+        'id': student.id,
+        'student_id': student.student_id,
+        'name': student.name,
+        'grade': {'id': student.grade_id, 'name': student.grade.name},
+        'status': student.status,
+        'date_of_birth': student.date_of_birth,
+        'age': student.age,
+        'parent_name': student.parent_name,
+        'parent_phone': student.parent_phone,
+        'parent_email': student.parent_email,
+        'fees_due': student.fees_due,
+        'fees_paid': student.fees_paid,
+        'balance': student.balance(),
+        'payment_status': student.payment_status(),
+        'payments': {
+            'page': profile['page'],
+            'num_pages': profile['num_pages'],
+            'count': profile['payment_total'],
+            'results': [{
+                'id': p.id,
+                'amount': p.amount,
+                'payment_method': p.payment_method,
+                'reference_number': p.reference_number,
+                'payment_date': p.payment_date,
+                'running_paid': p.running_paid,
+                'balance_after': p.balance_after,
+            } for p in profile['payments']],
+        },
+        'activities': profile['activities'],
+        'events': profile['events'],
+    }
@@ -0,0 +1,112 @@
+# reports.py
+"""
+End-of-term documents, generated per grade.
+
+render_grade() produces every document of one grade (report cards, fee
+statements and the grade summary) from a fixed number of bulk queries, so a
+grade is a self-contained unit of work: the generate_reports command farms
+grades out to a process pool and writes each grade's documents into the zip
+archive as soon as that grade is done. Only the grades in flight are held in
+memory, however many grades the school has.
+
+Documents are standalone HTML pages with print styles (print to PDF from a
+browser); the page shell is rendered once per grade and each document is
+spliced into it.
+"""
+from django.db.models import Count, F, Q, Sum
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.text import slugify
+
+from . import attendance, gradebook, tenancy
+from .models import FeePayment, Grade, Student, Term
+
+KINDS = ('report_cards', 'fee_statements', 'grade_summary')
+DOCUMENT_MARKER = '<!-- document -->'
+TOP_STUDENTS = 10
+
+
+class ReportError(Exception):
+    pass
+
+
+def _shell(title):
+    return render_to_string('report_document.html', {'title': title}).split(DOCUMENT_MARKER)
+
+
+def _document(shell, body):
+    head, tail = shell
+    return (head + body + tail).encode()
+
+
+def report_cards(grade, term, folder):
+    shell = _shell(f'{grade.name} Report Card - {term.name}')
+    for card in gradebook.report_card_contexts(grade, term):
+        body = render_to_string('report_card.html', card)
+        yield f'{folder}/report-cards/{card["student"]["student__student_id"]}.html', _document(shell, body)
+
+
+def fee_statements(grade, term, folder):
+    shell = _shell(f'{grade.name} Fee Statement - {term.name}')
+    payments = {}
+    for payment in FeePayment.objects.filter(
+        student__grade=grade, payment_date__range=(term.start_date, term.end_date),
+    ).order_by('payment_date', 'id'):
+        payments.setdefault(payment.student_id, []).append(payment)
+    issued = timezone.localdate()
+    for student in Student.objects.filter(grade=grade).order_by('name'):
+        body = render_to_string('fee_statement.html', {
+            'grade': grade,
+            'term': term,
+            'student': student,
+            'payments': payments.get(student.id, []),
+            'balance': student.balance(),
+            'issued': issued,
+        })
+        yield f'{folder}/fee-statements/{student.student_id}.html', _document(shell, body)
+
+
+def grade_summary(grade, term, folder):
+    shell = _shell(f'{grade.name} Summary - {term.name}')
+    fees = Student.objects.filter(grade=grade).aggregate(
+        students=Count('id'),
+        due=Sum('fees_due'),
+        paid=Sum('fees_paid'),
+        outstanding=Sum(F('fees_due') - F('fees_paid'), filter=Q(fees_due__gt=F('fees_paid'))),
+        owing=Count('id', filter=Q(fees_due__gt=F('fees_paid'))),
+    )
+    body = render_to_string('grade_summary.html', {
+        'grade': grade,
+        'term': term,
+        'students': fees['students'],
+        'fees': fees,
+        'subjects': gradebook.subject_averages(grade, term),
+        'top': gradebook.grade_ranking(grade, term)[:TOP_STUDENTS],
+    })
+    yield f'{folder}/summary.html', _document(shell, body)
+
+
+GENERATORS = {'report_cards': report_cards, 'fee_statements': fee_statements, 'grade_summary': grade_summary}
+
+
+def term_for_school(school_id, term_id=None):
+    """The requested term, else the school's current (or most recent) one."""
+    with tenancy.using_school(school_id):
+        if term_id is not None:
+            term = Term.objects.filter(pk=term_id).first()
+            if term is None:
+                raise ReportError(f'Term {term_id} does not belong to school {school_id}')
+            return term
+        term = attendance.term_for(timezone.localdate()) or Term.objects.order_by('-start_date').first()
+        if term is None:
+            raise ReportError(f'School {school_id} has no terms')
+        return term
+
+
+def render_grade(grade_id, term_id, kinds=KINDS):
+    """[(archive path, HTML bytes)] of every requested document for one grade."""
+    grade = Grade.all_objects.select_related('school').get(pk=grade_id)
+    with tenancy.using_school(grade.school_id):
+        term = Term.objects.get(pk=term_id)
+        folder = f'{slugify(grade.school.code)}/{slugify(grade.name) or grade.pk}'
+        return [doc for kind in kinds for doc in GENERATORS[kind](grade, term, folder)]
@@ -0,0 +1,303 @@
+# roster.py
+"""
+Columnar in-memory roster of students for analytics.
+
+The snapshot keeps one typed ``array`` per column (id, school, grade, fees
+due/paid, date of birth, enrolment date, status code) instead of Student
+instances: about 160 bytes a student (49 in the columns, the rest in the id
+index) against well over a kilobyte for a model instance. It is loaded per
+worker with a single values_list query the first time analytics are asked
+for and then kept current:
+
+* saves and deletes in this worker are applied after commit by signals,
+  which re-read the saved row rather than trust the instance (form input
+  leaves dates as strings);
+* every REFRESH seconds, on next use, rows with a newer ``updated_at`` and
+  student tombstones (pages/sync.py) are read back, which covers other
+  workers and queryset .update() calls (they set updated_at, see bulk.py).
+
+Aggregations run over whole columns with builtins (map, sorted, Counter,
+itertools.compress) in pure Python: a full summary() over 100k students
+takes about 100 ms, one grade of them about 25 ms. That is a CPU cost per
+request, but no query and no model instances. Amounts are floats: fine for
+distributions, not for accounting. Dates are stored as YYYYMMDD integers, which makes an age
+``(today - born) // 10000``.
+"""
+import operator
+import threading
+import time
+from array import array
+from bisect import bisect_right
+from collections import Counter
+from datetime import timedelta
+from itertools import compress
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+
+from . import tenancy
+from .models import STATUS_CHOICES, Student, Tombstone
+
+REFRESH = getattr(settings, 'ROSTER_REFRESH_SECONDS', 30)
+OVERLAP = timedelta(seconds=5)  # re-read recent rows in case of a late commit
+STATUSES = [code for code, _ in STATUS_CHOICES]
+STATUS_CODES = {code: i for i, code in enumerate(STATUSES)}
+OTHER = len(STATUSES)  # code for a status no longer in STATUS_CHOICES
+FIELDS = ('id', 'school_id', 'grade_id', 'fees_due', 'fees_paid', 'date_of_birth', 'enrolled_on', 'status')
+GROUPS = ('grade', 'status', 'school')
+
+
+class RosterError(Exception):
+    pass
+
+
+def _day(value):
+    return value.year * 10000 + value.month * 100 + value.day if value else 0
+
+
+class Roster:
+    """Column arrays plus an id -> position index; mutate through upsert() and remove()."""
+
+    def __init__(self):
+        self.ids = array('q')
+        self.school = array('q')
+        self.grade = array('q')
+        self.fees_due = array('d')
+        self.fees_paid = array('d')
+        self.born = array('i')  # YYYYMMDD, 0 if unknown
+        self.enrolled = array('i')
+        self.status = array('b')
+        self.position = {}
+        self.lock = threading.RLock()
+        self.watermark = None  # newest updated_at seen
+        self.tombstone_id = 0
+        self.refreshed = 0.0
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def columns(self):
+        return (self.ids, self.school, self.grade, self.fees_due, self.fees_paid,
+                self.born, self.enrolled, self.status)
+
+    def _values(self, row):
+        pk, school_id, grade_id, fees_due, fees_paid, born, enrolled, status = row
+        return (pk, school_id or 0, grade_id or 0, float(fees_due), float(fees_paid),
+                _day(born), _day(enrolled), STATUS_CODES.get(status, OTHER))
+
+    def upsert(self, row):
+        """Insert or replace one student given as a tuple in FIELDS order."""
+        values = self._values(row)
+        with self.lock:
+            i = self.position.get(values[0])
+            if i is None:
+                self.position[values[0]] = len(self.ids)
+                for column, value in zip(self.columns, values):
+                    column.append(value)
+            else:
+                for column, value in zip(self.columns, values):
+                    column[i] = value
+
+    def remove(self, pk):
+        """Drop a student; the last row moves into its slot."""
+        with self.lock:
+            i = self.position.pop(pk, None)
+            if i is None:
+                return
+            last = len(self.ids) - 1
+            for column in self.columns:
+                if i != last:
+                    column[i] = column[last]
+                column.pop()
+            if i != last:
+                self.position[self.ids[i]] = i
+
+    def load(self):
+        with self.lock:
+            self.tombstone_id = Tombstone.objects.aggregate(last=Max('id'))['last'] or 0
+            rows = Student.all_objects.order_by().values_list(*FIELDS, 'updated_at')
+            watermark = None
+            for row in rows.iterator(chunk_size=5000):
+                self.upsert(row[:-1])
+                if row[-1] and (watermark is None or row[-1] > watermark):
+                    watermark = row[-1]
+            self.watermark = watermark
+            self.refreshed = time.monotonic()
+
+    def catch_up(self):
+        """Apply changes made outside this worker's signals since the last load or catch-up."""
+        with self.lock:
+            rows = Student.all_objects.order_by()
+            if self.watermark is not None:
+                rows = rows.filter(updated_at__gte=self.watermark - OVERLAP)
+            for row in rows.values_list(*FIELDS, 'updated_at').iterator(chunk_size=5000):
+                self.upsert(row[:-1])
+                if row[-1] and (self.watermark is None or row[-1] > self.watermark):
+                    self.watermark = row[-1]
+            deleted = Tombstone.objects.filter(model_name='students', id__gt=self.tombstone_id)
+            for tombstone_id, object_id in deleted.order_by('id').values_list('id', 'object_id'):
+                self.remove(int(object_id))
+                self.tombstone_id = tombstone_id
+            self.refreshed = time.monotonic()
+
+    def nbytes(self):
+        return sum(column.itemsize * len(column) for column in self.columns)
+
+    # ============= Queries =============
+    def mask(self, school_id=None, grade_id=None, status=None):
+        """Selector for itertools.compress, or None for every row."""
+        tests = []
+        if school_id is not None:
+            tests.append((self.school, school_id))
+        if grade_id is not None:
+            tests.append((self.grade, int(grade_id)))
+        if status is not None:
+            if status not in STATUS_CODES:
+                raise RosterError(f'Unknown status: {status}')
+            tests.append((self.status, STATUS_CODES[status]))
+        mask = None
+        for column, value in tests:
+            selected = map(value.__eq__, column)
+            mask = list(selected) if mask is None else list(map(operator.and_, mask, selected))
+        return mask
+
+    def column(self, name, mask=None):
+        """Values of a numeric column (``age`` skips unknown birth dates)."""
+        if name == 'balance':
+            values = map(operator.sub, self.fees_due, self.fees_paid)
+        elif name == 'age':
+            today = _day(timezone.localdate())
+            born = self.born if mask is None else array('i', compress(self.born, mask))
+            return [(today - b) // 10000 for b in born if b]
+        elif name in ('fees_due', 'fees_paid'):
+            values = getattr(self, name)
+        else:
+            raise RosterError(f'Unknown column: {name}')
+        return list(values if mask is None else compress(values, mask))
+
+    def keys(self, by, mask=None):
+        """Group key of each row: grade or school id, or status."""
+        if by not in GROUPS:
+            raise RosterError(f'Cannot group by {by}')
+        keys = getattr(self, by)
+        if by == 'status':
+            keys = map([*STATUSES, 'other'].__getitem__, keys)
+        return list(keys if mask is None else compress(keys, mask))
+
+
+# ============= Analytics =============
+def histogram(values, bins=10):
+    """``bins`` equal-width buckets over the range of ``values``."""
+    if not values:
+        return {'edges': [], 'counts': []}
+    low, high = min(values), max(values)
+    width = (high - low) / bins or 1
+    edges = [low + width * i for i in range(bins + 1)]
+    inner = edges[1:-1]
+    counts = Counter(map(lambda v: bisect_right(inner, v), values))
+    return {'edges': [round(e, 2) for e in edges], 'counts': [counts.get(i, 0) for i in range(bins)]}
+
+
+def percentiles(values, points=(10, 25, 50, 75, 90)):
+    """Linearly interpolated percentiles of ``values``."""
+    ordered = sorted(values)
+    if not ordered:
+        return {}
+    result = {}
+    for p in points:
+        rank = (len(ordered) - 1) * p / 100
+        low = int(rank)
+        high = min(low + 1, len(ordered) - 1)
+        result[p] = round(ordered[low] + (ordered[high] - ordered[low]) * (rank - low), 2)
+    return result
+
+
+def group_by(keys, values):
+    """count, sum and mean of ``values`` per key."""
+    counts = Counter(keys)
+    sums = Counter()
+    for key, value in zip(keys, values):
+        sums[key] += value
+    return {
+        key: {'count': count, 'sum': round(sums[key], 2), 'mean': round(sums[key] / count, 2)}
+        for key, count in counts.items()
+    }
+
+
+def summary(grade_id=None, status=None, bins=10, data=None):
+    """Fee and age distributions for the active school (or all schools)."""
+    if data is None:
+        data = snapshot()
+    with data.lock:
+        mask = data.mask(tenancy.current_school_id(), grade_id, status)
+        balance = data.column('balance', mask)
+        ages = data.column('age', mask)
+        return {
+            'students': len(balance),
+            'status_mix': dict(Counter(data.keys('status', mask))),
+            'balance_percentiles': percentiles(balance),
+            'balance_histogram': histogram(balance, bins),
+            'balance_by_grade': group_by(data.keys('grade', mask), balance),
+            'age_histogram': dict(sorted(Counter(ages).items())),
+            'age_percentiles': percentiles(ages),
+        }
+
+
+# ============= Per-worker snapshot =============
+_roster = None
+_roster_lock = threading.Lock()
+
+
+def snapshot():
+    """This worker's roster, loaded on first use and caught up every REFRESH seconds."""
+    global _roster
+    with _roster_lock:
+        if _roster is None:
+            roster = Roster()
+            roster.load()
+            _roster = roster
+        elif time.monotonic() - _roster.refreshed > REFRESH:
+            _roster.catch_up()
+        return _roster
+
+
+def reset():
+    """Forget the snapshot; the next use reloads it."""
+    global _roster
+    with _roster_lock:
+        _roster = None
+
+
+def _refresh(pk):
+    roster = _roster  # may have been reset since the signal fired
+    if roster is None:
+        return
+    row = Student.all_objects.filter(pk=pk).values_list(*FIELDS).first()
+    if row is None:
+        roster.remove(pk)
+    else:
+        roster.upsert(row)
+
+
+def _student_saved(sender, instance, raw=False, **kwargs):
+    if raw or _roster is None:
+        return
+    pk = instance.pk
+    # robust: a failed refresh is logged, never raised into the view that saved the student.
+    transaction.on_commit(lambda: _refresh(pk), robust=True)
+
+
+def _student_deleted(sender, instance, **kwargs):
+    if _roster is None:
+        return
+    pk = instance.pk
+    transaction.on_commit(lambda: _refresh(pk), robust=True)
+
+
+def connect_signals():
+    post_save.connect(_student_saved, sender=Student, dispatch_uid='roster-save')
+    post_delete.connect(_student_deleted, sender=Student, dispatch_uid='roster-delete')
@@ -0,0 +1,242 @@
+# singleflight.py
+"""
+Single-flight caching for expensive reports.
+
+``get_or_compute(key, compute)`` makes concurrent callers for the same key
+share one computation:
+
+* within a process, the first caller (the leader) computes and the others
+  wait on its Flight and take its result;
+* across workers, the leader first takes a lock with cache.add(); a worker
+  that loses the race polls the cache for the winner's result instead of
+  computing it again;
+* results stay in the cache for ``ttl + stale_ttl``. Once older than ``ttl``
+  they are served stale while one background thread recomputes them.
+
+Cross-worker sharing needs a shared cache backend (Redis, Memcached,
+database); with the per-process default cache only in-process coalescing
+applies. Counters of fresh hits, stale hits, computations and coalesced
+waits are kept per report name and returned by metrics().
+
+Saves and deletes of the models a report is built from forget it (for the
+row's school and the all-schools view) once the transaction commits; bulk
+UPDATEs, which send no signals, call forget_for() themselves.
+"""
+import contextvars
+import logging
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models.signals import post_delete, post_save
+
+from . import tenancy
+from .models import Event, FeePayment, Grade, Notification, Staff, Student, TeachingAssignment
+
+logger = logging.getLogger(__name__)
+
+TTL = getattr(settings, 'SINGLEFLIGHT_TTL', 30)  # seconds a result is fresh
+STALE_TTL = getattr(settings, 'SINGLEFLIGHT_STALE_TTL', 300)  # seconds it may then be served stale
+LOCK_TIMEOUT = 60  # seconds before a crashed worker's lock expires
+WAIT_TIMEOUT = 30  # seconds a follower waits before computing itself
+POLL_INTERVAL = 0.05
+
+COUNTERS = ['hits', 'stale', 'computed', 'coalesced', 'shared', 'refreshes', 'errors']
+
+# Cached reports (see views.py) and the models they are computed from.
+DEPENDENCIES = {
+    'dashboard-stats': (Student, FeePayment, Notification, Event, Staff, Grade),
+    'finance': (Student, FeePayment, Grade),
+    'grades': (Student, Grade, TeachingAssignment),
+}
+
+
+class SingleFlightError(Exception):
+    pass
+
+
+class Flight:
+    """One in-progress computation that other threads can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+    def wait(self, timeout):
+        if not self.done.wait(timeout):
+            raise SingleFlightError('Timed out waiting for a shared computation')
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+class Metrics:
+    def __init__(self):
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def incr(self, key, counter):
+        name = key.split(':', 1)[0]
+        with self._lock:
+            counts = self._counts.setdefault(name, dict.fromkeys(COUNTERS, 0))
+            counts[counter] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {name: dict(counts) for name, counts in self._counts.items()}
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+
+
+_flights = {}
+_flights_lock = threading.Lock()
+_metrics = Metrics()
+
+
+def school_key(name):
+    """Cache key for report ``name`` scoped to the active school."""
+    return f'{name}:{tenancy.current_school_id() or "all"}'
+
+
+def _cache_key(key):
+    return f'singleflight:{key}'
+
+
+def _lock_key(key):
+    return f'singleflight-lock:{key}'
+
+
+def _store(key, value, ttl, stale_ttl):
+    cache.set(_cache_key(key), (time.time() + ttl, value), ttl + stale_ttl)
+
+
+def _compute_locked(key, compute, ttl, stale_ttl):
+    """Compute under the cross-worker lock, or wait for the worker holding it."""
+    token = uuid.uuid4().hex
+    deadline = time.monotonic() + WAIT_TIMEOUT
+    while not cache.add(_lock_key(key), token, LOCK_TIMEOUT):
+        entry = cache.get(_cache_key(key))
+        if entry is not None and entry[0] > time.time():
+            _metrics.incr(key, 'shared')
+            return entry[1]
+        if time.monotonic() > deadline:
+            break  # the other worker is stuck; compute without the lock
+        time.sleep(POLL_INTERVAL)
+    try:
+        value = compute()
+        _store(key, value, ttl, stale_ttl)
+        _metrics.incr(key, 'computed')
+        return value
+    finally:
+        if cache.get(_lock_key(key)) == token:
+            cache.delete(_lock_key(key))
+
+
+def _lead(key, compute, ttl, stale_ttl, flight):
+    try:
+        flight.value = _compute_locked(key, compute, ttl, stale_ttl)
+    except BaseException as e:
+        flight.error = e
+        _metrics.incr(key, 'errors')
+        raise
+    finally:
+        with _flights_lock:
+            _flights.pop(key, None)
+        flight.done.set()
+    return flight.value
+
+
+def _join(key):
+    """(flight, is_leader) for ``key``."""
+    with _flights_lock:
+        flight = _flights.get(key)
+        if flight is not None:
+            return flight, False
+        flight = _flights[key] = Flight()
+        return flight, True
+
+
+def _refresh_in_background(key, compute, ttl, stale_ttl):
+    flight, leader = _join(key)
+    if not leader:
+        return  # already being refreshed in this process
+    _metrics.incr(key, 'refreshes')
+    context = contextvars.copy_context()  # keeps the active school
+
+    def run():
+        try:
+            context.run(_lead, key, compute, ttl, stale_ttl, flight)
+        except Exception:
+            logger.exception('Background refresh of %s failed', key)
+        finally:
+            connection.close()  # the thread's own connection
+
+    threading.Thread(target=run, name=f'singleflight-{key}', daemon=True).start()
+
+
+def get_or_compute(key, compute, ttl=TTL, stale_ttl=STALE_TTL):
+    """The cached value of ``compute()`` for ``key``, computing it at most once at a time.
+
+    ``compute`` takes no arguments and must return something the cache can
+    pickle (plain data, not querysets).
+    """
+    entry = cache.get(_cache_key(key))
+    if entry is not None:
+        fresh_until, value = entry
+        if fresh_until > time.time():
+            _metrics.incr(key, 'hits')
+        else:
+            _metrics.incr(key, 'stale')
+            _refresh_in_background(key, compute, ttl, stale_ttl)
+        return value
+
+    flight, leader = _join(key)
+    if leader:
+        return _lead(key, compute, ttl, stale_ttl, flight)
+    _metrics.incr(key, 'coalesced')
+    return flight.wait(WAIT_TIMEOUT)
+
+
+def forget(key):
+    """Drop the cached value so the next call recomputes (e.g. right after a write)."""
+    cache.delete(_cache_key(key))
+
+
+def forget_for(model, school_ids):
+    """Forget every report built from ``model`` for ``school_ids`` and for all schools."""
+    keys = [
+        _cache_key(f'{name}:{school_id or "all"}')
+        for name, models in DEPENDENCIES.items() if model in models
+        for school_id in {*school_ids, None}
+    ]
+    cache.delete_many(keys)
+
+
+def _changed(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    school_id = getattr(instance, 'school_id', None)
+    transaction.on_commit(lambda: forget_for(sender, [school_id]))
+
+
+def connect_signals():
+    for model in {model for models in DEPENDENCIES.values() for model in models}:
+        post_save.connect(_changed, sender=model, dispatch_uid=f'singleflight-save-{model.__name__}')
+        post_delete.connect(_changed, sender=model, dispatch_uid=f'singleflight-delete-{model.__name__}')
+
+
+def metrics():
+    """Counters per report name, plus the computations in flight in this process."""
+    with _flights_lock:
+        in_flight = sorted(_flights)
+    return {'reports': _metrics.snapshot(), 'in_flight': in_flight}
+
+
+def reset_metrics():
+    _metrics.reset()
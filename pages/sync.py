@@ -0,0 +1,147 @@
+# sync.py
+"""
+Delta sync for offline clients (the classroom tablet app).
+
+``changes(name, token)`` returns the rows of one model changed since a sync
+token, plus the ids deleted since then, a bounded page at a time. Changed
+rows are walked in (updated_at, id) order on the (school, updated_at, id)
+index; deletions come from Tombstone rows written by post_delete. The token
+is signed (django.core.signing) and carries the school and the position
+reached in both streams, so clients can't forge or cross schools, and an
+interrupted sync resumes from the last page it received.
+
+Rows are only handed out once they are SETTLE seconds old, so a transaction
+that commits a little after its timestamp is not skipped by a token issued
+in between. Queryset .update() calls must set updated_at themselves (as
+bulk.py and invoicing.py do).
+"""
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core import signing
+from django.db.models import Q
+from django.db.models.signals import post_delete
+from django.utils import timezone
+
+from . import tenancy
+from .models import Activity, Event, FeePayment, Grade, Notification, Staff, Student, Tombstone
+
+PAGE_SIZE = 500
+MAX_PAGE_SIZE = 2000
+SETTLE = timedelta(seconds=getattr(settings, 'SYNC_SETTLE_SECONDS', 5))
+TOMBSTONE_RETENTION = timedelta(days=getattr(settings, 'SYNC_TOMBSTONE_DAYS', 90))
+SALT = 'pages.sync'
+
+# name -> (model, fields left out of the payload)
+MODELS = {
+    'students': (Student, ['school']),
+    'staff': (Staff, ['school', 'salary']),
+    'grades': (Grade, ['school', 'enrolled_count']),
+    'notifications': (Notification, ['school']),
+    'events': (Event, ['school']),
+    'activities': (Activity, ['school']),
+    'payments': (FeePayment, ['school']),
+}
+
+
+class SyncError(Exception):
+    pass
+
+
+class SyncExpired(SyncError):
+    """The token predates the retained tombstones; the client has to sync from scratch."""
+
+
+def _fields(name):
+    model, excluded = MODELS[name]
+    return [f.attname for f in model._meta.concrete_fields if f.name not in excluded]
+
+
+def make_token(name, school_id, updated_at, last_id, tombstone_id):
+    return signing.dumps({
+        'm': name,
+        's': school_id,
+        't': updated_at.isoformat() if updated_at else None,
+        'i': last_id,
+        'd': tombstone_id,
+        'at': timezone.now().isoformat(),
+    }, salt=SALT, compress=True)
+
+
+def read_token(name, token, school_id):
+    try:
+        data = signing.loads(token, salt=SALT)
+    except signing.BadSignature:
+        raise SyncError('Invalid sync token')
+    if data['m'] != name or data['s'] != school_id:
+        raise SyncError(f'Sync token is not for {name} of this school')
+    if datetime.fromisoformat(data['at']) < timezone.now() - TOMBSTONE_RETENTION:
+        raise SyncExpired('Sync token has expired; sync again without one')
+    updated_at = datetime.fromisoformat(data['t']) if data['t'] else None
+    return updated_at, data['i'], data['d']
+
+
+def changes(name, token=None, limit=PAGE_SIZE):
+    """One page of changes to model ``name`` since ``token`` for the active school.
+
+    Without a token this is a full snapshot (paged the same way) and only
+    deletions from now on are reported. Returns a dict with ``changed`` rows,
+    ``deleted`` ids, the ``next`` token and ``has_more``; keep calling with
+    ``next`` until has_more is false.
+    """
+    if name not in MODELS:
+        raise SyncError(f'Unknown model: {name}')
+    model, _ = MODELS[name]
+    limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+    school_id = tenancy.current_school_id()
+    settled = timezone.now() - SETTLE
+
+    tombstones = Tombstone.objects.filter(model_name=name, deleted_at__lt=settled)
+    if school_id is not None:
+        tombstones = tombstones.filter(school_id=school_id)
+    if token:
+        updated_at, last_id, tombstone_id = read_token(name, token, school_id)
+    else:
+        updated_at, last_id = None, 0
+        tombstone_id = tombstones.order_by('-id').values_list('id', flat=True).first() or 0
+
+    rows = model.objects.filter(updated_at__lt=settled)
+    if updated_at is not None:
+        rows = rows.filter(Q(updated_at__gt=updated_at) | Q(updated_at=updated_at, id__gt=last_id))
+    rows = list(rows.order_by('updated_at', 'id').values(*_fields(name))[:limit + 1])
+    deleted = list(
+        tombstones.filter(id__gt=tombstone_id).order_by('id').values_list('id', 'object_id')[:limit + 1]
+    )
+
+    has_more = len(rows) > limit or len(deleted) > limit
+    rows, deleted = rows[:limit], deleted[:limit]
+    if rows:
+        updated_at, last_id = rows[-1]['updated_at'], rows[-1]['id']
+    if deleted:
+        tombstone_id = deleted[-1][0]
+    return {
+        'model': name,
+        'changed': rows,
+        'deleted': [object_id for _, object_id in deleted],
+        'next': make_token(name, school_id, updated_at, last_id, tombstone_id),
+        'has_more': has_more,
+    }
+
+
+def prune_tombstones(older_than=TOMBSTONE_RETENTION):
+    """Delete tombstones no unexpired token can still need."""
+    deleted, _ = Tombstone.objects.filter(deleted_at__lt=timezone.now() - older_than).delete()
+    return deleted
+
+
+# ============= Signals =============
+_names = {model: name for name, (model, _) in MODELS.items()}
+
+
+def _record_deletion(sender, instance, **kwargs):
+    Tombstone.objects.create(model_name=_names[sender], object_id=instance.pk, school_id=instance.school_id)
+
+
+def connect_signals():
+    for model, name in _names.items():
+        post_delete.connect(_record_deletion, sender=model, dispatch_uid=f'sync-{name}')
@@ -0,0 +1,207 @@
+# tenancy.py
+"""
+Multi-school (tenant) partitioning.
+
+Every tenant-owned record carries a ``school`` foreign key. TenantMiddleware
+resolves the school for a request (``X-School`` header, ``?school=`` parameter
+or the session; an unknown school is a 404, never all schools) and
+TenantManager, the default ``objects`` manager of those models, restricts
+every query to it, so per-campus queries hit the composite indexes that lead
+with ``school``. With no school active (management commands, single-campus
+installs) the managers are unscoped; ``all_objects`` is always unscoped and is
+what the cross-school reports use.
+
+Link tables (ActivityParticipant, FeeScheduleItem, InvoiceLine, the archived
+history) are reached through a tenant-owned parent and carry no school.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import models
+from django.db.models import Count, Q, Sum
+from django.db.models.signals import pre_save
+from django.http import JsonResponse
+
+DEFAULT_SCHOOL_CODE = getattr(settings, 'DEFAULT_SCHOOL_CODE', 'main')
+SESSION_KEY = 'school_id'
+
+# Records that take their school from a parent instead of the active school.
+TENANT_PARENTS = {
+    'Student': 'grade',
+    'FeePayment': 'student',
+    'Invoice': 'student',
+}
+
+_school = ContextVar('tenant_school', default=None)
+_ids_by_code = {}
+_known_ids = set()
+
+
+class TenancyError(Exception):
+    pass
+
+
+class TenantManager(models.Manager):
+    """Manager restricted to the active school, if there is one."""
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        school_id = _school.get()
+        if school_id is not None:
+            queryset = queryset.filter(school_id=school_id)
+        return queryset
+
+
+def school_id_for_code(code):
+    """Primary key of the school with ``code`` (cached per process), or None."""
+    from .models import School
+    if code not in _ids_by_code:
+        school_id = School.objects.filter(code=code).values_list('id', flat=True).first()
+        if school_id is None:
+            return None
+        _ids_by_code[code] = school_id
+    return _ids_by_code[code]
+
+
+def default_school_id():
+    """The school that single-campus installs and unscoped writes belong to."""
+    from .models import School
+    school_id = school_id_for_code(DEFAULT_SCHOOL_CODE)
+    if school_id is None:
+        school_id = School.objects.create(code=DEFAULT_SCHOOL_CODE, name='Main Campus').id
+        _ids_by_code[DEFAULT_SCHOOL_CODE] = school_id
+    return school_id
+
+
+def current_school_id():
+    return _school.get()
+
+
+def school_for_new_record():
+    """Field default for ``school``: the active school, else the default one."""
+    return _school.get() or default_school_id()
+
+
+def activate(school_id):
+    return _school.set(school_id)
+
+
+def deactivate(token):
+    _school.reset(token)
+
+
+@contextmanager
+def using_school(school_id):
+    """Scope the tenant managers to ``school_id`` (None for all schools)."""
+    token = activate(school_id)
+    try:
+        yield
+    finally:
+        deactivate(token)
+
+
+def school_id_for_value(value):
+    """Primary key of the school an ``X-School`` / ``?school=`` value (id or code) names."""
+    from .models import School
+    if not value.isdigit():
+        school_id = school_id_for_code(value)
+    elif int(value) in _known_ids or School.objects.filter(pk=int(value)).exists():
+        school_id = int(value)
+        _known_ids.add(school_id)
+    else:
+        school_id = None
+    if school_id is None:
+        raise TenancyError(f'Unknown school: {value}')
+    return school_id
+
+
+def _requested_school(request):
+    value = request.META.get('HTTP_X_SCHOOL') or request.GET.get('school')
+    if value:
+        school_id = school_id_for_value(value)
+        if hasattr(request, 'session'):
+            request.session[SESSION_KEY] = school_id
+        return school_id
+    if hasattr(request, 'session'):
+        return request.session.get(SESSION_KEY)
+    return None
+
+
+class TenantMiddleware:
+    """Activate the school the request is for; sets ``request.school_id``."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            request.school_id = _requested_school(request)
+        except TenancyError as e:
+            # Unscoped would mean every school's records: refuse instead.
+            return JsonResponse({'error': str(e)}, status=404)
+        token = activate(request.school_id)
+        try:
+            return self.get_response(request)
+        finally:
+            deactivate(token)
+
+
+def _inherit_school(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    parent_name = TENANT_PARENTS[sender.__name__]
+    field = sender._meta.get_field(parent_name)
+    if field.is_cached(instance):
+        school_id = getattr(instance, parent_name).school_id
+    else:
+        school_id = (
+            field.related_model.all_objects
+            .filter(pk=getattr(instance, field.attname))
+            .values_list('school_id', flat=True)
+            .first()
+        )
+    if school_id is not None:
+        instance.school_id = school_id
+
+
+def connect_signals():
+    from django.apps import apps
+    for model_name in TENANT_PARENTS:
+        pre_save.connect(_inherit_school, sender=apps.get_model('pages', model_name),
+                         dispatch_uid=f'tenancy-{model_name}')
+
+
+def school_summary():
+    """Headcount, capacity and fee totals per school, one grouped query per table."""
+    from .models import Grade, School, Staff, Student
+
+    students = {
+        row.pop('school_id'): row
+        for row in Student.all_objects.order_by().values('school_id').annotate(
+            students=Count('id'),
+            active_students=Count('id', filter=Q(status='active')),
+            fees_due=Sum('fees_due'),
+            fees_paid=Sum('fees_paid'),
+        )
+    }
+    staff = dict(
+        Staff.all_objects.order_by().values('school_id').annotate(n=Count('id')).values_list('school_id', 'n')
+    )
+    grades = {
+        row.pop('school_id'): row
+        for row in Grade.all_objects.order_by().values('school_id').annotate(
+            grades=Count('id'), capacity=Sum('capacity'), enrolled=Sum('enrolled_count'),
+        )
+    }
+
+    summary = []
+    for school in School.objects.order_by('name').values('id', 'code', 'name'):
+        row = dict(school, staff=staff.get(school['id'], 0))
+        row.update(students.get(school['id'], {
+            'students': 0, 'active_students': 0, 'fees_due': 0, 'fees_paid': 0,
+        }))
+        row.update(grades.get(school['id'], {'grades': 0, 'capacity': 0, 'enrolled': 0}))
+        row['outstanding'] = (row['fees_due'] or 0) - (row['fees_paid'] or 0)
+        summary.append(row)
+    return summary
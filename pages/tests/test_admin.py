@@ -0,0 +1,54 @@
+from decimal import Decimal
+
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from pages import audit
+from pages.models import Grade, Student
+
+
+class AdminTests(TestCase):
+    def setUp(self):
+        self.addCleanup(audit.buffer.flush)
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+        self.grade = Grade.objects.create(name='Grade 3', level=3)
+        self.students = [Student.objects.create(name=f'Student {i}', grade=self.grade) for i in range(3)]
+
+    def test_every_changelist_renders(self):
+        for model in admin.site._registry:
+            url = reverse(f'admin:{model._meta.app_label}_{model._meta.model_name}_changelist')
+            self.assertEqual(self.client.get(url).status_code, 200, url)
+
+    def test_student_changelist_query_count_does_not_grow_with_rows(self):
+        url = reverse('admin:pages_student_changelist')
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(url)
+        grades = [Grade.objects.create(name=f'Grade {level}', level=level) for level in range(4, 10)]
+        Student.objects.bulk_create([
+            Student(name=f'More {i}', grade=grades[i % len(grades)], student_id=f'M{i:04d}') for i in range(30)
+        ])
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.get(url)
+        self.assertContains(response, 'More 29')
+        self.assertEqual(len(many), len(few))
+
+    def test_add_term_fees_action(self):
+        response = self.client.post(reverse('admin:pages_student_changelist'), {
+            'action': 'add_term_fees', 'amount': '250.00',
+            admin.helpers.ACTION_CHECKBOX_NAME: [s.pk for s in self.students[:2]],
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(
+            list(Student.objects.order_by('name').values_list('fees_due', flat=True)),
+            [Decimal('250.00'), Decimal('250.00'), Decimal('0.00')],
+        )
+
+    def test_grade_autocomplete(self):
+        response = self.client.get(reverse('admin:autocomplete'), {
+            'app_label': 'pages', 'model_name': 'student', 'field_name': 'grade', 'term': 'Grade',
+        })
+        self.assertEqual([r['text'] for r in response.json()['results']], ['Grade 3'])
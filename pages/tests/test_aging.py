@@ -0,0 +1,63 @@
+from datetime import date
+from decimal import Decimal
+
+from django.test import TestCase
+
+from pages import aging, audit
+from pages.models import Grade, Invoice, Student, Term
+
+AS_OF = date(2026, 6, 30)
+
+
+class AgingTests(TestCase):
+    def setUp(self):
+        self.addCleanup(audit.buffer.flush)
+        grade = Grade.objects.create(name='Grade 6', capacity=30)
+        # 200 opening balance + three invoices, 1,900 paid: the oldest 1,900 is settled.
+        self.amina = Student.objects.create(
+            name='Amina', grade=grade, enrolled_on=date(2025, 1, 6), fees_due=2700, fees_paid=1900,
+        )
+        invoices = [(1000, date(2026, 2, 1)), (1000, date(2026, 5, 15)), (500, date(2026, 6, 20))]
+        for n, (total, due) in enumerate(invoices):
+            term = Term.objects.create(name=f'2026 Term {n + 1}', start_date=due, end_date=due)
+            Invoice.objects.create(
+                number=f'INV-{n + 1}', student=self.amina, term=term, total=total, due_date=due, applied=True,
+            )
+        # No invoices: the balance is as old as the enrolment.
+        self.baraka = Student.objects.create(
+            name='Baraka', grade=grade, enrolled_on=date(2026, 4, 20), fees_due=300, fees_paid=0,
+        )
+
+    def test_balance_is_aged_by_the_due_dates_it_is_made_of(self):
+        rows = {row['name']: row for row in aging.student_aging(AS_OF)}
+        amina = rows['Amina']
+        self.assertEqual(amina['outstanding'], Decimal('800'))
+        self.assertEqual(
+            [amina[key] for key in aging.OWED], [Decimal('500'), Decimal('300'), Decimal('0'), Decimal('0')],
+        )
+        self.assertEqual(amina['bucket'], 'days_31_60')
+        self.assertEqual(rows['Baraka']['owed_days_61_90'], Decimal('300'))
+        self.assertEqual(rows['Baraka']['bucket'], 'days_61_90')
+
+    def test_totals_add_up_the_parts(self):
+        totals = aging.totals(AS_OF)
+        self.assertEqual(
+            {key: totals[key] for key, _ in aging.BUCKETS},
+            {'current': 500, 'days_31_60': 300, 'days_61_90': 300, 'over_90': 0},
+        )
+        self.assertEqual((totals['total'], totals['students']), (1100, 2))
+        [grade] = aging.grade_summary(AS_OF)
+        self.assertEqual(grade['total'], 1100)
+
+    def test_api_limit_is_validated(self):
+        response = self.client.get('/api/finance/aging/', {'students': 1, 'limit': 'abc'})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get('/api/finance/aging/', {'students': 1, 'limit': '-1', 'as_of': '2026-06-30'})
+        self.assertEqual([s['name'] for s in response.json()['students']], ['Amina'])
+
+    def test_page_and_csv(self):
+        self.assertEqual(self.client.get('/finance/aging/', {'as_of': '2026-06-30'}).status_code, 200)
+        response = self.client.get('/finance/aging.csv', {'as_of': '2026-06-30'})
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertIn('owed_days_31_60', lines[0])
+        self.assertEqual(len(lines), 3)
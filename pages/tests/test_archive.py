@@ -0,0 +1,76 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils import timezone
+
+from pages import archive, audit
+from pages.models import (
+    ArchivedAttendance, ArchivedInvoice, ArchivedResult, Document, Exam, Grade, Invoice, InvoiceLine, Result,
+    Student, StudentAttendance, Subject, Term,
+)
+
+
+class ArchiveTests(TestCase):
+    def setUp(self):
+        self.addCleanup(audit.buffer.flush)
+        self.grade = Grade.objects.create(name='Grade 12', capacity=40)
+        self.student = Student.objects.create(name='Amina', grade=self.grade, status='graduated')
+
+    def archive(self):
+        Student.objects.filter(pk=self.student.pk).update(updated_at=timezone.now() - timedelta(days=3 * 365))
+        return archive.archive_students(years=2)
+
+    def test_documents_follow_the_student_into_the_archive(self):
+        document = Document.objects.create(
+            student=self.student, kind='birth_certificate', name='cert.pdf', content_type='application/pdf',
+            size=10, sha256='0' * 64,
+        )
+        totals = self.archive()
+        self.assertEqual(totals['students'], 1)
+        self.assertEqual(totals['documents'], 1)
+        document.refresh_from_db()
+        self.assertIsNone(document.student_id)
+        self.assertEqual(document.archived_student_id, self.student.pk)
+
+        history = self.client.get(f'/api/students/{self.student.pk}/history/').json()
+        self.assertTrue(history['archived'])
+        self.assertEqual([d['id'] for d in history['documents']], [document.id])
+
+    def test_invoices_are_copied_not_dropped(self):
+        term = Term.objects.create(name='2024 Term 3', start_date=date(2024, 9, 1), end_date=date(2024, 11, 30))
+        invoice = Invoice.objects.create(number='INV-1', student=self.student, term=term, total=Decimal('300.00'),
+                                         due_date=date(2024, 9, 30))
+        InvoiceLine.objects.create(invoice=invoice, description='Tuition', amount=Decimal('300.00'))
+        totals = self.archive()
+        self.assertEqual(totals['invoices'], 1)
+        self.assertFalse(Invoice.all_objects.exists())
+
+        archived = ArchivedInvoice.objects.get(pk=invoice.pk)
+        self.assertEqual((archived.number, archived.term_name, archived.total), ('INV-1', '2024 Term 3', 300))
+        self.assertEqual([line.description for line in archived.lines.all()], ['Tuition'])
+        history = self.client.get(f'/api/students/{self.student.pk}/history/').json()
+        self.assertEqual(history['invoices'][0]['lines'], [{'description': 'Tuition', 'amount': '300.00'}])
+
+    def test_results_and_attendance_are_copied_not_dropped(self):
+        term = Term.objects.create(name='2024 Term 3', start_date=date(2024, 9, 1), end_date=date(2024, 11, 30))
+        exam = Exam.objects.create(grade=self.grade, subject=Subject.objects.create(name='Maths', code='MATH'),
+                                   term=term, name='Final', date=date(2024, 11, 20), max_marks=50)
+        result = Result.objects.create(exam=exam, student=self.student, marks=Decimal('41.5'))
+        record = StudentAttendance.objects.create(student=self.student, term=term, present=b'\x07', recorded=b'\x0f',
+                                                  days_present=3, days_recorded=4)
+        totals = self.archive()
+        self.assertEqual((totals['results'], totals['attendance']), (1, 1))
+        self.assertFalse(Result.objects.exists())
+        self.assertFalse(StudentAttendance.objects.exists())
+
+        archived = ArchivedResult.objects.get(pk=result.pk)
+        self.assertEqual(
+            (archived.subject_name, archived.exam_name, archived.term_name), ('Maths', 'Final', '2024 Term 3'),
+        )
+        self.assertEqual((archived.marks, archived.max_marks), (Decimal('41.5'), 50))
+        kept = ArchivedAttendance.objects.get(pk=record.pk)
+        self.assertEqual((bytes(kept.present), kept.days_present, kept.days_recorded), (b'\x07', 3, 4))
+        history = self.client.get(f'/api/students/{self.student.pk}/history/').json()
+        self.assertEqual(history['results'][0]['subject'], 'Maths')
+        self.assertEqual(history['attendance'], [{'term': '2024 Term 3', 'days_present': 3, 'days_recorded': 4}])
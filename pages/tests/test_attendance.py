@@ -0,0 +1,63 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from pages import attendance, audit
+from pages.models import Grade, RollCall, Student, StudentAttendance, Term
+
+
+class AttendanceBitmapTests(TestCase):
+    def setUp(self):
+        self.addCleanup(audit.buffer.flush)
+        self.today = timezone.now().date()
+        self.start = self.today - timedelta(days=20)
+        self.term = Term.objects.create(name='Term 3', start_date=self.start, end_date=self.today + timedelta(days=40))
+        self.grade = Grade.objects.create(name='Grade 3', level=3)
+        self.amina = Student.objects.create(name='Amina', grade=self.grade)
+        self.baraka = Student.objects.create(name='Baraka', grade=self.grade)
+        Student.objects.create(name='Chiku', grade=self.grade, status='inactive')
+
+    def bitmaps(self, student):
+        row = StudentAttendance.objects.get(student=student, term=self.term)
+        return attendance.to_int(row.present), attendance.to_int(row.recorded), row.days_present, row.days_recorded
+
+    def test_each_day_is_one_bit_and_retaking_a_roll_overwrites_it(self):
+        attendance.mark_grade(self.grade, self.start, absent_ids=[self.baraka.id])
+        attendance.mark_grade(self.grade, self.start + timedelta(days=9))
+        self.assertEqual(self.bitmaps(self.amina), (1 | 1 << 9, 1 | 1 << 9, 2, 2))
+        self.assertEqual(self.bitmaps(self.baraka), (1 << 9, 1 | 1 << 9, 1, 2))
+        self.assertEqual(StudentAttendance.objects.count(), 2)  # inactive students are not marked
+
+        roll_call = attendance.mark_grade(self.grade, self.start, absent_ids=[self.amina.id])
+        self.assertEqual((roll_call.present, roll_call.absent), (1, 1))
+        self.assertEqual(self.bitmaps(self.amina), (1 << 9, 1 | 1 << 9, 1, 2))
+        self.assertEqual(self.bitmaps(self.baraka), (1 | 1 << 9, 1 | 1 << 9, 2, 2))
+        self.assertEqual(RollCall.objects.filter(grade=self.grade).count(), 2)
+
+    def test_days_outside_a_term_are_rejected(self):
+        with self.assertRaises(attendance.AttendanceError):
+            attendance.mark_grade(self.grade, self.start - timedelta(days=1))
+        with self.assertRaises(attendance.AttendanceError):
+            attendance.day_index(self.term, self.term.end_date + timedelta(days=1))
+
+    def test_window_mask_is_clipped_to_the_term(self):
+        def mask(first, last):
+            start = self.start
+            return attendance.window_mask(self.term, start + timedelta(days=first), start + timedelta(days=last))
+
+        self.assertEqual(mask(-5, 2), 0b111)
+        self.assertEqual(mask(3, 4), 0b11000)
+        self.assertEqual(mask(70, 80), 0)
+
+    def test_grade_summary_rates(self):
+        for days_ago in range(10):
+            absent = [self.baraka.id] if days_ago % 2 else []
+            attendance.mark_grade(self.grade, self.today - timedelta(days=days_ago), absent_ids=absent)
+        summary = attendance.grade_summary(self.grade, recent_days=4)
+        self.assertEqual(summary['rate'], 0.75)  # 15 of 20
+        self.assertEqual(summary['recent_rate'], 0.75)  # 6 of the last 8
+        rates = {s['name']: s['rate'] for s in summary['students']}
+        self.assertEqual(rates, {'Amina': 1.0, 'Baraka': 0.5})
+        self.assertEqual([s['name'] for s in summary['chronic_absentees']], ['Baraka'])
+        self.assertEqual(len(summary['days']), 10)
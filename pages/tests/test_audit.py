@@ -0,0 +1,29 @@
+from django.test import TestCase
+
+from pages import audit
+from pages.models import Grade
+
+
+class AuditApiTests(TestCase):
+    def setUp(self):
+        self.addCleanup(audit.buffer.flush)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.grade = Grade.objects.create(name='Grade 3', capacity=30)
+            for capacity in (31, 32):
+                self.grade.capacity = capacity
+                self.grade.save()
+        audit.buffer.flush()
+
+    def history(self, limit):
+        return self.client.get(f'/api/audit/Grade/{self.grade.pk}/', {'limit': limit})
+
+    def test_limit_is_clamped(self):
+        self.assertEqual(len(self.history('2').json()['history']), 2)
+        self.assertEqual(len(self.history('-5').json()['history']), 1)
+        self.assertEqual(len(self.history('0').json()['history']), 1)
+        self.assertEqual(len(self.history('100000').json()['history']), 3)
+
+    def test_bad_limit_is_a_400(self):
+        for response in (self.history('abc'), self.client.get('/api/audit/actor/1/', {'limit': '1.5'})):
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('limit must be a whole number', response.json()['error'])
@@ -0,0 +1,93 @@
+import json
+import threading
+from unittest import mock
+
+from django.test import TestCase, TransactionTestCase
+
+from pages import audit, batch
+from pages.models import Grade, Student
+
+
+class BatchApiTests(TestCase):
+    def setUp(self):
+        self.addCleanup(audit.buffer.flush)
+        grade = Grade.objects.create(name='Grade 4', capacity=40)
+        self.student = Student.objects.create(name='Amina', grade=grade, fees_due=1500, fees_paid=17)
+
+    def post(self, *requests):
+        return self.client.post(
+            '/api/batch/', json.dumps({'requests': list(requests)}), content_type='application/json',
+        )
+
+    def batch(self, *requests):
+        response = self.post(*requests)
+        self.assertEqual(response.status_code, 200)
+        return response.json()['responses']
+
+    def test_get_after_post_sees_the_write(self):
+        before, write, after = self.batch(
+            {'id': 'before', 'path': '/api/students/'},
+            {'id': 'write', 'method': 'POST', 'path': '/api/students/bulk/',
+             'params': {'action': 'add_fees', 'amount': '1000', 'ids': [self.student.id]}},
+            {'id': 'after', 'path': '/api/students/'},
+        )
+        self.assertEqual(write['status'], 200)
+        self.assertEqual(before['body']['students'][0]['balance'], '1483.00')
+        self.assertEqual(after['body']['students'][0]['balance'], '2483.00')
+
+    def test_identical_gets_run_once_until_a_write(self):
+        outstanding = {'path': '/api/students/', 'params': {'filter': 'outstanding'}}
+        with mock.patch.object(batch, '_call', wraps=batch._call) as call:
+            response = self.post(
+                dict(outstanding, id='a'), dict(outstanding, id='b'),
+                {'id': 'write', 'method': 'POST', 'path': '/api/students/bulk/',
+                 'params': {'action': 'add_fees', 'amount': '10', 'ids': [self.student.id]}},
+                dict(outstanding, id='c'),
+            ).json()
+        self.assertEqual(call.call_count, 3)  # a, the write, and c after it
+        self.assertEqual(response['deduplicated'], 1)
+        a, b, _, c = response['responses']
+        self.assertEqual((a['id'], b['id']), ('a', 'b'))
+        self.assertEqual(a['body'], b['body'])
+        self.assertEqual(a['body']['students'][0]['balance'], '1483.00')
+        self.assertEqual(c['body']['students'][0]['balance'], '1493.00')
+
+    def test_bad_batches_and_failing_sub_requests(self):
+        self.assertEqual(self.client.get('/api/batch/').status_code, 405)
+        for requests in ([], [{'path': '/students/'}], [{'path': '/api/batch/'}], [{'path': '/api/nowhere/'}],
+                         [{'path': '/api/students/', 'method': 'DELETE'}], [{'id': 1, 'path': '/api/students/'}] * 2,
+                         [{'path': '/api/students/'}] * (batch.MAX_REQUESTS + 1)):
+            self.assertEqual(self.post(*requests).status_code, 400, requests)
+        [missing] = self.batch({'path': '/api/students/999999/'})
+        self.assertEqual(missing['status'], 404)
+        [found] = self.batch({'path': f'/api/students/{self.student.id}/'})
+        self.assertEqual((found['status'], found['body']['name']), (200, 'Amina'))
+
+
+class ConcurrentBatchTests(TransactionTestCase):
+    # Pooled GETs use their own connections, which cannot see a TestCase's open transaction.
+
+    def setUp(self):
+        self.addCleanup(audit.buffer.flush)
+        self.grades = [Grade.objects.create(name=f'Grade {level}', level=level) for level in (1, 2, 3)]
+        self.students = [Student.objects.create(name=f'Student {g.level}', grade=g) for g in self.grades]
+
+    def test_gets_run_on_the_pool(self):
+        threads = []
+
+        def record(request, sub):
+            threads.append(threading.current_thread().name)
+            return call(request, sub)
+
+        call = batch._call
+        requests = [{'id': s.name, 'path': f'/api/students/{s.id}/'} for s in self.students]
+        requests.append({'id': 'list', 'path': '/api/students/'})
+        with mock.patch.object(batch, '_call', side_effect=record):
+            response = self.client.post(
+                '/api/batch/', json.dumps({'requests': requests}), content_type='application/json',
+            )
+        responses = response.json()['responses']
+        self.assertEqual([r['status'] for r in responses], [200] * 4)
+        self.assertEqual([r['body']['name'] for r in responses[:3]], [s.name for s in self.students])
+        self.assertEqual(len(responses[3]['body']['students']), 3)
+        self.assertTrue(all(name.startswith('batch') for name in threads), threads)
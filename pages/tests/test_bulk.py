@@ -0,0 +1,75 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from pages import audit, bulk
+from pages.models import Grade, School, Student
+
+
+class PromoteTests(TestCase):
+    def setUp(self):
+        self.addCleanup(audit.buffer.flush)
+        self.grade_11 = Grade.objects.create(name='Grade 11', level=11, capacity=6)
+        self.grade_12 = Grade.objects.create(name='Grade 12', level=12, capacity=6)
+        for i in range(5):
+            Student.objects.create(name=f'Senior {i}', grade=self.grade_12)
+            Student.objects.create(name=f'Junior {i}', grade=self.grade_11)
+
+    def test_graduates_do_not_hold_seats_the_next_year(self):
+        first = bulk.run('promote')
+        self.assertEqual((first['promoted'], first['graduated']), (5, 5))
+
+        for i in range(5):
+            Student.objects.create(name=f'Newcomer {i}', grade=self.grade_11)
+        second = bulk.run('promote')
+        self.assertEqual((second['promoted'], second['graduated']), (5, 5))
+        self.assertEqual(Student.objects.filter(grade=self.grade_12, status='active').count(), 5)
+
+
+class MultiSchoolPromoteTests(TestCase):
+    def setUp(self):
+        self.addCleanup(audit.buffer.flush)
+        self.north = School.objects.create(code='north', name='North Campus')
+        self.south = School.objects.create(code='south', name='South Campus')
+        self.grades = {}
+        for school in (self.north, self.south):
+            for level in (3, 4):
+                self.grades[school.code, level] = Grade.objects.create(
+                    school=school, name=f'Grade {level}', level=level, capacity=30,
+                )
+        self.amina = Student.objects.create(name='Amina', grade=self.grades['north', 3])
+
+    def test_students_move_up_within_their_own_school(self):
+        result = bulk.run('promote')
+        self.assertEqual(result['promoted'], 1)
+        self.amina.refresh_from_db()
+        self.assertEqual(self.amina.grade, self.grades['north', 4])
+        self.assertEqual(self.amina.school, self.north)
+
+    def test_command_runs_for_one_school(self):
+        Student.objects.create(name='Baraka', grade=self.grades['south', 3])
+        call_command('bulk_students', 'promote', '--school', 'south', stdout=StringIO())
+        self.amina.refresh_from_db()
+        self.assertEqual(self.amina.grade, self.grades['north', 3])
+        self.assertEqual(Student.objects.get(name='Baraka').grade, self.grades['south', 4])
+
+
+class AddFeesTests(TestCase):
+    def setUp(self):
+        self.addCleanup(audit.buffer.flush)
+        self.student = Student.objects.create(name='Amina', grade=Grade.objects.create(name='Grade 3', level=3))
+
+    def test_rejects_amounts_that_are_not_finite_or_do_not_fit(self):
+        for amount in ('NaN', 'sNaN', 'Infinity', '-Infinity', '1e30', '0.001', 'ten'):
+            with self.subTest(amount=amount), self.assertRaises(bulk.BulkActionError):
+                bulk.run('add_fees', ids=[self.student.id], amount=amount)
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.fees_due, Decimal('0'))
+
+    def test_amount_is_rounded_to_cents(self):
+        result = bulk.run('add_fees', ids=[self.student.id], amount='1500.456')
+        self.assertEqual(result['amount'], Decimal('1500.46'))
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.fees_due, Decimal('1500.46'))
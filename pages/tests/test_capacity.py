@@ -0,0 +1,102 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from pages import audit, bulk, capacity
+from pages.models import Grade, School, Student
+
+
+class EnrolledCountTests(TestCase):
+    def setUp(self):
+        self.addCleanup(audit.buffer.flush)
+        self.grade = Grade.objects.create(name='Grade 3', level=3, capacity=2)
+        self.first = capacity.admit(self.grade.id, name='Amina')
+        self.second = capacity.admit(self.grade.id, name='Baraka')
+
+    def enrolled(self):
+        self.grade.refresh_from_db()
+        return self.grade.enrolled_count
+
+    def test_leaving_releases_the_seat(self):
+        with self.assertRaises(capacity.CapacityError):
+            capacity.admit(self.grade.id, name='Chiku')
+        self.first.status = 'transferred'
+        self.first.save()
+        self.assertEqual(self.enrolled(), 1)
+        capacity.admit(self.grade.id, name='Chiku')
+        self.assertEqual(self.enrolled(), 2)
+
+    def test_bulk_status_change_and_recount_agree_with_the_planner(self):
+        bulk.run('set_status', ids=[self.second.id], new_status='inactive')
+        self.assertEqual(self.enrolled(), 1)
+        capacity.recount()
+        self.assertEqual(self.enrolled(), 1)
+        planned = {row['grade_id']: row for row in capacity.plan_rollover()['grades']}
+        self.assertEqual(planned[self.grade.id]['current'], 1)
+
+
+class SignalCountTests(TestCase):
+    """Saves and deletes that bypass admit()/transfer(), as the admin and shell do."""
+
+    def setUp(self):
+        self.addCleanup(audit.buffer.flush)
+        self.grade_3 = Grade.objects.create(name='Grade 3', level=3, capacity=5)
+        self.grade_4 = Grade.objects.create(name='Grade 4', level=4, capacity=5)
+
+    def enrolled(self):
+        return dict(Grade.objects.values_list('name', 'enrolled_count'))
+
+    def test_create_move_and_delete_keep_the_counter_in_step(self):
+        student = Student.objects.create(name='Amina', grade=self.grade_3)
+        Student.objects.create(name='Baraka', grade=self.grade_3, status='inactive')
+        self.assertEqual(self.enrolled(), {'Grade 3': 1, 'Grade 4': 0})
+
+        student.grade = self.grade_4
+        student.save()
+        self.assertEqual(self.enrolled(), {'Grade 3': 0, 'Grade 4': 1})
+
+        Student.objects.get(pk=student.pk).delete()
+        self.assertEqual(self.enrolled(), {'Grade 3': 0, 'Grade 4': 0})
+
+    def test_views_and_deferred_loads(self):
+        student = capacity.admit(self.grade_3.id, name='Amina')
+        capacity.transfer(student, self.grade_4.id)
+        self.assertEqual(self.enrolled(), {'Grade 3': 0, 'Grade 4': 1})
+
+        partial = Student.objects.only('id', 'name').get(pk=student.pk)
+        partial.name = 'Amina K.'
+        partial.save()
+        self.assertEqual(self.enrolled(), {'Grade 3': 0, 'Grade 4': 1})
+
+        self.client.post(f'/delete-student/{student.pk}/')
+        self.assertFalse(Student.objects.filter(pk=student.pk).exists())
+        self.assertEqual(self.enrolled(), {'Grade 3': 0, 'Grade 4': 0})
+
+
+class RolloverTests(TestCase):
+    def setUp(self):
+        self.addCleanup(audit.buffer.flush)
+        self.grades = {}
+        for code in ('north', 'south'):
+            school = School.objects.create(code=code, name=code.title())
+            for level in (3, 4):
+                self.grades[code, level] = Grade.objects.create(
+                    school=school, name=f'Grade {level}', level=level, capacity=30,
+                )
+        for i in range(3):
+            Student.objects.create(name=f'North {i}', grade=self.grades['north', 3])
+        Student.objects.create(name='South 0', grade=self.grades['south', 3])
+
+    def test_each_school_rolls_over_into_its_own_grades(self):
+        plan = {row['grade_id']: row for row in capacity.plan_rollover()['grades']}
+        self.assertEqual(plan[self.grades['north', 4].id]['projected'], 3)
+        self.assertEqual(plan[self.grades['south', 4].id]['projected'], 1)
+
+    def test_command_plans_one_school(self):
+        out = StringIO()
+        call_command('plan_capacity', '--school', 'south', stdout=out)
+        rows = [line.split() for line in out.getvalue().splitlines() if line.startswith('Grade ')][1:]
+        # After the header: grade name, capacity, current, incoming, projected, status per South grade.
+        self.assertEqual([row[:2] + row[5:6] for row in rows], [['Grade', '3', '0'], ['Grade', '4', '1']])
+        self.assertIn('Graduating: 0', out.getvalue())
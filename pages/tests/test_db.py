@@ -0,0 +1,61 @@
+import os
+import tempfile
+
+from django.db import DatabaseError, connection, transaction
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test import SimpleTestCase, override_settings
+
+from pages import db
+from pages.models import Student
+
+PRAGMAS = {'journal_mode': 'WAL', 'synchronous': 'NORMAL', 'busy_timeout': 5000, 'temp_store': 'MEMORY'}
+
+
+@override_settings(SQLITE_PRAGMAS=PRAGMAS)
+class SqlitePragmaTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'school.sqlite3')
+
+    def open(self, name):
+        wrapper = DatabaseWrapper(dict(connection.settings_dict, NAME=name, OPTIONS={}), alias='pragma-test')
+        self.addCleanup(wrapper.close)
+        return wrapper
+
+    def pragma(self, wrapper, name):
+        with wrapper.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_writer_gets_the_profile(self):
+        writer = self.open(self.path)
+        self.assertEqual(self.pragma(writer, 'journal_mode'), 'wal')
+        self.assertEqual(self.pragma(writer, 'synchronous'), 1)  # NORMAL
+        self.assertEqual(self.pragma(writer, 'busy_timeout'), 5000)
+        self.assertEqual(self.pragma(writer, 'temp_store'), 2)  # MEMORY
+        self.assertEqual(self.pragma(writer, 'query_only'), 0)
+
+    def test_readonly_alias_cannot_write(self):
+        writer = self.open(self.path)
+        with writer.cursor() as cursor:
+            cursor.execute('CREATE TABLE t (x INTEGER)')
+        reader = self.open(f'file:{self.path}?mode=ro')
+        self.assertTrue(db.is_readonly(reader))
+        self.assertEqual(self.pragma(reader, 'query_only'), 1)
+        self.assertEqual(self.pragma(reader, 'journal_mode'), 'wal')  # set by the writer, kept in the file
+        with self.assertRaises(DatabaseError), reader.cursor() as cursor:
+            cursor.execute('INSERT INTO t VALUES (1)')
+
+
+class ReadOnlyRouterTests(SimpleTestCase):
+    databases = {'default'}
+
+    def test_reads_go_to_the_readonly_alias_outside_transactions(self):
+        router = db.ReadOnlyRouter()
+        self.assertEqual(router.db_for_read(Student), db.READONLY_ALIAS)
+        with transaction.atomic():
+            # The caller must see its own uncommitted writes.
+            self.assertEqual(router.db_for_read(Student), 'default')
+        self.assertEqual(router.db_for_write(Student), 'default')
+        self.assertFalse(router.allow_migrate(db.READONLY_ALIAS, 'pages'))
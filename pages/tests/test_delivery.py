@@ -0,0 +1,87 @@
+import json
+import os
+import tempfile
+import time
+
+from django.test import TestCase
+
+from pages import audit, delivery
+from pages.models import Delivery, Notification, School
+
+MESSAGES = 5000  # per channel: 10,000 in all
+
+
+class DeliveryThroughputTests(TestCase):
+    """deliver() against a local SMTP server and the file SMS backend, without rate limits."""
+
+    def setUp(self):
+        self.addCleanup(audit.buffer.flush)
+        self.server = delivery.SmtpSink().start()
+        self.addCleanup(self.server.stop)
+        fd, self.path = tempfile.mkstemp(suffix='.jsonl')
+        os.close(fd)
+        self.addCleanup(os.remove, self.path)
+        self.transports = {
+            'email': delivery.EmailTransport(
+                backend='django.core.mail.backends.smtp.EmailBackend', host='127.0.0.1', port=self.server.port,
+                use_tls=False, use_ssl=False, username='', password='',
+            ),
+            'sms': delivery.SmsTransport('pages.delivery.FileSmsBackend', path=self.path),
+        }
+        self.notification = Notification.objects.create(title='Closing day', message='School closes at noon.')
+        self.addresses = {
+            'email': [f'parent{i}@example.com' for i in range(MESSAGES)],
+            'sms': [f'+2547{i:08d}' for i in range(MESSAGES)],
+        }
+        Delivery.all_objects.bulk_create([
+            Delivery(school_id=self.notification.school_id, notification=self.notification, channel=channel,
+                     address=address, name=f'Parent {i}')
+            for channel, addresses in self.addresses.items()
+            for i, address in enumerate(addresses)
+        ], batch_size=1000)
+
+    def test_ten_thousand_messages_go_out_well_under_a_minute(self):
+        started = time.perf_counter()
+        results = {
+            channel: delivery.deliver(channel, rate=0, transport=transport, notification_id=self.notification.pk)
+            for channel, transport in self.transports.items()
+        }
+        elapsed = time.perf_counter() - started
+
+        self.assertLess(elapsed, 20)
+        for channel, result in results.items():
+            self.assertEqual((result['sent'], result['failed']), (MESSAGES, 0), channel)
+        self.assertEqual(self.server.messages, MESSAGES)
+        self.assertEqual(sorted(self.server.recipients), sorted(self.addresses['email']))
+        with open(self.path, encoding='utf-8') as f:
+            texts = [json.loads(line) for line in f]
+        self.assertEqual(sorted(t['to'] for t in texts), sorted(self.addresses['sms']))
+        self.assertIn('School closes at noon.', texts[0]['body'])
+
+        for channel, addresses in self.addresses.items():
+            statuses = dict(
+                Delivery.all_objects.filter(channel=channel).values_list('address', 'status')
+            )
+            self.assertEqual(statuses, dict.fromkeys(addresses, 'sent'), channel)
+        self.assertFalse(Delivery.all_objects.filter(sent_at__isnull=True).exists())
+        self.assertEqual(set(Delivery.all_objects.values_list('attempts', flat=True)), {1})
+
+
+class RendererTests(TestCase):
+    def setUp(self):
+        self.addCleanup(audit.buffer.flush)
+        school = School.objects.create(code='stm', name="St Mary's")
+        self.notification = Notification.objects.create(
+            school=school, title='Fees & uniforms', message="Don't forget <Friday>",
+        )
+
+    def test_texts_are_not_html_escaped(self):
+        renderer = delivery.Renderer()
+        self.assertEqual(
+            renderer.sms(Delivery(notification=self.notification)),
+            "St Mary's: Fees & uniforms - Don't forget <Friday>",
+        )
+        subject, body = renderer.email(Delivery(notification=self.notification, name='A & B'))
+        self.assertEqual(subject, 'Fees & uniforms')
+        self.assertTrue(body.startswith("Dear A & B,\n\nDon't forget <Friday>\n"))
+        self.assertTrue(body.endswith("-- \nSt Mary's"))
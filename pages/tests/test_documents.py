@@ -0,0 +1,143 @@
+import importlib.util
+import io
+import tempfile
+from pathlib import Path
+from unittest import mock, skipIf, skipUnless
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+
+from pages import audit, documents
+from pages.models import Document, Grade, Student
+
+PDF = b'%PDF-1.7\n' + bytes(range(256)) * 600  # a little over two upload chunks
+PNG = b'\x89PNG\r\n\x1a\n' + b'\0' * 100
+
+
+def use_temporary_root(test):
+    root = tempfile.TemporaryDirectory()
+    test.addCleanup(root.cleanup)
+    patcher = mock.patch.object(documents, 'ROOT', Path(root.name))
+    patcher.start()
+    test.addCleanup(patcher.stop)
+
+
+class DocumentTests(TestCase):
+    def setUp(self):
+        self.addCleanup(audit.buffer.flush)
+        use_temporary_root(self)
+        grade = Grade.objects.create(name='Grade 2', level=2)
+        self.amina = Student.objects.create(name='Amina', grade=grade)
+        self.baraka = Student.objects.create(name='Baraka', grade=grade)
+
+    def upload(self, student, content, name='certificate.pdf', kind='birth_certificate'):
+        return self.client.post('/api/documents/', {
+            'student': student.id, 'kind': kind, 'file': SimpleUploadedFile(name, content, 'text/plain'),
+        })
+
+    def leftover_uploads(self):
+        return list((documents.ROOT / 'tmp').iterdir())
+
+    def test_upload_is_stored_once_by_content(self):
+        first = self.upload(self.amina, PDF).json()
+        second = self.upload(self.baraka, PDF, name='copy.pdf').json()
+        self.assertEqual((first['content_type'], first['size']), ('application/pdf', len(PDF)))  # sniffed, not claimed
+        self.assertEqual(first['sha256'], second['sha256'])
+        self.assertNotEqual(first['id'], second['id'])
+        self.assertEqual(documents.blob_path(first['sha256']).read_bytes(), PDF)
+        self.assertEqual(len(list((documents.ROOT / 'blobs').glob('*/*/*'))), 1)
+        self.assertEqual(self.leftover_uploads(), [])
+        listed = self.client.get('/api/documents/', {'student': self.baraka.id}).json()['documents']
+        self.assertEqual([d['name'] for d in listed], ['copy.pdf'])
+
+    def test_unknown_types_and_oversized_files_are_not_kept(self):
+        response = self.upload(self.amina, b'MZ\x90\x00 not a document')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Only PDF', response.json()['error'])
+        self.assertEqual(self.upload(self.amina, PDF, kind='passport').status_code, 400)
+        self.assertFalse(Document.objects.exists())
+        self.assertEqual(self.leftover_uploads(), [])
+
+        writer = documents.BlobWriter(max_bytes=1024)
+        with self.assertRaises(documents.DocumentError):
+            for chunk in (PDF[:1000], PDF[1000:2000]):
+                writer.write(chunk)
+        self.assertEqual(self.leftover_uploads(), [])
+
+    def test_prune_removes_unreferenced_blobs(self):
+        kept = documents.attach_file(self.amina, 'other', io.BytesIO(PDF), 'kept.pdf')
+        dropped = documents.attach_file(self.baraka, 'photo', io.BytesIO(PNG), 'photo.png')
+        dropped.delete()
+        self.assertEqual(documents.prune(grace_seconds=-60), 1)
+        self.assertTrue(documents.blob_path(kept.sha256).exists())
+        self.assertFalse(documents.blob_path(dropped.sha256).exists())
+
+
+class ServeDocumentTests(TestCase):
+    def setUp(self):
+        self.addCleanup(audit.buffer.flush)
+        use_temporary_root(self)
+        student = Student.objects.create(name='Amina', grade=Grade.objects.create(name='Grade 2', level=2))
+        self.document = documents.attach_file(student, 'birth_certificate', io.BytesIO(PDF), 'certificate.pdf')
+        self.url = f'/documents/{self.document.id}/'
+
+    def test_full_download(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), PDF)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(response['ETag'], f'"{self.document.sha256}"')
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+    def test_ranges(self):
+        size = len(PDF)
+        for header, start, end in (('bytes=0-99', 0, 99), ('bytes=100000-', 100000, size - 1),
+                                   ('bytes=-10', size - 10, size - 1), ('bytes=150000-999999', 150000, size - 1)):
+            response = self.client.get(self.url, HTTP_RANGE=header)
+            self.assertEqual(response.status_code, 206, header)
+            self.assertEqual(response['Content-Range'], f'bytes {start}-{end}/{size}')
+            self.assertEqual(b''.join(response.streaming_content), PDF[start:end + 1])
+
+        response = self.client.get(self.url, HTTP_RANGE=f'bytes={size}-')
+        self.assertEqual((response.status_code, response['Content-Range']), (416, f'bytes */{size}'))
+        # A stale If-Range or a multi-range request gets the whole file.
+        self.assertEqual(self.client.get(self.url, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"old"').status_code, 200)
+        self.assertEqual(self.client.get(self.url, HTTP_RANGE='bytes=0-9,20-29').status_code, 200)
+
+    def test_thumbnails_only_for_images(self):
+        response = self.client.get(f'/documents/{self.document.id}/thumbnail/')
+        self.assertEqual((response.status_code, response.json()['error']), (400, 'Only images have thumbnails'))
+
+    def test_cached_thumbnail_is_served(self):
+        photo = documents.attach_file(self.document.student, 'photo', io.BytesIO(PNG), 'photo.png')
+        size = documents.THUMBNAIL_SIZES[0]
+        path = documents.thumbnail_path(photo.sha256, size)
+        path.parent.mkdir(parents=True)
+        path.write_bytes(b'\xff\xd8\xff thumbnail')
+        response = self.client.get(f'/documents/{photo.id}/thumbnail/')
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        self.assertEqual(b''.join(response.streaming_content), b'\xff\xd8\xff thumbnail')
+        self.assertIn('photo-%d.jpg' % size, response['Content-Disposition'])
+        self.assertEqual(self.client.get(f'/documents/{photo.id}/thumbnail/', {'size': 7}).status_code, 400)
+
+    @skipIf(importlib.util.find_spec('PIL'), 'Pillow is installed')
+    def test_thumbnails_need_pillow(self):
+        photo = documents.attach_file(self.document.student, 'photo', io.BytesIO(PNG), 'photo.png')
+        response = self.client.get(f'/documents/{photo.id}/thumbnail/')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Pillow', response.json()['error'])
+
+    @skipUnless(importlib.util.find_spec('PIL'), 'Pillow is not installed')
+    def test_thumbnail_is_made_on_first_request(self):
+        from PIL import Image
+
+        image = io.BytesIO()
+        Image.new('RGB', (1200, 800), 'teal').save(image, 'PNG')
+        image.seek(0)
+        photo = documents.attach_file(self.document.student, 'photo', image, 'photo.png')
+        size = documents.THUMBNAIL_SIZES[0]
+        response = self.client.get(f'/documents/{photo.id}/thumbnail/', {'size': size})
+        self.assertEqual(response.status_code, 200)
+        with Image.open(io.BytesIO(b''.join(response.streaming_content))) as thumbnail:
+            self.assertEqual((thumbnail.format, max(thumbnail.size)), ('JPEG', size))
+        self.assertTrue(documents.thumbnail_path(photo.sha256, size).exists())
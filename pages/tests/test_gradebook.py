@@ -0,0 +1,81 @@
+from datetime import date
+
+from django.test import TestCase
+
+from pages import audit, gradebook
+from pages.models import Exam, Grade, Student, Subject, Term
+
+
+class GradebookRankingTests(TestCase):
+    def setUp(self):
+        self.addCleanup(audit.buffer.flush)
+        self.term = Term.objects.create(name='2026 Term 1', start_date=date(2026, 1, 12), end_date=date(2026, 4, 3))
+        self.grade = Grade.objects.create(name='Grade 5', level=5)
+        self.students = {
+            name: Student.objects.create(name=name, grade=self.grade) for name in ('Amina', 'Baraka', 'Chiku')
+        }
+        maths = Subject.objects.create(name='Mathematics', code='MATH')
+        english = Subject.objects.create(name='English', code='ENG')
+        self.maths = Exam.objects.create(grade=self.grade, subject=maths, term=self.term, name='Final')
+        self.english = Exam.objects.create(
+            grade=self.grade, subject=english, term=self.term, name='Final', max_marks=50,
+        )
+        self.enter(self.maths, Amina=95, Baraka=85, Chiku=85)
+        self.enter(self.english, Amina=45, Baraka=35, Chiku=40)  # 90%, 70%, 80%
+
+    def enter(self, exam, **marks):
+        return gradebook.enter_results(exam, {self.students[name].id: value for name, value in marks.items()})
+
+    def test_grade_ranking_by_gpa(self):
+        ranking = [
+            (row['student__name'], row['gpa'], row['average'], row['rank'], row['percentile'])
+            for row in gradebook.grade_ranking(self.grade, self.term)
+        ]
+        self.assertEqual(ranking, [
+            ('Amina', 4.0, 92.5, 1, 1.0),
+            ('Chiku', 3.0, 82.5, 2, 0.5),
+            ('Baraka', 2.5, 77.5, 3, 0.0),
+        ])
+
+    def test_exam_ties_share_a_rank(self):
+        rows = [(r.student.name, r.rank, r.percentage) for r in gradebook.exam_results(self.maths)]
+        self.assertEqual(rows, [('Amina', 1, 95.0), ('Baraka', 2, 85.0), ('Chiku', 2, 85.0)])
+        self.assertAlmostEqual(float(gradebook.exam_results(self.maths)[0].class_average), 88.333, places=3)
+
+    def test_subjects_are_ranked_separately(self):
+        names = {student.id: name for name, student in self.students.items()}
+        english = [
+            (names[row['student_id']], row['subject_rank'])
+            for row in gradebook.subject_standings(self.grade, self.term) if row['exam__subject__name'] == 'English'
+        ]
+        self.assertEqual(english, [('Amina', 1), ('Chiku', 2), ('Baraka', 3)])
+        highest = {
+            row['exam__subject__name']: row['highest'] for row in gradebook.subject_averages(self.grade, self.term)
+        }
+        self.assertEqual(highest, {'English': 90.0, 'Mathematics': 95.0})
+
+    def test_entering_results_again_updates_them(self):
+        self.assertEqual(self.enter(self.maths, Baraka=99), 1)
+        self.assertEqual(gradebook.grade_ranking(self.grade, self.term)[0]['student__name'], 'Amina')
+        first = next(r for r in gradebook.exam_results(self.maths) if r.rank == 1)
+        self.assertEqual(first.student.name, 'Baraka')
+
+    def test_invalid_results_are_rejected_together(self):
+        outsider = Student.objects.create(name='Dalila', grade=Grade.objects.create(name='Grade 6', level=6))
+        with self.assertRaises(gradebook.GradebookError) as raised:
+            gradebook.enter_results(self.english, {
+                self.students['Amina'].id: 60, self.students['Baraka'].id: 'abc', outsider.id: 10,
+                self.students['Chiku'].id: 20,
+            })
+        self.assertEqual(
+            set(raised.exception.args[0]), {self.students['Amina'].id, self.students['Baraka'].id, outsider.id},
+        )
+        self.assertEqual(self.english.results.get(student=self.students['Chiku']).marks, 40)
+
+    def test_report_cards_stream_in_batches(self):
+        chunks = list(gradebook.stream_report_cards(self.grade, self.term, batch_size=2))
+        self.assertEqual(len(chunks), 4)  # head, two batches, tail
+        html = ''.join(chunks)
+        self.assertNotIn(gradebook.CARDS_MARKER, html)
+        for name in self.students:
+            self.assertIn(name, html)
@@ -0,0 +1,45 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from pages import audit, guardians
+from pages.models import Grade, Guardian, Student
+
+
+class GuardianLinkTests(TestCase):
+    def setUp(self):
+        self.addCleanup(audit.buffer.flush)
+        self.grade = Grade.objects.create(name='Grade 2', capacity=30)
+        self.student = Student.objects.create(
+            name='Amina', grade=self.grade, parent_name='Zawadi', parent_phone='(555) 010-2000',
+        )
+
+    def test_linked_on_create(self):
+        self.assertEqual(self.student.guardian.phone_key, '5550102000')
+
+    def test_guardian_chosen_by_hand_survives_other_edits(self):
+        chosen = Guardian.objects.create(name='Uncle Juma', phone='555 010 9999')
+        self.student.guardian = chosen
+        self.student.save()
+        student = Student.objects.get(pk=self.student.pk)
+        student.fees_due = 900
+        student.save()
+        self.assertEqual(Student.objects.get(pk=self.student.pk).guardian_id, chosen.pk)
+
+    def test_relinked_when_the_phone_changes(self):
+        other = Guardian.objects.create(name='Baraka', phone='555-010-3000')
+        student = Student.objects.get(pk=self.student.pk)
+        student.parent_phone = '555.010.3000'
+        student.save()
+        self.assertEqual(Student.objects.get(pk=self.student.pk).guardian_id, other.pk)
+
+    def test_backfill_stamps_updated_at(self):
+        stale = timezone.now() - timedelta(days=3)
+        Student.objects.filter(pk=self.student.pk).update(guardian=None, updated_at=stale)
+        Guardian.objects.all().delete()
+
+        self.assertEqual(guardians.link_guardians(), (1, 1))
+        student = Student.objects.get(pk=self.student.pk)
+        self.assertIsNotNone(student.guardian_id)
+        self.assertGreater(student.updated_at, stale)
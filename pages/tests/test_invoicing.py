@@ -0,0 +1,67 @@
+from datetime import date
+from decimal import Decimal
+
+from django.test import TestCase
+
+from pages import audit, invoicing
+from pages.models import FeeSchedule, FeeScheduleItem, Grade, Invoice, InvoiceLine, Student, Term
+
+
+class InvoiceGenerationTests(TestCase):
+    def setUp(self):
+        self.addCleanup(audit.buffer.flush)
+        self.term = Term.objects.create(name='2026 Term 1', start_date=date(2026, 1, 12), end_date=date(2026, 4, 3))
+        self.grade = Grade.objects.create(name='Grade 3', level=3)
+        schedule = FeeSchedule.objects.create(grade=self.grade, term=self.term)
+        FeeScheduleItem.objects.create(schedule=schedule, description='Tuition', amount=Decimal('900.00'))
+        FeeScheduleItem.objects.create(schedule=schedule, description='Lab fee', amount=Decimal('100.00'))
+        self.amina = Student.objects.create(name='Amina', grade=self.grade, fees_due=Decimal('50.00'))
+        self.baraka = Student.objects.create(name='Baraka', grade=self.grade)
+        Student.objects.create(name='Chiku', grade=self.grade, status='inactive')
+
+    def fees_due(self):
+        return dict(Student.objects.values_list('name', 'fees_due'))
+
+    def generate(self, **data):
+        return self.client.post('/api/finance/invoices/generate/', {'term': self.term.id, **data})
+
+    def test_invoices_active_students_and_applies_the_totals(self):
+        response = self.generate(grade=self.grade.id)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.json()['invoiced'], response.json()['students_updated']), (2, 2))
+        self.assertEqual(
+            self.fees_due(),
+            {'Amina': Decimal('1050.00'), 'Baraka': Decimal('1000.00'), 'Chiku': Decimal('0.00')},
+        )
+        invoice = Invoice.objects.get(student=self.amina)
+        self.assertEqual(
+            (invoice.total, invoice.due_date, invoice.applied), (Decimal('1000.00'), self.term.start_date, True),
+        )
+        self.assertEqual(InvoiceLine.objects.filter(invoice__term=self.term).count(), 4)
+
+    def test_rerunning_only_invoices_new_students(self):
+        invoicing.generate(self.term)
+        Student.objects.create(name='Dalila', grade=self.grade)
+        result = invoicing.generate(self.term)
+        self.assertEqual((result['invoiced'], result['students_updated']), (1, 1))
+        self.assertEqual(Invoice.objects.filter(term=self.term).count(), 3)
+        self.assertEqual(self.fees_due()['Amina'], Decimal('1050.00'))
+        self.assertEqual(self.fees_due()['Dalila'], Decimal('1000.00'))
+
+    def test_void_invoices_are_not_applied_or_reissued(self):
+        Invoice.objects.create(
+            number=invoicing.invoice_number(self.term.id, self.baraka.id), student=self.baraka, term=self.term,
+            total=Decimal('1000.00'), status='void',
+        )
+        result = invoicing.generate(self.term)
+        self.assertEqual((result['invoiced'], result['students_updated']), (1, 1))
+        self.assertEqual(self.fees_due()['Baraka'], Decimal('0.00'))
+        self.assertFalse(Invoice.objects.get(student=self.baraka).applied)
+
+    def test_bad_ids_are_rejected(self):
+        for data in ({'grade': 'abc'}, {'term': 'x'}):
+            response = self.client.post('/api/finance/invoices/generate/', {'term': self.term.id, **data})
+            self.assertEqual(response.status_code, 400, data)
+        self.assertEqual(self.generate(grade=self.grade.id + 100).status_code, 400)  # no schedule for it
+        self.assertEqual(self.client.post('/api/finance/invoices/generate/', {'term': 999}).status_code, 404)
+        self.assertFalse(Invoice.objects.exists())
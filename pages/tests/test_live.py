@@ -0,0 +1,88 @@
+import asyncio
+import tracemalloc
+
+from asgiref.sync import sync_to_async
+from django.core.asgi import get_asgi_application
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections
+from django.test import TestCase
+
+from pages import audit
+from pages.live import broadcaster
+from pages.models import Notification
+
+CLIENTS = 300
+TIMEOUT = 30
+
+
+class DashboardStreamTests(TestCase):
+    """Hundreds of idle /api/dashboard/stream/ connections driven through the ASGI application."""
+
+    def setUp(self):
+        self.addCleanup(audit.buffer.flush)
+        # As the test client does: the handler must not close the connection holding the test transaction.
+        for signal in (request_started, request_finished):
+            signal.disconnect(close_old_connections)
+            self.addCleanup(signal.connect, close_old_connections)
+        self.application = get_asgi_application()
+        self.chunks = [[] for _ in range(CLIENTS)]
+        self.arrived = asyncio.Condition()
+        self.closing = asyncio.Event()
+
+    async def stream(self, i):
+        requested = False
+
+        async def receive():
+            nonlocal requested
+            if not requested:
+                requested = True
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+            await self.closing.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            if message['type'] == 'http.response.body' and message.get('body'):
+                self.chunks[i].append(message['body'])
+                async with self.arrived:
+                    self.arrived.notify_all()
+
+        await self.application({
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+            'method': 'GET', 'scheme': 'http', 'path': '/api/dashboard/stream/',
+            'raw_path': b'/api/dashboard/stream/', 'query_string': b'', 'root_path': '',
+            'headers': [(b'host', b'testserver')], 'client': ('127.0.0.1', 20000 + i), 'server': ('testserver', 80),
+        }, receive, send)
+
+    async def all_have(self, count):
+        async with self.arrived:
+            await asyncio.wait_for(
+                self.arrived.wait_for(lambda: all(len(c) >= count for c in self.chunks)), TIMEOUT,
+            )
+
+    def create_notification(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Notification.objects.create(title='Fees due', message='Term 2 fees are due on Friday.')
+
+    async def test_idle_streams_share_one_computation_and_close_cleanly(self):
+        tracemalloc.start()
+        try:
+            baseline = tracemalloc.get_traced_memory()[0]
+            tasks = [asyncio.create_task(self.stream(i)) for i in range(CLIENTS)]
+            await self.all_have(1)
+            await asyncio.sleep(0.2)
+            per_client = (tracemalloc.get_traced_memory()[0] - baseline) / CLIENTS
+        finally:
+            tracemalloc.stop()
+        try:
+            self.assertEqual(broadcaster.stats(), {'channels': 1, 'subscribers': CLIENTS, 'computations': 1})
+            self.assertLess(per_client, 64 * 1024)
+            self.assertTrue(all(c[0].startswith(b'retry: ') and b'"new_notifications": 0' in c[0] for c in self.chunks))
+
+            await sync_to_async(self.create_notification)()
+            await self.all_have(2)
+            self.assertEqual(broadcaster.stats()['computations'], 2)
+            self.assertTrue(all(c[1].endswith(b'data: {"new_notifications": 1}\n\n') for c in self.chunks))
+        finally:
+            self.closing.set()
+            await asyncio.wait_for(asyncio.gather(*tasks, return_exceptions=True), TIMEOUT)
+        self.assertEqual(broadcaster.stats(), {'channels': 0, 'subscribers': 0, 'computations': 0})
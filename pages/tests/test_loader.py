@@ -0,0 +1,63 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from pages import audit, loader
+from pages.models import Grade, Notification, Student
+
+
+class DataLoaderTests(TestCase):
+    def setUp(self):
+        self.addCleanup(audit.buffer.flush)
+        self.grade = Grade.objects.create(name='Grade 3', level=3)
+        Student.objects.create(name='Amina', grade=self.grade, fees_due=100)
+        Student.objects.create(name='Baraka', grade=self.grade)
+
+    def test_each_dataset_is_fetched_once_per_params(self):
+        data = loader.DataLoader()
+        with self.assertNumQueries(1):
+            first = data.get('students', query='a', balance='outstanding')
+            again = data.get('students', balance='outstanding', query='a')
+            self.assertEqual([s.name for s in first], ['Amina'])
+            self.assertEqual(first[0].grade.name, 'Grade 3')  # selected with the student
+        self.assertIs(first, again)
+        self.assertIsInstance(first, list)
+        with self.assertNumQueries(1):
+            self.assertEqual(len(data.get('students')), 2)
+        self.assertEqual((data.loads, data.hits), (2, 1))
+
+    def test_loader_for_reuses_the_request_loader(self):
+        request = type('Request', (), {})()
+        self.assertIs(loader.loader_for(request), loader.loader_for(request))
+
+
+class QueryCountMiddlewareTests(TestCase):
+    def setUp(self):
+        self.addCleanup(audit.buffer.flush)
+        self.grade = Grade.objects.create(name='Grade 3', level=3)
+
+    def test_header_reports_the_queries_run(self):
+        Student.objects.create(name='Amina', grade=self.grade)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/students/')
+        self.assertContains(response, 'Amina')
+        self.assertEqual(int(response['X-Query-Count']), len(queries))
+
+    def test_student_list_query_count_does_not_grow_with_rows(self):
+        Student.objects.create(name='Amina', grade=self.grade)
+        few = self.client.get('/api/students/')['X-Query-Count']
+        grades = [Grade.objects.create(name=f'Grade {level}', level=level) for level in range(4, 8)]
+        Student.objects.bulk_create([
+            Student(name=f'More {i}', grade=grades[i % len(grades)], student_id=f'M{i:04d}') for i in range(20)
+        ])
+        response = self.client.get('/api/students/')
+        self.assertContains(response, 'More 19')
+        self.assertEqual(response['X-Query-Count'], few)
+
+    def test_dashboard_loads_each_dataset_once(self):
+        Notification.objects.create(title='Fees', message='Term 3 fees are due')
+        response = self.client.get('/')
+        self.assertEqual(response.status_code, 200)
+        data = response.wsgi_request.loader
+        # notifications and events each back two context keys
+        self.assertEqual((data.loads, data.hits), (6, 0))
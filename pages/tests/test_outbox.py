@@ -0,0 +1,53 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from pages import audit, outbox
+from pages.models import OutboxCheckpoint, OutboxEvent
+
+
+class ListSink(outbox.NullSink):
+    def __init__(self):
+        self.ids = []
+
+    def send(self, events):
+        self.ids.extend(event['id'] for event in events)
+
+
+class RelayGapTests(TestCase):
+    def setUp(self):
+        self.addCleanup(audit.buffer.flush)
+        settled = timezone.now() - 2 * outbox.SETTLE
+        self.events = [
+            OutboxEvent.objects.create(topic='test', model_name='student', object_id=n, created_at=settled)
+            for n in range(4)
+        ]
+
+    def test_event_committed_late_is_sent_on_a_later_run(self):
+        first, late, third, fourth = self.events
+        late_id = late.id
+        late.delete()  # not committed yet when the relay first passes its id
+        sink = ListSink()
+
+        result = outbox.relay(sink, 'test')
+        self.assertEqual(sink.ids, [first.id, third.id, fourth.id])
+        self.assertEqual((result['position'], result['gaps']), (fourth.id, 1))
+
+        OutboxEvent.objects.create(
+            id=late_id, topic='test', model_name='student', object_id=1, created_at=timezone.now() - outbox.SETTLE,
+        )
+        result = outbox.relay(sink, 'test')
+        self.assertEqual(sink.ids, [first.id, third.id, fourth.id, late_id])
+        self.assertEqual((result['position'], result['gaps']), (fourth.id, 0))
+        self.assertEqual(OutboxCheckpoint.objects.get(consumer='test').gaps, {})
+
+    def test_gap_is_forgotten_after_the_timeout(self):
+        rolled_back = self.events[1].id
+        self.events[1].delete()
+        outbox.relay(ListSink(), 'test')
+        passed = (timezone.now() - outbox.GAP_TIMEOUT - timedelta(seconds=1)).timestamp()
+        OutboxCheckpoint.objects.filter(consumer='test').update(gaps={str(rolled_back): passed})
+
+        result = outbox.relay(ListSink(), 'test')
+        self.assertEqual((result['delivered'], result['gaps']), (0, 0))
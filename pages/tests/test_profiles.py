@@ -0,0 +1,34 @@
+from decimal import Decimal
+
+from django.test import TestCase
+
+from pages import audit
+from pages.models import FeePayment, Grade, Student
+
+
+class StudentProfileTests(TestCase):
+    def setUp(self):
+        self.addCleanup(audit.buffer.flush)
+        grade = Grade.objects.create(name='Grade 5', capacity=30)
+        self.student = Student.objects.create(name='Amina', grade=grade)
+
+    def test_bad_page_falls_back_to_the_first(self):
+        for page in ('abc', '-3', ''):
+            response = self.client.get(f'/api/students/{self.student.pk}/', {'page': page})
+            self.assertEqual(response.status_code, 200, page)
+            self.assertEqual(response.json()['payments']['page'], 1, page)
+
+    def test_page_past_the_end_shows_the_last_page(self):
+        FeePayment.objects.bulk_create([
+            FeePayment(student=self.student, amount=Decimal('100.00'), reference_number=f'R{i}') for i in range(25)
+        ])
+        for page in ('5', '9' * 30):
+            response = self.client.get(f'/api/students/{self.student.pk}/', {'page': page})
+            self.assertEqual(response.status_code, 200, page)
+            payments = response.json()['payments']
+            self.assertEqual((payments['page'], payments['num_pages'], payments['count']), (2, 2, 25), page)
+            self.assertEqual(len(payments['results']), 5, page)
+
+    def test_page_past_the_end_without_payments(self):
+        payments = self.client.get(f'/api/students/{self.student.pk}/', {'page': '3'}).json()['payments']
+        self.assertEqual((payments['page'], payments['num_pages'], payments['count']), (1, 1, 0))
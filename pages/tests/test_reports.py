@@ -0,0 +1,59 @@
+from datetime import date
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from pages import audit, gradebook, reports
+from pages.models import Exam, FeePayment, Grade, School, Student, Subject, Term
+
+
+class RenderGradeTests(TestCase):
+    def setUp(self):
+        self.addCleanup(audit.buffer.flush)
+        self.school = School.objects.create(code='north', name='North Campus')
+        self.term = Term.objects.create(
+            school=self.school, name='2026 Term 1', start_date=date(2026, 1, 12), end_date=date(2026, 4, 3),
+        )
+        self.grade = Grade.objects.create(school=self.school, name='Grade 5', level=5)
+        self.amina = Student.objects.create(school=self.school, name='Amina', grade=self.grade, fees_due=1500)
+        self.baraka = Student.objects.create(school=self.school, name='Baraka', grade=self.grade)
+        subject = Subject.objects.create(school=self.school, name='Mathematics', code='MATH')
+        exam = Exam.objects.create(grade=self.grade, subject=subject, term=self.term, name='Final')
+        gradebook.enter_results(exam, {self.amina.id: 91, self.baraka.id: 64})
+        FeePayment.objects.create(
+            school=self.school, student=self.amina, amount=400, reference_number='MPESA-0042',
+            payment_date=date(2026, 2, 2),
+        )
+
+    def test_every_document_of_a_grade(self):
+        documents = dict(reports.render_grade(self.grade.id, self.term.id))
+        amina, baraka = self.amina.student_id, self.baraka.student_id
+        self.assertEqual(sorted(documents), sorted([
+            f'north/grade-5/report-cards/{amina}.html', f'north/grade-5/report-cards/{baraka}.html',
+            f'north/grade-5/fee-statements/{amina}.html', f'north/grade-5/fee-statements/{baraka}.html',
+            'north/grade-5/summary.html',
+        ]))
+        for name, html in documents.items():
+            html = html.decode()
+            self.assertIn('</html>', html, name)
+            self.assertNotIn(reports.DOCUMENT_MARKER, html)
+        self.assertIn('Amina', documents[f'north/grade-5/report-cards/{amina}.html'].decode())
+        self.assertIn('MPESA-0042', documents[f'north/grade-5/fee-statements/{amina}.html'].decode())
+        self.assertIn('Mathematics', documents['north/grade-5/summary.html'].decode())
+
+        only_summaries = reports.render_grade(self.grade.id, self.term.id, kinds=['grade_summary'])
+        self.assertEqual([name for name, _ in only_summaries], ['north/grade-5/summary.html'])
+
+    def test_term_for_school(self):
+        self.assertEqual(reports.term_for_school(self.school.id), self.term)  # the latest when none is current
+        south = School.objects.create(code='south', name='South Campus')
+        with self.assertRaisesMessage(reports.ReportError, 'has no terms'):
+            reports.term_for_school(south.id)
+        with self.assertRaisesMessage(reports.ReportError, 'does not belong'):
+            reports.term_for_school(south.id, self.term.id)
+
+    def test_command_rejects_bad_options(self):
+        for args in (['--kinds', 'transcripts'], ['--workers', '0'], ['--grade', str(self.grade.id + 100)]):
+            with self.assertRaises(CommandError, msg=args):
+                call_command('generate_reports', *args, stdout=StringIO())
@@ -0,0 +1,33 @@
+from datetime import date
+
+from django.test import TestCase
+
+from pages import audit, capacity, roster
+from pages.models import Grade, Student
+
+
+class RosterSignalTests(TestCase):
+    def setUp(self):
+        self.grade = Grade.objects.create(name='Grade 1', capacity=40)
+        roster.reset()
+        self.data = roster.snapshot()
+        self.addCleanup(roster.reset)
+        self.addCleanup(audit.buffer.flush)  # while the test database is still there
+
+    def test_form_dates_as_strings_reach_the_roster(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            student = capacity.admit(self.grade.id, name='Amina', date_of_birth='2012-03-04',
+                                     fees_due=100, fees_paid=0)
+        position = self.data.position[student.id]
+        self.assertEqual(self.data.born[position], 20120304)
+
+        student.date_of_birth = '2013-05-06'
+        with self.captureOnCommitCallbacks(execute=True):
+            student.save()
+        self.assertEqual(self.data.born[self.data.position[student.id]], 20130506)
+
+    def test_delete_removes_row(self):
+        student = Student.objects.create(name='Baraka', grade=self.grade, date_of_birth=date(2012, 1, 1))
+        with self.captureOnCommitCallbacks(execute=True):
+            student.delete()
+        self.assertNotIn(student.id, self.data.position)
@@ -0,0 +1,96 @@
+import threading
+import time
+
+from django.test import TestCase, override_settings
+
+from pages import audit, bulk, singleflight
+from pages.models import Grade, Student
+
+LOCAL_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'singleflight-tests'}}
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class SingleFlightTests(TestCase):
+    def setUp(self):
+        self.addCleanup(audit.buffer.flush)
+        singleflight.reset_metrics()
+        self.addCleanup(singleflight.reset_metrics)
+
+    def counters(self, name):
+        return singleflight.metrics()['reports'][name]
+
+    def wait_until_idle(self):
+        deadline = time.monotonic() + 5
+        while singleflight.metrics()['in_flight']:
+            self.assertLess(time.monotonic(), deadline, 'background refresh did not finish')
+            time.sleep(0.01)
+
+    def test_concurrent_callers_share_one_computation(self):
+        calls, results = [], []
+        start = threading.Barrier(8)
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return {'total': 42}
+
+        def caller():
+            start.wait()
+            results.append(singleflight.get_or_compute('coalesce:all', compute))
+
+        threads = [threading.Thread(target=caller) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{'total': 42}] * 8)
+        counters = self.counters('coalesce')
+        self.assertEqual((counters['computed'], counters['coalesced']), (1, 7))
+
+    def test_stale_value_is_served_while_one_refresh_runs(self):
+        self.assertEqual(singleflight.get_or_compute('swr:all', lambda: 'first', ttl=0.05), 'first')
+        time.sleep(0.1)
+
+        release = threading.Event()
+
+        def slow_refresh():
+            release.wait(5)
+            return 'second'
+
+        self.assertEqual(singleflight.get_or_compute('swr:all', slow_refresh, ttl=60), 'first')
+        self.assertEqual(singleflight.get_or_compute('swr:all', slow_refresh, ttl=60), 'first')
+        self.assertEqual(singleflight.metrics()['in_flight'], ['swr:all'])
+        release.set()
+        self.wait_until_idle()
+
+        self.assertEqual(singleflight.get_or_compute('swr:all', lambda: 'third'), 'second')
+        counters = self.counters('swr')
+        self.assertEqual((counters['stale'], counters['refreshes'], counters['computed']), (2, 1, 2))
+
+    def cached(self, name, school_id=None):
+        """The cached value, or None if it was forgotten."""
+        return singleflight.get_or_compute(f'{name}:{school_id or "all"}', lambda: None)
+
+    def prime(self, school_id):
+        for name in ('finance', 'dashboard-stats', 'grades'):
+            for key in (f'{name}:all', f'{name}:{school_id}'):
+                singleflight.forget(key)
+                singleflight.get_or_compute(key, lambda: 'cached')
+
+    def test_student_writes_forget_the_reports_on_commit(self):
+        grade = Grade.objects.create(name='Grade 3', level=3)
+        self.prime(grade.school_id)
+        with self.captureOnCommitCallbacks(execute=True):
+            student = Student.objects.create(name='Amina', grade=grade)
+            self.assertEqual(self.cached('finance'), 'cached')  # not before the commit
+        for name in ('finance', 'dashboard-stats', 'grades'):
+            self.assertIsNone(self.cached(name), name)
+            self.assertIsNone(self.cached(name, grade.school_id), name)
+
+        self.prime(grade.school_id)
+        with self.captureOnCommitCallbacks(execute=True):
+            bulk.run('add_fees', ids=[student.id], amount='100')
+        self.assertIsNone(self.cached('finance', grade.school_id))
+        self.assertIsNone(self.cached('dashboard-stats'))
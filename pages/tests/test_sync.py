@@ -0,0 +1,81 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core import signing
+from django.test import TestCase
+from django.utils import timezone
+
+from pages import audit, sync
+from pages.models import Grade, Tombstone
+
+
+class DeltaSyncTests(TestCase):
+    def setUp(self):
+        self.addCleanup(audit.buffer.flush)
+        patcher = mock.patch.object(sync, 'SETTLE', timedelta(0))  # hand rows out as soon as they exist
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.grades = [Grade.objects.create(name=f'Grade {level}', level=level) for level in range(1, 6)]
+
+    def sync_all(self, token=None, limit=2):
+        """Follow ``next`` until has_more is false; (changed ids, deleted ids, pages, last token)."""
+        changed, deleted, pages = [], [], 0
+        while True:
+            page = sync.changes('grades', token, limit=limit)
+            changed += [row['id'] for row in page['changed']]
+            deleted += page['deleted']
+            token, pages = page['next'], pages + 1
+            if not page['has_more']:
+                return changed, deleted, pages, token
+
+    def test_paged_snapshot_then_only_changes(self):
+        changed, deleted, pages, token = self.sync_all()
+        self.assertEqual(sorted(changed), sorted(g.id for g in self.grades))
+        self.assertEqual((deleted, pages), ([], 3))
+
+        self.assertEqual(self.sync_all(token)[:3], ([], [], 1))
+        self.grades[2].capacity = 35
+        self.grades[2].save()
+        changed, _, _, token = self.sync_all(token)
+        self.assertEqual(changed, [self.grades[2].id])
+
+    def test_interrupted_sync_resumes_from_the_last_page(self):
+        first = sync.changes('grades', limit=2)
+        Grade.objects.create(name='Grade 6', level=6)
+        changed, _, _, _ = self.sync_all(first['next'])
+        self.assertEqual(len(first['changed']) + len(changed), 6)
+        self.assertFalse({row['id'] for row in first['changed']} & set(changed))
+
+    def test_deletions_come_from_tombstones(self):
+        self.grades[0].delete()  # before the first sync: not reported
+        _, deleted, _, token = self.sync_all()
+        self.assertEqual(deleted, [])
+
+        gone_id = self.grades[1].id
+        self.grades[1].delete()
+        changed, deleted, _, token = self.sync_all(token)
+        self.assertEqual((changed, deleted), ([], [gone_id]))
+        self.assertEqual(Tombstone.objects.filter(model_name='grades').count(), 2)
+        self.assertEqual(self.sync_all(token)[1], [])
+
+    def test_unsettled_rows_wait_for_the_next_sync(self):
+        _, _, _, token = self.sync_all()
+        with mock.patch.object(sync, 'SETTLE', timedelta(seconds=60)):
+            Grade.objects.create(name='Grade 6', level=6)
+            self.assertEqual(self.sync_all(token)[0], [])
+        self.assertEqual(len(self.sync_all(token)[0]), 1)
+
+    def test_bad_and_expired_tokens(self):
+        token = sync.changes('grades')['next']
+        response = self.client.get('/api/sync/grades/', {'since': token[:-2] + 'xx'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.get('/api/sync/staff/', {'since': token}).status_code, 400)
+        self.assertEqual(self.client.get('/api/sync/pupils/').status_code, 404)
+
+        stale = signing.loads(token, salt=sync.SALT)
+        stale['at'] = (timezone.now() - sync.TOMBSTONE_RETENTION - timedelta(days=1)).isoformat()
+        response = self.client.get('/api/sync/grades/', {'since': signing.dumps(stale, salt=sync.SALT)})
+        self.assertEqual(response.status_code, 410)
+
+        response = self.client.get('/api/sync/grades/', {'since': token})
+        self.assertEqual((response.status_code, response.json()['has_more']), (200, False))
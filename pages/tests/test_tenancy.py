@@ -0,0 +1,31 @@
+from django.test import TestCase
+
+from pages import audit
+from pages.models import Grade, School, Student
+
+
+class TenantMiddlewareTests(TestCase):
+    def setUp(self):
+        self.addCleanup(audit.buffer.flush)
+        self.north = School.objects.create(code='north', name='North Campus')
+        self.south = School.objects.create(code='south', name='South Campus')
+        for school, name in ((self.north, 'Amina'), (self.south, 'Baraka')):
+            grade = Grade.objects.create(school=school, name='Grade 1', capacity=30)
+            Student.objects.create(name=name, grade=grade)
+
+    def names(self, **headers):
+        response = self.client.get('/api/students/', **headers)
+        self.assertEqual(response.status_code, 200)
+        return [s['name'] for s in response.json()['students']]
+
+    def test_known_school_is_scoped(self):
+        self.assertEqual(self.names(HTTP_X_SCHOOL='north'), ['Amina'])
+        self.assertEqual(self.names(HTTP_X_SCHOOL=str(self.south.pk)), ['Baraka'])
+
+    def test_unknown_school_is_not_found_rather_than_unscoped(self):
+        for value in ('nowhere', str(self.south.pk + 100)):
+            response = self.client.get('/api/students/', HTTP_X_SCHOOL=value)
+            self.assertEqual(response.status_code, 404)
+            self.assertEqual(response.json(), {'error': f'Unknown school: {value}'})
+        response = self.client.get('/api/students/?school=nowhere')
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,111 @@
+from collections import Counter
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+
+from pages import audit, timetable
+from pages.models import Grade, Room, School, Staff, Subject, TeachingAssignment, TimetableSlot
+
+
+class SchedulerTests(SimpleTestCase):
+    def assignments(self, grades=6, subjects=5, teachers=4, periods=5):
+        # (id, teacher_id, grade_id, subject_id, periods_per_week); teachers shared across grades.
+        return [
+            (g * subjects + s + 1, (g * subjects + s) % teachers + 1, g + 1, s + 1, periods)
+            for g in range(grades) for s in range(subjects)
+        ]
+
+    def assert_no_clashes(self, placed):
+        for position, name in ((1, 'teacher'), (2, 'grade')):
+            booked = Counter((assignment[position], slot) for assignment, slot, _ in placed)
+            self.assertEqual(max(booked.values()), 1, name)
+        rooms = Counter((room_id, slot) for _, slot, room_id in placed if room_id is not None)
+        self.assertEqual(max(rooms.values(), default=1), 1, 'room')
+
+    def test_places_every_lesson_without_clashes(self):
+        assignments = self.assignments()
+        placed, unplaced = timetable.schedule(assignments, room_ids=range(1, 7), periods_per_day=8)
+        self.assertEqual((len(placed), unplaced), (6 * 5 * 5, {}))
+        self.assert_no_clashes(placed)
+        self.assertTrue(all(room_id is not None for _, _, room_id in placed))
+
+    def test_lessons_are_spread_over_the_week(self):
+        placed, _ = timetable.schedule([(1, 1, 1, 1, 5)], periods_per_day=8)
+        self.assertEqual(sorted(slot // 8 for _, slot, _ in placed), [0, 1, 2, 3, 4])
+
+    def test_reports_what_does_not_fit(self):
+        # One teacher with 60 lessons for a 40-period week.
+        overbooked = [(1, 1, 1, 1, 30), (2, 1, 2, 1, 30)]
+        placed, unplaced = timetable.schedule(overbooked, periods_per_day=8)
+        self.assertEqual(len(placed) + sum(unplaced.values()), 60)
+        self.assertEqual(len(placed), 40)
+        self.assert_no_clashes(placed)
+
+        # Three grades busy all week with two rooms.
+        parallel = [(g, g, g, 1, 40) for g in (1, 2, 3)]
+        placed, unplaced = timetable.schedule(parallel, room_ids=[1, 2], periods_per_day=8)
+        self.assertEqual((len(placed), sum(unplaced.values())), (80, 40))
+        self.assert_no_clashes(placed)
+
+    def test_parse_subjects(self):
+        self.assertEqual(
+            timetable.parse_subjects('mathematics, Physics; physics / Art and design'),
+            ['Mathematics', 'Physics', 'Art', 'Design'],
+        )
+
+
+class SchoolScopedTimetableTests(TestCase):
+    def setUp(self):
+        self.addCleanup(audit.buffer.flush)
+        self.schools, self.grades, self.teachers, self.rooms = {}, {}, {}, {}
+        for code in ('north', 'south'):
+            school = self.schools[code] = School.objects.create(code=code, name=code.title())
+            self.grades[code] = [
+                Grade.objects.create(school=school, name=f'Grade {level}', level=level) for level in (3, 4)
+            ]
+            self.rooms[code] = Room.objects.create(school=school, name='Room 1')
+            subject = Subject.objects.create(school=school, name='Mathematics', code='MATH')
+            # North has many idle maths teachers; South has one, so a pooled
+            # assignment would hand South's grades to North's teachers.
+            for i in range(3 if code == 'north' else 1):
+                teacher = Staff.objects.create(school=school, name=f'{code.title()} {i}', staff_id=f'{code}-{i}')
+                teacher.teaching_subjects.add(subject)
+                self.teachers.setdefault(code, []).append(teacher)
+
+    def test_auto_assign_keeps_teachers_in_their_school(self):
+        self.assertEqual(timetable.auto_assign(periods_per_week=5), 4)
+        for assignment in TeachingAssignment.objects.select_related('teacher', 'grade', 'subject'):
+            self.assertEqual(assignment.teacher.school_id, assignment.grade.school_id)
+            self.assertEqual(assignment.subject.school_id, assignment.grade.school_id)
+
+    def test_each_school_is_scheduled_with_its_own_rooms(self):
+        timetable.auto_assign(periods_per_week=5)
+        result = timetable.build_timetable()
+        self.assertEqual((result['lessons_placed'], result['lessons_unplaced']), (20, 0))
+        for slot in TimetableSlot.objects.select_related('grade', 'room'):
+            self.assertEqual(slot.room.school_id, slot.grade.school_id)
+
+    def test_command_builds_one_school(self):
+        call_command('build_timetable', '--assign', '--school', 'south', stdout=StringIO())
+        self.assertEqual(
+            set(TimetableSlot.objects.values_list('grade__school__code', flat=True)), {'south'},
+        )
+        self.assertEqual(TimetableSlot.objects.count(), 10)
+
+
+class LinkSubjectsTests(TestCase):
+    def setUp(self):
+        self.addCleanup(audit.buffer.flush)
+
+    def test_subjects_are_created_once_and_linked(self):
+        Subject.objects.create(name='Mathematics', code='MATH')
+        first = Staff.objects.create(name='Mr Otieno', staff_id='T1', subjects='mathematics, Physics')
+        second = Staff.objects.create(name='Ms Wanjiru', staff_id='T2', subjects='Physics and Chemistry')
+        self.assertEqual(timetable.link_subjects_from_text(), 4)
+        self.assertEqual(Subject.objects.filter(name='Physics').count(), 1)
+        self.assertEqual(sorted(first.teaching_subjects.values_list('name', flat=True)), ['Mathematics', 'Physics'])
+        self.assertEqual(sorted(second.teaching_subjects.values_list('name', flat=True)), ['Chemistry', 'Physics'])
+        timetable.link_subjects_from_text()  # again: nothing new
+        self.assertEqual(Subject.objects.count(), 3)
+        self.assertEqual(Staff.teaching_subjects.through.objects.count(), 4)
@@ -0,0 +1,35 @@
+from django.test import TestCase, override_settings
+
+from pages import audit, bulk, timetable, workload
+from pages.models import Grade, Staff, Student, Subject
+
+LOCAL_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'workload-tests'}}
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class BulkWriteInvalidationTests(TestCase):
+    """Writes that send no signals still drop the cached report."""
+
+    def setUp(self):
+        self.addCleanup(audit.buffer.flush)
+        self.grade = Grade.objects.create(name='Grade 3', level=3)
+        self.teacher = Staff.objects.create(name='Mr Otieno', staff_id='T1')
+        self.teacher.teaching_subjects.add(Subject.objects.create(name='Mathematics', code='MATH'))
+        self.students = [Student.objects.create(name=f'Student {i}', grade=self.grade) for i in range(3)]
+
+    def load(self):
+        return next(t for t in workload.report()['teachers'] if t['id'] == self.teacher.id)
+
+    def test_auto_assign_and_bulk_status_change(self):
+        self.assertEqual(self.load()['periods'], 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            timetable.auto_assign(periods_per_week=5)
+        self.assertEqual((self.load()['periods'], self.load()['students']), (5, 3))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            bulk.run('set_status', ids=[self.students[0].id], new_status='inactive')
+        self.assertEqual(self.load()['students'], 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            bulk.run('promote')  # the only grade is the top one: everyone graduates
+        self.assertEqual(self.load()['students'], 0)
@@ -0,0 +1,255 @@
+# timetable.py
+"""
+Teaching assignments and the weekly timetable scheduler.
+
+The week is DAYS x PERIODS_PER_DAY slots; slot n is bit n of a Python int.
+Every teacher, grade and room has one such bitset of busy slots, so "free
+for this lesson" is ``~(teacher | grade) & WEEK`` and a free room is the
+first room whose bitset lacks the slot. Lessons are placed greedily, most
+constrained assignment first (fewest free slots left per lesson still to
+place), preferring days the assignment has no lesson on yet. The result is
+written with one bulk insert; unique constraints on TimetableSlot guard
+against clashes at the database level too.
+"""
+import re
+import time
+
+from django.conf import settings
+from django.db import transaction
+
+from . import workload
+from .models import Grade, Room, Staff, Subject, TeachingAssignment, TimetableSlot
+
+DAYS = len(TimetableSlot.DAY_CHOICES)
+PERIODS_PER_DAY = getattr(settings, 'TIMETABLE_PERIODS_PER_DAY', 8)
+
+
+# ============= Subjects from Staff.subjects =============
+def parse_subjects(text):
+    """'Mathematics, algebra; Physics' -> ['Mathematics', 'Algebra', 'Physics']"""
+    names, seen = [], set()
+    for part in re.split(r'[,;/&]|\band\b', text or ''):
+        name = ' '.join(part.split())
+        if name and name.lower() not in seen:
+            seen.add(name.lower())
+            names.append(name[0].upper() + name[1:])
+    return names
+
+
+def _subject_code(name, taken):
+    base = re.sub(r'[^A-Z0-9]', '', name.upper())[:8] or 'SUBJECT'
+    code, n = base, 2
+    while code in taken:
+        code, n = f'{base[:6]}{n}', n + 1
+    taken.add(code)
+    return code
+
+
+def link_subjects_from_text():
+    """Create Subject rows for the names in Staff.subjects and link them as teaching_subjects.
+
+    Returns the number of links created. (Migration 0013 runs a frozen copy.)
+    """
+    staff = list(Staff._base_manager.exclude(subjects='').values_list('id', 'school_id', 'subjects'))
+    subject_ids, codes = {}, {}
+    for subject_id, school_id, name, code in Subject._base_manager.values_list('id', 'school_id', 'name', 'code'):
+        subject_ids[school_id, name.lower()] = subject_id
+        codes.setdefault(school_id, set()).add(code)
+
+    missing = {}
+    for _, school_id, text in staff:
+        for name in parse_subjects(text):
+            if (school_id, name.lower()) not in subject_ids:
+                missing.setdefault((school_id, name.lower()), name)
+    Subject._base_manager.bulk_create([
+        Subject(school_id=school_id, name=name, code=_subject_code(name, codes.setdefault(school_id, set())))
+        for (school_id, _), name in missing.items()
+    ])
+    if missing:
+        for subject_id, school_id, name in Subject._base_manager.values_list('id', 'school_id', 'name'):
+            subject_ids[school_id, name.lower()] = subject_id
+
+    through = Staff.teaching_subjects.through
+    links = [
+        through(staff_id=staff_id, subject_id=subject_ids[school_id, name.lower()])
+        for staff_id, school_id, text in staff
+        for name in parse_subjects(text)
+    ]
+    through._base_manager.bulk_create(links, batch_size=1000, ignore_conflicts=True)
+    return len(links)
+
+
+# ============= Assignments =============
+def auto_assign(periods_per_week=5, periods_per_day=PERIODS_PER_DAY):
+    """Give every grade a teacher of its school for each subject one can teach, balancing periods per teacher.
+
+    Periods per subject are reduced when all subjects would not fit into a
+    grade's week, and no teacher is given more periods than the week has.
+    Existing assignments are kept. Returns the number created.
+    """
+    load = {}
+    for teacher_id, periods in TeachingAssignment.objects.values_list('teacher_id', 'periods_per_week'):
+        load[teacher_id] = load.get(teacher_id, 0) + periods
+    teachers_by_subject = {}  # school id -> subject id -> teacher ids
+    for subject_id, teacher_id, school_id in Staff.teaching_subjects.through.objects.filter(
+        staff__role='Teacher', staff__status='active', staff__in=Staff.objects.all(),
+    ).values_list('subject_id', 'staff_id', 'staff__school_id'):
+        teachers_by_subject.setdefault(school_id, {}).setdefault(subject_id, []).append(teacher_id)
+        load.setdefault(teacher_id, 0)
+    assigned = set(TeachingAssignment.objects.values_list('grade_id', 'subject_id'))
+
+    week = DAYS * periods_per_day
+    periods = {
+        school_id: max(min(periods_per_week, week // len(subjects)), 1)
+        for school_id, subjects in teachers_by_subject.items()
+    }
+
+    new = []
+    for grade_id, school_id in Grade.objects.order_by('level', 'name').values_list('id', 'school_id'):
+        for subject_id, teacher_ids in sorted(teachers_by_subject.get(school_id, {}).items()):
+            if (grade_id, subject_id) in assigned:
+                continue
+            teacher_id = min(teacher_ids, key=lambda t: (load[t], t))
+            if load[teacher_id] + periods[school_id] > week:
+                continue
+            load[teacher_id] += periods[school_id]
+            new.append(TeachingAssignment(
+                teacher_id=teacher_id, grade_id=grade_id, subject_id=subject_id, periods_per_week=periods[school_id],
+            ))
+    TeachingAssignment.objects.bulk_create(new, batch_size=1000)
+    transaction.on_commit(workload.invalidate)  # bulk_create sends no post_save
+    return len(new)
+
+
+# ============= Scheduler =============
+def _lowest_slot(bits):
+    return (bits & -bits).bit_length() - 1
+
+
+def _first_with_room(candidates, busy_room):
+    """Earliest candidate slot with a free room (any slot if rooms are not used)."""
+    while candidates:
+        slot = _lowest_slot(candidates)
+        if not busy_room:
+            return slot, None
+        room_id = next((r for r, bits in busy_room.items() if not bits >> slot & 1), None)
+        if room_id is not None:
+            return slot, room_id
+        candidates &= ~(1 << slot)
+    return None, None
+
+
+def schedule(assignments, room_ids=(), periods_per_day=PERIODS_PER_DAY):
+    """Place the lessons of ``assignments`` into the week.
+
+    ``assignments`` is a list of (id, teacher_id, grade_id, subject_id,
+    periods_per_week) tuples. Returns ``(placed, unplaced)`` where placed is a
+    list of (assignment, slot, room_id) and unplaced maps assignment ids to the
+    number of lessons that did not fit.
+    """
+    week = (1 << (DAYS * periods_per_day)) - 1
+    day_masks = [((1 << periods_per_day) - 1) << (d * periods_per_day) for d in range(DAYS)]
+    busy_teacher, busy_grade = {}, {}
+    busy_room = {room_id: 0 for room_id in room_ids}
+    days_used = {a[0]: 0 for a in assignments}
+    remaining = {a[0]: a[4] for a in assignments}
+    by_id = {a[0]: a for a in assignments}
+
+    def free_slots(assignment_id):
+        _, teacher_id, grade_id, _, _ = by_id[assignment_id]
+        return ~(busy_teacher.get(teacher_id, 0) | busy_grade.get(grade_id, 0)) & week
+
+    def pressure(assignment_id):
+        # Most constrained first: fewest free slots for each lesson still to place.
+        return free_slots(assignment_id).bit_count() - remaining[assignment_id], assignment_id
+
+    placed, unplaced = [], {}
+    while remaining:
+        assignment_id = min(remaining, key=pressure)
+        assignment = by_id[assignment_id]
+        _, teacher_id, grade_id, _, _ = assignment
+        free = free_slots(assignment_id)
+
+        slot = room_id = None
+        if free:
+            # Spread lessons over the week: prefer days without this assignment yet.
+            fresh_days = 0
+            for d, mask in enumerate(day_masks):
+                if not days_used[assignment_id] & (1 << d):
+                    fresh_days |= mask
+            for candidates in (free & fresh_days, free):
+                slot, room_id = _first_with_room(candidates, busy_room)
+                if slot is not None:
+                    break
+
+        if slot is None:
+            unplaced[assignment_id] = remaining.pop(assignment_id)
+            continue
+        bit = 1 << slot
+        busy_teacher[teacher_id] = busy_teacher.get(teacher_id, 0) | bit
+        busy_grade[grade_id] = busy_grade.get(grade_id, 0) | bit
+        if room_id is not None:
+            busy_room[room_id] |= bit
+        days_used[assignment_id] |= 1 << (slot // periods_per_day)
+        placed.append((assignment, slot, room_id))
+        remaining[assignment_id] -= 1
+        if not remaining[assignment_id]:
+            del remaining[assignment_id]
+    return placed, unplaced
+
+
+def build_timetable(periods_per_day=PERIODS_PER_DAY, use_rooms=True, dry_run=False):
+    """Rebuild the weekly timetable for every teaching assignment (of the active school).
+
+    Each school is scheduled on its own, with its own rooms.
+    """
+    started = time.perf_counter()
+    by_school = {}
+    for school_id, *assignment in (
+        TeachingAssignment.objects.filter(grade__in=Grade.objects.all())
+        .values_list('grade__school_id', 'id', 'teacher_id', 'grade_id', 'subject_id', 'periods_per_week')
+    ):
+        by_school.setdefault(school_id, []).append(tuple(assignment))
+    rooms = {}
+    if use_rooms:
+        rows = Room.objects.filter(school_id__in=by_school).order_by('name').values_list('school_id', 'id')
+        for school_id, room_id in rows:
+            rooms.setdefault(school_id, []).append(room_id)
+    assignments, placed, unplaced = [], [], {}
+    for school_id, school_assignments in by_school.items():
+        school_placed, school_unplaced = schedule(school_assignments, rooms.get(school_id, []), periods_per_day)
+        assignments += school_assignments
+        placed += school_placed
+        unplaced.update(school_unplaced)
+    elapsed = time.perf_counter() - started
+
+    if not dry_run:
+        with transaction.atomic():
+            TimetableSlot.objects.filter(assignment_id__in=[a[0] for a in assignments]).delete()
+            TimetableSlot.objects.bulk_create([
+                TimetableSlot(
+                    assignment_id=assignment_id, teacher_id=teacher_id, grade_id=grade_id,
+                    subject_id=subject_id, room_id=room_id,
+                    day=slot // periods_per_day, period=slot % periods_per_day,
+                )
+                for (assignment_id, teacher_id, grade_id, subject_id, _), slot, room_id in placed
+            ], batch_size=1000)
+    return {
+        'assignments': len(assignments),
+        'lessons_placed': len(placed),
+        'lessons_unplaced': sum(unplaced.values()),
+        'unplaced': unplaced,
+        'seconds': round(elapsed, 3),
+    }
+
+
+def grade_timetable(grade):
+    """Week grid for a grade: one list of periods per day."""
+    grid = [[None] * PERIODS_PER_DAY for _ in range(DAYS)]
+    slots = TimetableSlot.objects.filter(grade=grade).values_list(
+        'day', 'period', 'subject__name', 'teacher__name', 'room__name',
+    )
+    for day, period, subject, teacher, room in slots:
+        if period < PERIODS_PER_DAY:
+            grid[day][period] = {'subject': subject, 'teacher': teacher, 'room': room}
+    return [{'day': label, 'periods': grid[day]} for day, label in TimetableSlot.DAY_CHOICES]
@@ -11,6 +11,7 @@ urlpatterns = [
     path('delete-student/<int:student_id>/', views.delete_student, name='delete_student'),
     path('search-students/', views.search_students, name='search_students'),
     path('filter-students/<str:filter_type>/', views.filter_students, name='filter_students'),
+    path('students/<int:student_id>/', views.student_profile, name='student_profile'),
     
     # Staff URLs
     path('staff/', views.staff_view, name='staff'),
@@ -26,10 +27,13 @@ urlpatterns = [
     path('edit-grade/<int:grade_id>/', views.edit_grade, name='edit_grade'),
     path('delete-grade/<int:grade_id>/', views.delete_grade, name='delete_grade'),
     path('grade-details/<int:grade_id>/', views.grade_details, name='grade_details'),
+    path('grades/<int:grade_id>/report-cards/', views.report_cards, name='report_cards'),
     
     # Finance URLs
     path('finance/', views.finance_view, name='finance'),
     path('update-fees/<int:student_id>/', views.update_fees, name='update_fees'),
+    path('finance/aging/', views.aging_report, name='aging_report'),
+    path('finance/aging.csv', views.aging_report_csv, name='aging_report_csv'),
     
     # Event URLs
     path('events/', views.events_view, name='events'),
@@ -46,7 +50,31 @@ urlpatterns = [
     path('delete-notification/<int:notification_id>/', views.delete_notification, name='delete_notification'),
     
     # API URLs
+    path('api/batch/', views.batch_api, name='batch_api'),
     path('api/dashboard-stats/', views.dashboard_stats_api, name='dashboard_stats_api'),
+    path('api/dashboard/stream/', views.dashboard_stream, name='dashboard_stream'),
+    path('api/analytics/roster/', views.roster_analytics_api, name='roster_analytics_api'),
+    path('api/metrics/singleflight/', views.singleflight_metrics_api, name='singleflight_metrics_api'),
     path('api/students/', views.students_filter_api, name='students_filter_api'),
     path('api/staff/', views.staff_filter_api, name='staff_filter_api'),
+    path('api/staff/workload/', views.staff_workload_api, name='staff_workload_api'),
+    path('api/grades/capacity-plan/', views.capacity_plan_api, name='capacity_plan_api'),
+    path('api/grades/<int:grade_id>/gradebook/', views.gradebook_api, name='gradebook_api'),
+    path('api/grades/<int:grade_id>/timetable/', views.grade_timetable_api, name='grade_timetable_api'),
+    path('api/exams/<int:exam_id>/results/', views.exam_results_api, name='exam_results_api'),
+    path('api/grades/<int:grade_id>/attendance/', views.grade_attendance_api, name='grade_attendance_api'),
+    path('api/sync/<str:model_name>/', views.sync_api, name='sync_api'),
+    path('api/schools/summary/', views.schools_summary_api, name='schools_summary_api'),
+    path('api/guardians/family/', views.guardian_family_api, name='guardian_family_api'),
+    path('api/students/<int:student_id>/', views.student_profile_api, name='student_profile_api'),
+    path('api/finance/aging/', views.aging_report_api, name='aging_report_api'),
+    path('api/finance/invoices/generate/', views.generate_invoices_api, name='generate_invoices_api'),
+    path('api/students/bulk/', views.bulk_students_api, name='bulk_students_api'),
+    path('api/students/<int:student_id>/history/', views.student_history_api, name='student_history_api'),
+    path('api/audit/actor/<int:user_id>/', views.audit_actor_api, name='audit_actor_api'),
+    path('api/audit/<str:model_name>/<str:object_id>/', views.audit_object_api, name='audit_object_api'),
+    path('api/documents/', views.documents_api, name='documents_api'),
+    path('api/documents/<int:document_id>/delete/', views.delete_document_api, name='delete_document_api'),
+    path('documents/<int:document_id>/', views.document_download, name='document_download'),
+    path('documents/<int:document_id>/thumbnail/', views.document_thumbnail, name='document_thumbnail'),
 ]
@@ -1,54 +1,58 @@
 # views.py
+import csv
+import json
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect, get_object_or_404
-from django.http import JsonResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.contrib import messages
-from django.db.models import Q, Sum
+from django.db import transaction
+from django.db.models import Count, F, Sum
 from django.core.paginator import Paginator
-from .models import Student, Staff, Grade, Notification, Event, Activity
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from .models import Student, Staff, Grade, Notification, Event, Activity, Term, Exam, Document
+from .loader import loader_for
+from . import (
+    aging, archive, attendance, audit, batch, bulk, capacity, delivery, documents, gradebook, guardians, invoicing,
+    live, profiles, roster, singleflight, sync, tenancy, timetable, workload,
+)
 from datetime import datetime, date
 
 def dashboard(request):
-    # Calculate statistics
-    total_students = Student.objects.count()
-    total_staff = Staff.objects.count()
-    total_grades = Grade.objects.count()
-    
-    # Calculate fees
-    students_with_balance = Student.objects.all()
-    outstanding_fees = sum(s.balance() for s in students_with_balance if s.balance() > 0)
-    total_fees_due = sum(s.fees_due for s in students_with_balance)
-    total_fees_paid = sum(s.fees_paid for s in students_with_balance)
-
-    # Recent notifications and events
-    recent_notifications = Notification.objects.order_by('-date')[:5]
-    upcoming_events = Event.objects.all()[:5]  # You might want to add date filtering
-
-    # Collection percentage
-    collection_percentage = (total_fees_paid / total_fees_due * 100) if total_fees_due > 0 else 0
-    
-    
+    # Shared, cached report computations (see singleflight.py)
+    stats = singleflight.get_or_compute(singleflight.school_key('dashboard-stats'), live.dashboard_stats)
+    finance = singleflight.get_or_compute(singleflight.school_key('finance'), _finance_summary)
+
+    # Recent notifications and events, each loaded once and shared by the context keys below
+    data = loader_for(request)
+    recent_notifications = data.get('notifications', limit=5)
+    upcoming_events = data.get('events', limit=5)  # You might want to add date filtering
+
     # Get all grades for the form dropdown
-    grades = Grade.objects.all()
+    grades = data.get('grades')
     
     context = {
-        'total_students': total_students,
-        'total_staff': total_staff,
-        'total_grades': total_grades,
-        'outstanding_fees': outstanding_fees,
-        'total_fees_due': total_fees_due,
-        'total_fees_paid': total_fees_paid,
+        'total_students': stats['total_students'],
+        'total_staff': stats['total_staff'],
+        'total_grades': stats['total_grades'],
+        'outstanding_fees': finance['outstanding_fees'],
+        'total_fees_due': finance['total_fees_due'],
+        'total_fees_paid': finance['total_fees_paid'],
         'recent_notifications': recent_notifications,
         'upcoming_events': upcoming_events,
-        'new_notifications': recent_notifications.count(),
-        'collection_percentage': collection_percentage,
+        'new_notifications': stats['new_notifications'],
+        'collection_percentage': finance['collection_rate'],
+        'attendance_today': stats['attendance_today'],
+        'attendance_term': stats['attendance_term'],
         
         # Add these for the forms and tables
-        'students': Student.objects.select_related('grade').all()[:10],  # Show first 10
-        'staff': Staff.objects.all()[:10],  # Show first 10
+        'students': data.get('students', limit=10),  # Show first 10
+        'staff': data.get('staff', limit=10),  # Show first 10
         'grades': grades,
         'grade_stats': [],  # You already have this logic
-        'events': Event.objects.all()[:5],
-        'activities': Activity.objects.all()[:5],
+        'events': upcoming_events,
+        'activities': data.get('activities', limit=5),
         'notifications': recent_notifications,
         
         # URL names for the template
@@ -82,8 +86,9 @@ def dashboard(request):
 
 # ============= STUDENT VIEWS =============
 def students_view(request):
-    students = Student.objects.select_related('grade').all()
-    grades = Grade.objects.all()
+    data = loader_for(request)
+    students = data.get('students')
+    grades = data.get('grades')
     
     context = {
         'students': students,
@@ -96,9 +101,9 @@ def add_student(request):
         try:
             # Ensure grade exists before creating student
             grade = get_object_or_404(Grade, id=request.POST['grade'])
-            student = Student.objects.create(
+            student = capacity.admit(
+                grade.id,
                 name=request.POST['name'],
-                grade=grade,
                 date_of_birth=request.POST.get('date_of_birth') or None,
                 fees_due=float(request.POST.get('fees_due', 0)),
                 fees_paid=float(request.POST.get('fees_paid', 0))
@@ -116,55 +121,62 @@ def edit_student(request, student_id):
     
     if request.method == 'POST':
         try:
+            grade = get_object_or_404(Grade, id=request.POST['grade'])
             student.name = request.POST['name']
-            student.grade = get_object_or_404(Grade, id=request.POST['grade'])
             student.date_of_birth = request.POST.get('date_of_birth') or None
             student.fees_due = float(request.POST.get('fees_due', 0))
             student.fees_paid = float(request.POST.get('fees_paid', 0))
-            student.save()
+            if grade.id != student.grade_id:
+                capacity.transfer(student, grade.id)  # saves the student
+            else:
+                student.save()
             messages.success(request, 'Student updated successfully!')
             return redirect('students')
         except Exception as e:
             messages.error(request, f'Error updating student: {str(e)}')
     
-    grades = Grade.objects.all()
+    grades = loader_for(request).get('grades')
     context = {'student': student, 'grades': grades}
     return render(request, 'edit_student.html', context)
 
 def delete_student(request, student_id):
     student = get_object_or_404(Student, id=student_id)
     if request.method == 'POST':
-        student.delete()
+        student.delete()  # the seat is released by the capacity signals
         messages.success(request, 'Student deleted successfully!')
     return redirect('students')
 
 def search_students(request):
     query = request.GET.get('q', '')
-    students = Student.objects.select_related('grade')
-    
-    if query:
-        students = students.filter(
-            Q(name__icontains=query) |
-            Q(grade__name__icontains=query)
-        )
-    
+    students = loader_for(request).get('students', query=query)
     return render(request, 'students.html', {'students': students, 'search_query': query})
 
 def filter_students(request, filter_type):
-    students = Student.objects.select_related('grade')
-    
-    if filter_type == 'outstanding':
-        students = [s for s in students if s.balance() > 0]
-    elif filter_type == 'paid':
-        students = [s for s in students if s.balance() <= 0]
+    data = loader_for(request)
+    if filter_type in ('outstanding', 'paid'):
+        students = data.get('students', balance=filter_type)
     elif filter_type == 'recent':
-        students = students.order_by('-enrolled_on')[:10]
+        students = data.get('students', order='-enrolled_on', limit=10)
+    else:
+        students = data.get('students')
     
     return render(request, 'students.html', {'students': students, 'filter_type': filter_type})
 
+def student_profile(request, student_id):
+    """Student profile with payments, activities and upcoming events"""
+    profile = profiles.load_profile(student_id, page=request.GET.get('page', 1))
+    return render(request, 'student_profile.html', profile)
+
+def student_profile_api(request, student_id):
+    """API endpoint for a student's profile; payments are paginated with ?page="""
+    profile = profiles.load_profile(student_id, page=request.GET.get('page', 1))
+    return JsonResponse(profiles.serialize_profile(profile))
+
 # ============= STAFF VIEWS =============
+STAFF_FILTERS = {'teachers': 'Teacher', 'admin': 'Admin', 'support': 'Support'}
+
 def staff_view(request):
-    staff = Staff.objects.all()
+    staff = loader_for(request).get('staff')
     return render(request, 'staff.html', {'staff': staff})
 
 def add_staff(request):
@@ -209,47 +221,33 @@ def delete_staff(request, staff_id):
 
 def search_staff(request):
     query = request.GET.get('q', '')
-    staff = Staff.objects.all()
-    
-    if query:
-        staff = staff.filter(
-            Q(name__icontains=query) |
-            Q(role__icontains=query)
-        )
-    
+    staff = loader_for(request).get('staff', query=query)
     return render(request, 'staff.html', {'staff': staff, 'search_query': query})
 
 def filter_staff(request, filter_type):
-    staff = Staff.objects.all()
-    
-    if filter_type == 'teachers':
-        staff = staff.filter(role='Teacher')
-    elif filter_type == 'admin':
-        staff = staff.filter(role='Admin')
-    elif filter_type == 'support':
-        staff = staff.filter(role='Support')
-    
+    staff = loader_for(request).get('staff', role=STAFF_FILTERS.get(filter_type))
     return render(request, 'staff.html', {'staff': staff, 'filter_type': filter_type})
 
 # ============= GRADE VIEWS =============
+def _grade_stats():
+    teacher_counts = workload.grade_teacher_counts()
+    return [{
+        'grade': grade,
+        'student_count': grade.student_count,
+        'teacher_count': teacher_counts.get(grade.id, 0),
+    } for grade in Grade.objects.annotate(student_count=Count('student'))]
+
 def grades_view(request):
-    grades = Grade.objects.all()
-    grade_stats = []
-    
-    for grade in grades:
-        student_count = grade.student_set.count()
-        grade_stats.append({
-            'grade': grade,
-            'student_count': student_count,
-            'teacher_count': Staff.objects.filter(role='Teacher').count()  # You might want to add a grade-teacher relationship
-        })
-    
+    grade_stats = singleflight.get_or_compute(singleflight.school_key('grades'), _grade_stats)
     return render(request, 'grades.html', {'grade_stats': grade_stats})
 
 def add_grade(request):
     if request.method == 'POST':
         try:
-            Grade.objects.create(name=request.POST['name'])
+            Grade.objects.create(
+                name=request.POST['name'],
+                level=request.POST.get('level') or None
+            )
             messages.success(request, 'Grade added successfully!')
         except Exception as e:
             messages.error(request, f'Error adding grade: {str(e)}')
@@ -281,33 +279,34 @@ def delete_grade(request, grade_id):
 
 def grade_details(request, grade_id):
     grade = get_object_or_404(Grade, id=grade_id)
-    students = grade.student_set.all()
-    return render(request, 'grade_details.html', {'grade': grade, 'students': students})
+    students = loader_for(request).get('grade_students', grade_id=grade.id)
+    return render(request, 'grade_details.html', {
+        'grade': grade,
+        'students': students,
+        'attendance': attendance.grade_summary(grade),
+    })
 
 # ============= FINANCE VIEWS =============
-def finance_view(request):
-    students = Student.objects.all()
-    
-    total_fees_due = sum(s.fees_due for s in students)
-    total_fees_paid = sum(s.fees_paid for s in students)
-    outstanding_fees = sum(s.balance() for s in students if s.balance() > 0)
-    
-    # Outstanding fees by grade
-    grade_stats = {}
-    for student in students:
-        if student.balance() > 0:
-            grade_name = student.grade.name
-            if grade_name not in grade_stats:
-                grade_stats[grade_name] = 0
-            grade_stats[grade_name] += student.balance()
-    
-    context = {
+def _finance_summary():
+    balance = F('fees_due') - F('fees_paid')
+    owing = Student.objects.filter(fees_due__gt=F('fees_paid'))
+    totals = Student.objects.aggregate(total_fees_due=Sum('fees_due'), total_fees_paid=Sum('fees_paid'))
+    total_fees_due = totals['total_fees_due'] or 0
+    total_fees_paid = totals['total_fees_paid'] or 0
+    return {
         'total_fees_due': total_fees_due,
         'total_fees_paid': total_fees_paid,
-        'outstanding_fees': outstanding_fees,
-        'grade_stats': grade_stats,
+        'outstanding_fees': owing.aggregate(total=Sum(balance))['total'] or 0,
+        # Outstanding fees by grade
+        'grade_stats': dict(
+            owing.order_by('grade__level', 'grade__name').values('grade__name')
+            .annotate(outstanding=Sum(balance)).values_list('grade__name', 'outstanding')
+        ),
         'collection_rate': (total_fees_paid / total_fees_due * 100) if total_fees_due > 0 else 0
     }
+
+def finance_view(request):
+    context = singleflight.get_or_compute(singleflight.school_key('finance'), _finance_summary)
     return render(request, 'finance.html', context)
 
 def update_fees(request, student_id):
@@ -317,7 +316,7 @@ def update_fees(request, student_id):
         try:
             student.fees_due = float(request.POST.get('fees_due', student.fees_due))
             student.fees_paid = float(request.POST.get('fees_paid', student.fees_paid))
-            student.save()
+            student.save()  # the cached finance and dashboard figures are forgotten on commit
             messages.success(request, 'Fees updated successfully!')
         except Exception as e:
             messages.error(request, f'Error updating fees: {str(e)}')
@@ -326,10 +325,92 @@ def update_fees(request, student_id):
     
     return render(request, 'update_fees.html', {'student': student})
 
+def _limit(request, default, maximum):
+    """?limit= clamped to 1..maximum; ValueError if it is not a whole number."""
+    value = request.GET.get('limit') or default
+    try:
+        return max(1, min(int(value), maximum))
+    except ValueError:
+        raise ValueError(f'limit must be a whole number, not {value!r}')
+
+def _aging_as_of(request):
+    try:
+        return date.fromisoformat(request.GET['as_of'])
+    except (KeyError, ValueError):
+        return None
+
+def aging_report(request):
+    """30/60/90-day aging of outstanding fees by grade"""
+    as_of = _aging_as_of(request)
+    context = {
+        'as_of': as_of or date.today(),
+        'buckets': aging.BUCKETS,
+        'grade_summary': aging.grade_summary(as_of),
+        'totals': aging.totals(as_of),
+    }
+    return render(request, 'aging_report.html', context)
+
+def aging_report_api(request):
+    """API endpoint for the aging report; ?students=1 adds the largest balances"""
+    as_of = _aging_as_of(request)
+    data = {
+        'as_of': as_of or date.today(),
+        'buckets': dict(aging.BUCKETS),
+        'totals': aging.totals(as_of),
+        'grades': list(aging.grade_summary(as_of)),
+    }
+    if request.GET.get('students'):
+        try:
+            limit = _limit(request, 100, 1000)
+        except ValueError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+        data['students'] = list(aging.student_aging(as_of).order_by('-outstanding')[:limit])
+    return JsonResponse(data)
+
+class _Echo:
+    """File-like object for csv.writer that hands each row straight back"""
+    def write(self, value):
+        return value
+
+def aging_report_csv(request):
+    """Per-student aging report as a streamed CSV download"""
+    as_of = _aging_as_of(request)
+    columns = ['student_id', 'name', 'grade__name', 'status', 'fees_due', 'fees_paid', 'outstanding',
+               'last_payment', *aging.OWED, 'bucket', 'cumulative_outstanding', 'grade_rank']
+    writer = csv.writer(_Echo())
+    rows = aging.student_aging(as_of).values_list(*columns).iterator(chunk_size=2000)
+
+    def stream():
+        yield writer.writerow([c.replace('grade__name', 'grade') for c in columns])
+        for row in rows:
+            yield writer.writerow(row)
+
+    response = StreamingHttpResponse(stream(), content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="aging-{as_of or date.today()}.csv"'
+    return response
+
+def generate_invoices_api(request):
+    """Issue term invoices from the fee schedules of a term (optionally one grade)"""
+    if request.method != 'POST':
+        return JsonResponse({'error': 'POST required'}, status=405)
+
+    try:
+        term_id = int(request.POST.get('term') or 0)
+        grade_id = int(request.POST['grade']) if request.POST.get('grade') else None
+    except ValueError:
+        return JsonResponse({'error': 'term and grade must be ids'}, status=400)
+    term = get_object_or_404(Term, id=term_id)
+    try:
+        result = invoicing.generate(term, grade=grade_id)
+    except invoicing.InvoicingError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    return JsonResponse(result)
+
 # ============= EVENT VIEWS =============
 def events_view(request):
-    events = Event.objects.all()
-    activities = Activity.objects.all()
+    data = loader_for(request)
+    events = data.get('events')
+    activities = data.get('activities')
     return render(request, 'events.html', {'events': events, 'activities': activities})
 
 def add_event(request):
@@ -358,16 +439,18 @@ def add_activity(request):
 
 # ============= NOTIFICATION VIEWS =============
 def notifications_view(request):
-    notifications = Notification.objects.order_by('-date')
+    notifications = loader_for(request).get('notifications')
     return render(request, 'notifications.html', {'notifications': notifications})
 
 def add_notification(request):
     if request.method == 'POST':
         try:
-            Notification.objects.create(
-                message=request.POST['message'],
-                date=date.today()
-            )
+            with transaction.atomic():  # the notification, its outbox event and its deliveries
+                notification = Notification.objects.create(
+                    message=request.POST['message'],
+                    date=date.today()
+                )
+                delivery.queue(notification)
             messages.success(request, 'Notification sent successfully!')
         except Exception as e:
             messages.error(request, f'Error sending notification: {str(e)}')
@@ -386,24 +469,69 @@ def delete_notification(request, notification_id):
 # ============= API ENDPOINTS (for AJAX) =============
 def dashboard_stats_api(request):
     """API endpoint for real-time dashboard updates"""
-    data = {
-        'total_students': Student.objects.count(),
-        'total_staff': Staff.objects.count(),
-        'total_grades': Grade.objects.count(),
-        'outstanding_fees': sum(s.balance() for s in Student.objects.all() if s.balance() > 0),
-        'new_notifications': Notification.objects.count(),
-    }
+    stats = singleflight.get_or_compute(singleflight.school_key('dashboard-stats'), live.dashboard_stats)
+    return JsonResponse(stats)
+
+def batch_api(request):
+    """Several GET/POST API calls in one request: {"requests": [{"id", "method", "path", "params"}, ...]}"""
+    if request.method != 'POST':
+        return JsonResponse({'error': 'POST required'}, status=405)
+    try:
+        subs = batch.parse(request.body)
+    except batch.BatchError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    results, deduplicated = batch.execute(request, subs)
+    return HttpResponse(batch.render(subs, results, deduplicated), content_type='application/json')
+
+def roster_analytics_api(request):
+    """Fee and age distributions from the in-memory roster; narrow with ?grade= and ?status="""
+    try:
+        bins = max(1, min(int(request.GET.get('bins', 10)), 100))
+        summary = roster.summary(
+            grade_id=request.GET.get('grade') or None,
+            status=request.GET.get('status') or None,
+            bins=bins,
+        )
+    except (ValueError, roster.RosterError) as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    return JsonResponse(summary)
+
+def singleflight_metrics_api(request):
+    """Cached-report counters: fresh/stale hits, computations and coalesced requests"""
+    return JsonResponse(singleflight.metrics())
+
+# ============= DELTA SYNC API =============
+def sync_api(request, model_name):
+    """Rows of one model changed since ?since=<token> plus deleted ids, paged (follow 'next')"""
+    if model_name not in sync.MODELS:
+        return JsonResponse({'error': f'Unknown model: {model_name}'}, status=404)
+    try:
+        data = sync.changes(model_name, request.GET.get('since'), request.GET.get('limit', sync.PAGE_SIZE))
+    except sync.SyncExpired as e:
+        return JsonResponse({'error': str(e)}, status=410)
+    except (sync.SyncError, ValueError) as e:
+        return JsonResponse({'error': str(e)}, status=400)
     return JsonResponse(data)
 
+# ============= LIVE DASHBOARD (SSE) =============
+async def dashboard_stream(request):
+    """Server-sent dashboard stats: every figure once, then only those that change"""
+    if isinstance(request, ASGIRequest):
+        stream = live.broadcaster.channel(request.school_id).subscribe()
+    else:
+        # A WSGI worker can't park the connection: send one snapshot and let EventSource reconnect.
+        stats = await sync_to_async(live.dashboard_stats)()
+        stream = [f'retry: {live.RETRY_MS}\n' + live.sse('stats', json.dumps(stats, cls=DjangoJSONEncoder))]
+    response = StreamingHttpResponse(stream, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
 def students_filter_api(request):
     """API endpoint for filtering students"""
     filter_type = request.GET.get('filter', 'all')
-    students = Student.objects.select_related('grade').all()
-    
-    if filter_type == 'outstanding':
-        students = [s for s in students if s.balance() > 0]
-    elif filter_type == 'paid':
-        students = [s for s in students if s.balance() <= 0]
+    balance = filter_type if filter_type in ('outstanding', 'paid') else None
+    students = loader_for(request).get('students', balance=balance)
     
     data = [{
         'id': s.id,
@@ -418,19 +546,14 @@ def students_filter_api(request):
 
 def payment_history(request, student_id):
     """View payment history for a specific student"""
-    student = get_object_or_404(Student, id=student_id)
-    
-    # If you have the FeePayment model from the enhanced models
-    try:
-        from .models import FeePayment
-        payments = FeePayment.objects.filter(student=student).order_by('-payment_date')
-    except ImportError:
-        # Fallback if FeePayment model doesn't exist yet
-        payments = []
+    profile = profiles.load_profile(student_id, page=request.GET.get('page', 1))
+    student = profile['student']
     
     context = {
         'student': student,
-        'payments': payments,
+        'payments': profile['payments'],
+        'page': profile['page'],
+        'num_pages': profile['num_pages'],
         'total_paid': student.fees_paid,
         'balance': student.balance(),
     }
@@ -486,20 +609,13 @@ def delete_activity(request, activity_id):
 
 def activities_view(request):
     """View all activities"""
-    activities = Activity.objects.all()
+    activities = loader_for(request).get('activities')
     return render(request, 'activities.html', {'activities': activities})
 
 def staff_filter_api(request):
     """API endpoint for filtering staff"""
     filter_type = request.GET.get('filter', 'all')
-    staff = Staff.objects.all()
-    
-    if filter_type == 'teachers':
-        staff = staff.filter(role='Teacher')
-    elif filter_type == 'admin':
-        staff = staff.filter(role='Admin')
-    elif filter_type == 'support':
-        staff = staff.filter(role='Support')
+    staff = loader_for(request).get('staff', role=STAFF_FILTERS.get(filter_type))
     
     data = [{
         'id': s.id,
@@ -509,4 +625,296 @@ def staff_filter_api(request):
         'status': getattr(s, 'status', 'Active')  # Use getattr in case status field doesn't exist yet
     } for s in staff]
     
-    return JsonResponse({'staff': data})
\ No newline at end of file
+    return JsonResponse({'staff': data})
+
+def staff_workload_api(request):
+    """Per-grade teacher counts and per-teacher teaching, student and activity load"""
+    report = workload.report()
+    empty = {'teachers': 0, 'subjects': 0, 'periods': 0}
+    grades = Grade.objects.order_by('level', 'name').values('id', 'name')
+    return JsonResponse({
+        'grades': [dict(g, **report['grades'].get(g['id'], empty)) for g in grades],
+        'teachers': report['teachers'],
+    })
+
+# ============= BULK ACTIONS =============
+def bulk_students_api(request):
+    """Apply promote / add_fees / set_status to a filtered set of students"""
+    if request.method != 'POST':
+        return JsonResponse({'error': 'POST required'}, status=405)
+
+    ids = [int(i) for i in request.POST.getlist('ids') if i.isdigit()]
+    try:
+        result = bulk.run(
+            request.POST.get('action', ''),
+            grade=request.POST.get('grade') or None,
+            status=request.POST.get('status') or None,
+            ids=ids or None,
+            dry_run=request.POST.get('dry_run') in ('1', 'true', 'on'),
+            amount=request.POST.get('amount'),
+            new_status=request.POST.get('new_status'),
+            enforce_capacity=request.POST.get('ignore_capacity') not in ('1', 'true', 'on'),
+        )
+    except bulk.BulkActionError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    return JsonResponse(result)
+
+# ============= CAPACITY API =============
+def capacity_plan_api(request):
+    """Projected next-year headcount per grade; pass incoming admissions as ?grade_<id>=<n>"""
+    new_enrollments = {
+        key[len('grade_'):]: value for key, value in request.GET.items()
+        if key.startswith('grade_') and key[len('grade_'):].isdigit() and value.isdigit()
+    }
+    return JsonResponse(capacity.plan_rollover(new_enrollments))
+
+# ============= ARCHIVE API =============
+def student_history_api(request, student_id):
+    """Student record and payment history, whether the student is current or archived"""
+    student, archived = archive.find_student(student_id)
+    if student is None:
+        return JsonResponse({'error': 'Student not found'}, status=404)
+
+    payments = archive.payment_history(student_id, archived=archived)
+    activities = archive.activity_history(student_id, archived=archived)
+    invoices = archive.invoice_history(student_id, archived=archived)
+    results = archive.result_history(student_id, archived=archived)
+    attendance = archive.attendance_history(student_id, archived=archived)
+    data = {
+        'id': student.id,
+        'student_id': student.student_id,
+        'name': student.name,
+        'grade': student.grade_name if archived else student.grade.name,
+        'status': student.status,
+        'balance': student.balance(),
+        'archived': archived,
+        'payments': [{
+            'id': p.id,
+            'amount': p.amount,
+            'payment_method': p.payment_method,
+            'reference_number': p.reference_number,
+            'payment_date': p.payment_date,
+        } for p in payments],
+        'activities': [{
+            'title': title,
+            'date_joined': joined,
+            'is_active': is_active,
+        } for title, joined, is_active in activities],
+        'invoices': [{
+            'number': i.number,
+            'term': i.term_name if archived else i.term.name,
+            'total': i.total,
+            'status': i.status,
+            'due_date': i.due_date,
+            'lines': [{'description': line.description, 'amount': line.amount} for line in i.lines.all()],
+        } for i in invoices],
+        'results': [{
+            'subject': subject,
+            'exam': exam,
+            'term': term,
+            'date': exam_date,
+            'marks': marks,
+            'max_marks': max_marks,
+        } for subject, exam, term, exam_date, marks, max_marks in results],
+        'attendance': [{
+            'term': term,
+            'days_present': present,
+            'days_recorded': recorded,
+        } for term, present, recorded in attendance],
+        'documents': [documents.serialize(d) for d in archive.documents(student_id)],
+    }
+    return JsonResponse(data)
+
+# ============= AUDIT API =============
+def audit_object_api(request, model_name, object_id):
+    """Change history for a single record, newest first"""
+    if model_name not in audit.TRACKED_MODELS:
+        return JsonResponse({'error': f'Unknown model: {model_name}'}, status=404)
+    try:
+        limit = _limit(request, 50, 500)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    entries = audit.history_for(model_name, object_id, limit=limit)
+    return JsonResponse({'history': [audit.serialize(e) for e in entries]})
+
+def audit_actor_api(request, user_id):
+    """Changes made by a single user, newest first"""
+    try:
+        limit = _limit(request, 50, 500)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    entries = audit.history_by_actor(user_id, limit=limit)
+    return JsonResponse({'history': [audit.serialize(e) for e in entries]})
+
+# ============= SCHOOLS (TENANTS) API =============
+def schools_summary_api(request):
+    """Cross-school headcount, capacity and fee totals"""
+    schools = tenancy.school_summary()
+    return JsonResponse({'current_school': tenancy.current_school_id(), 'schools': schools})
+
+# ============= PARENT PORTAL API =============
+def guardian_family_api(request):
+    """A guardian's children, balances and notifications (by ?guardian=, ?phone= or ?email=)"""
+    try:
+        data = guardians.family(
+            guardian_id=request.GET.get('guardian'),
+            phone=request.GET.get('phone', ''),
+            email=request.GET.get('email', ''),
+        )
+    except (guardians.GuardianError, ValueError) as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    if data is None:
+        return JsonResponse({'error': 'Guardian not found'}, status=404)
+    return JsonResponse(data)
+
+# ============= ATTENDANCE API =============
+def grade_attendance_api(request, grade_id):
+    """GET: term attendance summary for a grade. POST: take the roll for the whole grade"""
+    grade = get_object_or_404(Grade, id=grade_id)
+    if request.method == 'POST':
+        try:
+            day = datetime.strptime(request.POST['date'], '%Y-%m-%d').date() if request.POST.get('date') else None
+            absent_ids = [int(i) for i in request.POST.getlist('absent') if i.isdigit()]
+            roll_call = attendance.mark_grade(grade, day=day, absent_ids=absent_ids)
+        except (ValueError, attendance.AttendanceError) as e:
+            return JsonResponse({'error': str(e)}, status=400)
+        return JsonResponse({
+            'grade': grade.name,
+            'date': roll_call.date,
+            'present': roll_call.present,
+            'absent': roll_call.absent,
+        })
+
+    summary = attendance.grade_summary(grade)
+    if summary is None:
+        return JsonResponse({'error': 'No current term'}, status=404)
+    return JsonResponse(dict(summary, grade=grade.name))
+
+# ============= GRADEBOOK =============
+def _selected_term(request):
+    """Term from ?term=<id>, else the current (or most recent) term"""
+    if request.GET.get('term'):
+        return get_object_or_404(Term, id=request.GET['term'])
+    return attendance.term_for(date.today()) or Term.objects.order_by('-start_date').first()
+
+def report_cards(request, grade_id):
+    """Printable report cards for a grade, streamed in batches of students"""
+    grade = get_object_or_404(Grade, id=grade_id)
+    term = _selected_term(request)
+    if term is None:
+        messages.error(request, 'No term has been set up yet.')
+        return redirect('grades')
+    return StreamingHttpResponse(gradebook.stream_report_cards(grade, term), content_type='text/html')
+
+def gradebook_api(request, grade_id):
+    """API endpoint for GPA, class rank and subject averages of a grade"""
+    grade = get_object_or_404(Grade, id=grade_id)
+    term = _selected_term(request)
+    if term is None:
+        return JsonResponse({'error': 'No term'}, status=404)
+    return JsonResponse({
+        'grade': grade.name,
+        'term': term.name,
+        'students': list(gradebook.grade_ranking(grade, term)),
+        'subjects': list(gradebook.subject_averages(grade, term)),
+    })
+
+def exam_results_api(request, exam_id):
+    """GET: ranked results of an exam. POST: enter marks as student_<id>=<marks>"""
+    exam = get_object_or_404(Exam.objects.select_related('grade', 'subject'), id=exam_id)
+    if request.method == 'POST':
+        marks = {
+            key[len('student_'):]: value for key, value in request.POST.items()
+            if key.startswith('student_') and key[len('student_'):].isdigit()
+        }
+        try:
+            saved = gradebook.enter_results(exam, marks)
+        except gradebook.GradebookError as e:
+            return JsonResponse({'errors': e.args[0]}, status=400)
+        return JsonResponse({'exam': str(exam), 'saved': saved})
+
+    rows = list(gradebook.exam_results(exam))
+    results = [{
+        'student_id': r.student_id,
+        'name': r.student.name,
+        'marks': r.marks,
+        'percentage': r.percentage,
+        'letter': gradebook.letter(r.percentage),
+        'rank': r.rank,
+        'percentile': r.percentile,
+    } for r in rows]
+    return JsonResponse({
+        'exam': str(exam),
+        'max_marks': exam.max_marks,
+        'class_average': rows[0].class_average if rows else None,
+        'results': results,
+    })
+
+# ============= TIMETABLE API =============
+def grade_timetable_api(request, grade_id):
+    """API endpoint for a grade's weekly timetable"""
+    grade = get_object_or_404(Grade, id=grade_id)
+    return JsonResponse({'grade': grade.name, 'days': timetable.grade_timetable(grade)})
+
+# ============= DOCUMENTS API =============
+def _document_owner(params):
+    """The Student or Staff member named by a student= or staff= parameter, if any"""
+    if params.get('student', '').isdigit():
+        return get_object_or_404(Student, id=params['student'])
+    if params.get('staff', '').isdigit():
+        return get_object_or_404(Staff, id=params['staff'])
+    return None
+
+@csrf_exempt
+def documents_api(request):
+    """GET ?student=<id> or ?staff=<id>: the record's documents; POST multipart (student|staff, kind, file): upload"""
+    if request.method == 'POST':
+        # The streaming handler has to be in place before anything reads request.POST,
+        # so CSRF is checked here rather than by the middleware.
+        handler = documents.StreamingUploadHandler(request)
+        request.upload_handlers = [handler]
+        return csrf_protect(_upload_document)(request, handler)
+    if request.method != 'GET':
+        return JsonResponse({'error': 'GET or POST required'}, status=405)
+
+    owner = _document_owner(request.GET)
+    if owner is None:
+        return JsonResponse({'error': 'student or staff id required'}, status=400)
+    return JsonResponse({'documents': [documents.serialize(d) for d in owner.documents.all()]})
+
+def _upload_document(request, handler):
+    owner = _document_owner(request.POST)
+    if owner is None:
+        return JsonResponse({'error': 'student or staff id required'}, status=400)
+    upload = request.FILES.get('file')
+    if upload is None:
+        return JsonResponse({'error': handler.error or 'No file uploaded'}, status=400)
+    try:
+        document = documents.attach(owner, request.POST.get('kind', 'other'), upload)
+    except documents.DocumentError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    return JsonResponse(documents.serialize(document))
+
+def delete_document_api(request, document_id):
+    """Remove a document; prune_documents deletes the file once no document refers to it"""
+    if request.method != 'POST':
+        return JsonResponse({'error': 'POST required'}, status=405)
+    document = get_object_or_404(Document, id=document_id)
+    document.delete()
+    return JsonResponse({'deleted': document_id})
+
+def document_download(request, document_id):
+    """The document's file; supports Range and If-None-Match, or hands off to the web server"""
+    document = get_object_or_404(Document, id=document_id)
+    return documents.serve_document(request, document)
+
+def document_thumbnail(request, document_id):
+    """JPEG thumbnail of an image document, ?size= one of DOCUMENT_THUMBNAIL_SIZES"""
+    document = get_object_or_404(Document, id=document_id)
+    size = request.GET.get('size', '')
+    try:
+        return documents.serve_thumbnail(
+            request, document, int(size) if size.isdigit() else documents.THUMBNAIL_SIZES[0],
+        )
+    except documents.DocumentError as e:
+        return JsonResponse({'error': str(e)}, status=400)
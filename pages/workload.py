@@ -0,0 +1,121 @@
+# workload.py
+"""
+Staff workload report built on TeachingAssignment.
+
+Per-grade teacher counts, per-teacher grade/subject/period and student load,
+and activity-instructor load come from four grouped queries plus one for the
+staff names, whatever the size of the school. The result is cached per
+school and dropped whenever an assignment, staff member, student, grade or
+activity changes: by signal, or explicitly after the bulk writes that send
+none (bulk promote/status changes, timetable.auto_assign). Use a shared
+cache backend when running several workers.
+"""
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from . import tenancy
+from .models import Activity, ActivityParticipant, Grade, Staff, Student, TeachingAssignment
+
+CACHE_TIMEOUT = 60 * 60
+GENERATION_KEY = 'staff-workload:generation'
+
+
+def _cache_key(school_id):
+    generation = cache.get_or_set(GENERATION_KEY, 1, None)
+    return f'staff-workload:{generation}:{school_id or "all"}'
+
+
+def invalidate(**kwargs):
+    """Drop every cached report (signal receiver)."""
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:  # not set yet, or evicted
+        cache.set(GENERATION_KEY, 1, None)
+
+
+def compute():
+    """Workload figures for the active school (all schools if none is active)."""
+    grades = Grade.objects.all()
+    assignments = TeachingAssignment.objects.filter(grade__in=grades).order_by()
+
+    per_grade = {
+        row.pop('grade_id'): row
+        for row in assignments.values('grade_id').annotate(
+            teachers=Count('teacher', distinct=True), subjects=Count('subject', distinct=True),
+            periods=Sum('periods_per_week'),
+        )
+    }
+    per_teacher = {
+        row.pop('teacher_id'): row
+        for row in assignments.values('teacher_id').annotate(
+            grades=Count('grade', distinct=True), subjects=Count('subject', distinct=True),
+            periods=Sum('periods_per_week'),
+        )
+    }
+    student_load = dict(
+        assignments.values('teacher_id').annotate(
+            students=Count('grade__student', filter=Q(grade__student__status='active'), distinct=True),
+        ).values_list('teacher_id', 'students')
+    )
+    activity_load = {
+        row.pop('instructor_id'): row
+        for row in Activity.objects.filter(is_active=True, instructor__isnull=False).order_by()
+        .values('instructor_id').annotate(
+            activities=Count('id', distinct=True),
+            participants=Count('activityparticipant', filter=Q(activityparticipant__is_active=True)),
+        )
+    }
+
+    staff_ids = set(per_teacher) | set(activity_load)
+    staff = Staff.objects.filter(Q(role='Teacher', status='active') | Q(id__in=staff_ids)).values(
+        'id', 'name', 'staff_id', 'role', 'department',
+    )
+    teachers = []
+    for member in staff:
+        teaching = per_teacher.get(member['id'], {})
+        activities = activity_load.get(member['id'], {})
+        teachers.append(dict(
+            member,
+            grades=teaching.get('grades', 0),
+            subjects=teaching.get('subjects', 0),
+            periods=teaching.get('periods') or 0,
+            students=student_load.get(member['id'], 0),
+            activities=activities.get('activities', 0),
+            activity_participants=activities.get('participants', 0),
+        ))
+    teachers.sort(key=lambda t: (-t['periods'], t['name']))
+
+    return {
+        'grades': {
+            grade_id: {
+                'teachers': row['teachers'],
+                'subjects': row['subjects'],
+                'periods': row['periods'] or 0,
+            }
+            for grade_id, row in per_grade.items()
+        },
+        'teachers': teachers,
+    }
+
+
+def report():
+    """The cached workload report for the active school."""
+    key = _cache_key(tenancy.current_school_id())
+    data = cache.get(key)
+    if data is None:
+        data = compute()
+        cache.set(key, data, CACHE_TIMEOUT)
+    return data
+
+
+def grade_teacher_counts():
+    """{grade_id: number of distinct teachers} from the cached report."""
+    return {grade_id: row['teachers'] for grade_id, row in report()['grades'].items()}
+
+
+def connect_signals():
+    for model in (TeachingAssignment, Staff, Student, Grade, Activity, ActivityParticipant):
+        post_save.connect(invalidate, sender=model, dispatch_uid=f'workload-save-{model.__name__}')
+        post_delete.connect(invalidate, sender=model, dispatch_uid=f'workload-delete-{model.__name__}')
+    m2m_changed.connect(invalidate, sender=Staff.teaching_subjects.through, dispatch_uid='workload-m2m')